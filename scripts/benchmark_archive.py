@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解压安装基准测试 - 测量各压缩包格式从解压到安装完成的耗时
+
+workers 模式对同一个zip用不同的进程数并行解压，测量解压耗时随进程数
+的变化，1个进程即在当前线程中解压。
+
+用法: python scripts/benchmark_archive.py [数据大小MB]
+      python scripts/benchmark_archive.py workers [数据大小MB] [进程数列表]
+例如: python scripts/benchmark_archive.py workers 256 1,2,4,8
+"""
+
+import io
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.archive import extract_archive, extract_zip_parallel  # noqa: E402
+from src.utils.installer import install_directory  # noqa: E402
+
+
+def create_payload(source_dir: Path, size_mb: int) -> None:
+    """生成一半随机、一半可压缩的测试文件，模拟工具链的二进制和文档"""
+    (source_dir / "pkg" / "bin").mkdir(parents=True)
+    (source_dir / "pkg" / "doc").mkdir(parents=True)
+    chunk = 1024 * 1024
+    for index in range(size_mb // 2):
+        (source_dir / "pkg" / "bin" / f"tool{index}").write_bytes(os.urandom(chunk))
+        (source_dir / "pkg" / "doc" / f"doc{index}.txt").write_bytes(b"ffmpeg docs\n" * (chunk // 12))
+
+
+def create_archives(source_dir: Path, output_dir: Path) -> dict:
+    """把测试文件打包为各种格式"""
+    archives = {"zip": create_zip(source_dir, output_dir)}
+
+    for archive_format, mode in (("tar.gz", "w:gz"), ("tar.xz", "w:xz")):
+        tar_path = output_dir / f"payload.{archive_format}"
+        with tarfile.open(tar_path, mode) as tar:
+            tar.add(source_dir / "pkg", "pkg")
+        archives[archive_format] = tar_path
+
+    try:
+        import zstandard
+    except ImportError:
+        print("未安装 zstandard，跳过 tar.zst")
+        return archives
+    tar_data = io.BytesIO()
+    with tarfile.open(fileobj=tar_data, mode="w") as tar:
+        tar.add(source_dir / "pkg", "pkg")
+    zst_path = output_dir / "payload.tar.zst"
+    zst_path.write_bytes(zstandard.ZstdCompressor().compress(tar_data.getvalue()))
+    archives["tar.zst"] = zst_path
+    return archives
+
+
+def create_zip(source_dir: Path, output_dir: Path) -> Path:
+    """把测试文件打包为zip"""
+    zip_path = output_dir / "payload.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for file_path in sorted(source_dir.rglob("*")):
+            zip_ref.write(file_path, file_path.relative_to(source_dir))
+    return zip_path
+
+
+def benchmark_workers(size_mb: int, worker_counts: List[int]) -> None:
+    """并行解压zip的耗时随进程数的变化"""
+    work_dir = Path(tempfile.mkdtemp(prefix="archive-benchmark-"))
+    try:
+        source_dir = work_dir / "source"
+        create_payload(source_dir, size_mb)
+        zip_path = create_zip(source_dir, work_dir)
+
+        print(f"zip {zip_path.stat().st_size / 1024 / 1024:.1f}MB，CPU核心数 {os.cpu_count()}")
+        print(f"{'进程数':<8}{'解压(s)':>10}{'加速比':>8}")
+        baseline = None
+        for workers in worker_counts:
+            extract_dir = work_dir / f"extract-{workers}"
+            start_time = time.perf_counter()
+            extract_zip_parallel(zip_path, extract_dir, workers=workers)
+            elapsed = time.perf_counter() - start_time
+            baseline = baseline or elapsed
+            print(f"{workers:<8}{elapsed:>10.2f}{baseline / elapsed:>8.2f}x")
+            shutil.rmtree(extract_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "workers":
+        size_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+        counts = sys.argv[3] if len(sys.argv) > 3 else "1,2,4,8"
+        benchmark_workers(size_mb, [int(count) for count in counts.split(",")])
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    work_dir = Path(tempfile.mkdtemp(prefix="archive-benchmark-"))
+    try:
+        source_dir = work_dir / "source"
+        create_payload(source_dir, size_mb)
+        archives = create_archives(source_dir, work_dir)
+
+        print(f"{'格式':<10}{'压缩包大小':>12}{'解压(s)':>10}{'安装(s)':>10}{'合计(s)':>10}")
+        for archive_format, archive_path in archives.items():
+            staging_dir = work_dir / f"staging-{archive_format}"
+            install_dir = work_dir / f"install-{archive_format}"
+            start_time = time.perf_counter()
+            extract_archive(archive_path, staging_dir)
+            extract_time = time.perf_counter() - start_time
+            install_directory(staging_dir, install_dir)
+            total_time = time.perf_counter() - start_time
+            print(
+                f"{archive_format:<10}{archive_path.stat().st_size / 1024 / 1024:>10.1f}MB"
+                f"{extract_time:>10.2f}{total_time - extract_time:>10.2f}{total_time:>10.2f}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
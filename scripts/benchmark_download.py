@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下载基准测试 - 在本机HTTP服务器上对比不同连接数的分段下载耗时
+
+服务器对每个连接单独限速，模拟按连接限速的GitHub发布页CDN：单连接
+下载受限于每连接带宽，多连接时总速度随连接数增加。测试在临时目录中
+进行，配置目录也指向临时目录。
+
+mirrors 模式启动一个高延迟的慢速源和一个快速镜像，先用 MirrorProber
+测速排序，再从慢速源开始单连接下载，验证速度低于下限时切换到镜像续传
+（分别测试支持和不支持范围请求的服务器）。
+
+用法: python scripts/benchmark_download.py [数据大小MB] [每连接限速MB/s] [连接数列表]
+      python scripts/benchmark_download.py mirrors [数据大小MB]
+例如: python scripts/benchmark_download.py 32 4 1,2,4,8
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+WORK_DIR = Path(tempfile.mkdtemp(prefix="download-benchmark-"))
+
+# 配置目录和下载暂存目录都写到临时目录
+os.environ["HOME"] = os.environ["USERPROFILE"] = str(WORK_DIR / "home")
+(WORK_DIR / "home").mkdir()
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.download import SPEED_CHECK_INTERVAL, SegmentedDownload  # noqa: E402
+from src.utils.mirrors import MirrorProber  # noqa: E402
+
+MB = 1024 * 1024
+
+# 限速时每次发送的字节数
+SEND_CHUNK_SIZE = 64 * 1024
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    """支持范围请求、每个连接单独限速的静态文件服务
+
+    payload、rate（字节/秒）、latency（首字节前的延迟，秒）和 ranges
+    （是否支持范围请求）由 make_server 设置在子类上。
+    """
+
+    payload = b""
+    rate = 0.0
+    latency = 0.0
+    ranges = True
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        total_size = len(self.payload)
+        start, end = 0, total_size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.ranges and match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)) if match.group(2) else end, end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total_size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", '"benchmark"')
+        self.end_headers()
+
+        position = start
+        started = time.monotonic()
+        try:
+            while position <= end:
+                chunk = self.payload[position:min(position + SEND_CHUNK_SIZE, end + 1)]
+                self.wfile.write(chunk)
+                position += len(chunk)
+                if self.rate:
+                    # 按已发送的字节数控制速度
+                    delay = (position - start) / self.rate - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端切换镜像或取消分段时会主动断开
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(
+    payload: bytes, rate: float, latency: float = 0.0, ranges: bool = True
+) -> Tuple[ThreadingHTTPServer, str]:
+    """在随机端口启动限速服务器，返回(服务器, 文件地址)"""
+    handler = type(
+        "Handler",
+        (ThrottledHandler,),
+        {"payload": payload, "rate": rate, "latency": latency, "ranges": ranges},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/payload.bin"
+
+
+def benchmark_mirrors(size_mb: int) -> None:
+    """慢速源与快速镜像：测速排序，以及下载中途的换源"""
+    payload = os.urandom(size_mb * MB)
+    expected_sha256 = hashlib.sha256(payload).hexdigest()
+    slow_rate, fast_rate = 256 * 1024, 8 * MB
+    for ranges in (True, False):
+        slow_server, slow_url = make_server(payload, slow_rate, latency=0.3, ranges=ranges)
+        fast_server, fast_url = make_server(payload, fast_rate, latency=0.02, ranges=ranges)
+        try:
+            print(f"\n服务器{'支持' if ranges else '不支持'}范围请求")
+            ranked = MirrorProber(cache_file=WORK_DIR / f"probe-{ranges}.json").rank([slow_url, fast_url])
+            order = ["快速镜像" if result["url"] == fast_url else "慢速源" for result in ranked]
+            print(f"测速排序: {' > '.join(order)}")
+
+            # 从慢速源开始，速度下限取快速镜像吞吐量的一部分
+            staging_dir = WORK_DIR / f"mirrors-{ranges}"
+            staging_dir.mkdir()
+            task = SegmentedDownload(
+                slow_url,
+                "payload.bin",
+                connections=1,
+                staging_dir=staging_dir,
+                mirror_urls=[fast_url],
+                min_speed=slow_rate * 2,
+            )
+            start_time = time.perf_counter()
+            task.run()
+            elapsed = time.perf_counter() - start_time
+            if task.sha256 != expected_sha256:
+                raise Exception("换源后下载的文件校验失败")
+            print(
+                f"单连接换源下载 {size_mb}MB: {elapsed:.2f}s"
+                f"（只用慢速源约 {size_mb * MB / slow_rate:.0f}s，测速窗口 {SPEED_CHECK_INTERVAL}s）"
+            )
+            task.cleanup()
+        finally:
+            slow_server.shutdown()
+            fast_server.shutdown()
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "mirrors":
+        try:
+            benchmark_mirrors(int(sys.argv[2]) if len(sys.argv) > 2 else 8)
+        finally:
+            shutil.rmtree(WORK_DIR, ignore_errors=True)
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rate_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    connection_counts = [int(n) for n in (sys.argv[3] if len(sys.argv) > 3 else "1,2,4,8").split(",")]
+
+    payload = os.urandom(size_mb * MB)
+    expected_sha256 = hashlib.sha256(payload).hexdigest()
+    server, url = make_server(payload, rate_mb * MB)
+    try:
+        print(f"文件大小 {size_mb}MB，每连接限速 {rate_mb}MB/s")
+        print(f"{'连接数':<8}{'耗时(s)':>10}{'速度(MB/s)':>12}{'加速比':>8}")
+        baseline = None
+        for connections in connection_counts:
+            staging_dir = WORK_DIR / f"staging-{connections}"
+            staging_dir.mkdir()
+            task = SegmentedDownload(url, "payload.bin", connections=connections, staging_dir=staging_dir)
+            start_time = time.perf_counter()
+            task.run()
+            elapsed = time.perf_counter() - start_time
+            if task.sha256 != expected_sha256:
+                raise Exception(f"{connections} 个连接下载的文件校验失败")
+            baseline = baseline or elapsed
+            print(f"{connections:<8}{elapsed:>10.2f}{size_mb / elapsed:>12.1f}{baseline / elapsed:>8.1f}x")
+            task.cleanup()
+    finally:
+        server.shutdown()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+安装流程基准测试 - 对比联网下载安装与离线安装的总耗时
+
+联网路径从本机HTTP服务器下载，离线路径直接使用本地压缩包，两者都完整
+执行校验、解压、安装和登记。为避免修改真实环境，测试在临时目录中进行，
+配置目录指向临时目录，并跳过PATH配置。
+
+用法: python scripts/benchmark_install.py [数据大小MB]
+"""
+
+import functools
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+WORK_DIR = Path(tempfile.mkdtemp(prefix="install-benchmark-"))
+
+# 配置目录、下载缓存和安装登记都写到临时目录
+os.environ["HOME"] = os.environ["USERPROFILE"] = str(WORK_DIR / "home")
+(WORK_DIR / "home").mkdir()
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.gui.pages.environment_page import SmartDownloadManager  # noqa: E402
+
+TOOL_NAME = "benchtool"
+
+
+class BenchmarkManager(SmartDownloadManager):
+    """跳过PATH配置的下载管理器"""
+
+    def _configure_path(self, permanent_dir):
+        pass
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """不打印访问日志的静态文件服务"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_archive(archive_path: Path, size_mb: int) -> str:
+    """生成模拟工具链的zip包，返回其sha256"""
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr(f"{TOOL_NAME}/bin/{TOOL_NAME}", b"#!/bin/sh\necho benchtool 1.0\n")
+        for index in range(size_mb):
+            data = os.urandom(512 * 1024) + b"docs\n" * (512 * 1024 // 5)
+            zip_ref.writestr(f"{TOOL_NAME}/lib/part{index}.bin", data)
+    return hashlib.sha256(archive_path.read_bytes()).hexdigest()
+
+
+def run_install(label: str, **kwargs) -> float:
+    """完整执行一次安装，返回耗时"""
+    results = []
+    manager = BenchmarkManager(**kwargs)
+    manager.download_finished.connect(lambda success, message: results.append((success, message)))
+    start_time = time.perf_counter()
+    # 直接在当前线程执行，便于计时
+    manager.run()
+    elapsed = time.perf_counter() - start_time
+    success, message = results[-1]
+    if not success:
+        raise RuntimeError(f"{label}失败: {message}")
+    return elapsed
+
+
+def main() -> None:
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    try:
+        serve_dir = WORK_DIR / "serve"
+        serve_dir.mkdir()
+        archive_path = serve_dir / f"{TOOL_NAME}.zip"
+        sha256 = create_archive(archive_path, size_mb)
+
+        handler = functools.partial(QuietHandler, directory=str(serve_dir))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/{archive_path.name}"
+
+        # 安装目录位于当前目录下
+        os.chdir(WORK_DIR)
+        print(f"压缩包大小: {archive_path.stat().st_size / 1024 / 1024:.1f}MB")
+        online_time = run_install("联网安装", url=url, target_name=TOOL_NAME, expected_sha256=sha256)
+        print(f"联网安装: {online_time:.2f}s")
+        offline_time = run_install(
+            "离线安装", url=url, target_name=TOOL_NAME, expected_sha256=sha256, local_file=archive_path
+        )
+        print(f"离线安装: {offline_time:.2f}s")
+        server.shutdown()
+    finally:
+        os.chdir(PROJECT_ROOT)
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
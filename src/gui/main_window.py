@@ -3,7 +3,7 @@
 主窗口类
 """
 
-from PySide6.QtCore import QEasingCurve, QPoint, QPropertyAnimation, QSize, Qt, Signal
+from PySide6.QtCore import QEasingCurve, QPoint, QPropertyAnimation, QSize, Qt, QTimer, Signal
 from PySide6.QtGui import QFont, QIcon, QPixmap
 from PySide6.QtWidgets import (
     QFrame,
@@ -23,6 +23,7 @@ from PySide6.QtWidgets import (
 )
 
 from ..utils.config import ConfigManager
+from ..utils.peers import start_peer_server, stop_peer_server
 from .pages.environment_page import EnvironmentPage
 from .pages.home_page import HomePage
 from .pages.settings_page import SettingsPage
@@ -407,6 +408,15 @@ class MainWindow(QMainWindow):
         self.setup_connections()
         self.restore_geometry()
 
+        # 启用局域网共享缓存时向其他机器提供下载缓存
+        start_peer_server()
+
+        # 窗口显示后立即显示上次的检测结果，并在后台重新检测
+        QTimer.singleShot(0, self.environment_page.restore_detection)
+
+        # 询问是否继续上次中断的安装
+        QTimer.singleShot(0, self.environment_page.offer_resume_installs)
+
         # 确保窗口大小正确
         if self.width() > 1920 or self.height() > 1080:  # 如果窗口过大
             self.resize(1200, 800)
@@ -647,4 +657,5 @@ class MainWindow(QMainWindow):
             if not is_fullscreen_size:
                 self.config_manager.save_window_geometry(size, position)
 
+        stop_peer_server()
         event.accept()
@@ -1,5 +1,6 @@
 import ctypes
 import datetime
+import hashlib
 import json
 import os
 import platform
@@ -8,9 +9,10 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import webbrowser
-import zipfile
 from pathlib import Path
+from urllib.parse import urlparse
 
 import requests
 from PySide6.QtCore import Qt, QThread, QTimer, Signal
@@ -20,14 +22,18 @@ from PySide6.QtWidgets import (
     QDialogButtonBox,
     QFileDialog,
     QFormLayout,
+    QAbstractItemView,
     QGroupBox,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QMessageBox,
     QProgressBar,
     QPushButton,
     QScrollArea,
+    QTableWidget,
+    QTableWidgetItem,
     QTabWidget,
     QVBoxLayout,
     QWidget,
@@ -44,6 +50,56 @@ from src.gui.widgets import (
     show_warning_dialog,
 )
 from src.gui.widgets.animated_button import AnimatedButton
+from src.utils.archive import (
+    extract_archive,
+    extract_tar_stream,
+    extract_zip,
+    extracted_members_size,
+    is_tar_url,
+    zip_members_size,
+)
+from src.utils.artifact_cache import ArtifactCache, compute_sha256
+from src.utils.artifacts import fetch_artifact_details, get_ffmpeg_artifact, get_python_artifact
+from src.utils.config import ConfigManager
+from src.utils.detection_cache import DetectionCache
+from src.utils.disk import check_disk_space, estimate_footprint, format_footprint, get_free_space
+from src.utils.download import (
+    ChecksumMismatchError,
+    HttpRangeFile,
+    SegmentedDownload,
+    fetch_release_checksum,
+    get_staging_dir,
+    get_staging_root,
+    get_validator,
+    probe_download,
+    remove_staging_dir,
+    verify_sha256,
+)
+from src.utils.http_client import get_session
+from src.utils.install_state import INSTALL_PHASE_NAMES, INSTALL_PHASES, InstallStateStore, phase_index
+from src.utils.introspect import (
+    check_interpreter,
+    introspect_interpreters,
+    rank_interpreters,
+    skip_incompatible,
+)
+from src.utils.inventory import find_interpreters, parse_version, scan_interpreters
+from src.utils.installer import create_staging_dir, get_install_dir, install_directory
+from src.utils.mirrors import SLOW_SOURCE_RATIO, MirrorProber
+from src.utils.offline import (
+    find_local_checksum,
+    find_offline_artifact,
+    resolve_local_artifact,
+)
+from src.utils.peers import fetch_from_peers, get_peers, is_peer_cache_enabled
+from src.utils.probe import build_candidates, probe_concurrently
+from src.utils.progress import ProgressAggregator
+from src.utils.registry import InstallRegistry
+from src.utils.shims import add_to_process_path, get_shim_dir, install_path_block, link_tool, link_tools
+from src.utils.updates import check_for_update, resolve_release_tag
+
+# 离线安装时可选择的压缩包格式
+ARCHIVE_FILE_FILTER = "压缩包 (*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tar.xz *.tar.zst *.tzst);;All Files (*)"
 
 
 def request_admin_privileges():
@@ -68,86 +124,514 @@ class SmartDownloadManager(QThread):
     """智能下载管理器"""
 
     progress_updated = Signal(int)
+    # 阶段、已完成大小、速度、剩余时间等进度详情
+    progress_info_updated = Signal(dict)
     status_updated = Signal(str)
     download_finished = Signal(bool, str)
 
-    def __init__(self, url, target_name):
+    def __init__(
+        self,
+        url,
+        target_name,
+        resumable=True,
+        connections=None,
+        streaming=None,
+        expected_sha256=None,
+        checksum_url=None,
+        mirrors=None,
+        extract_members=None,
+        local_file=None,
+        resume_state=None,
+    ):
         super().__init__()
         self.url = url
         self.target_name = target_name
+        # 离线安装：直接使用本地压缩包，全程不联网
+        self.local_file = Path(local_file) if local_file else None
+        # 同一产物的所有下载地址，第一项为官方地址
+        self.mirrors = [url] + [mirror for mirror in (mirrors or []) if mirror != url]
+        self.resumable = resumable
+        # 预期的sha256，可直接指定，也可从发布页的校验文件获取
+        self.expected_sha256 = expected_sha256
+        self.checksum_url = checksum_url
+        # 并发连接数和流式解压开关，未指定时读取配置
+        config_manager = ConfigManager()
+        if connections is None:
+            connections = config_manager.get("download_connections", 4)
+        if streaming is None:
+            streaming = config_manager.get("streaming_extract", False)
+        # 配置文件可能被手动改成0或负数，至少使用一个连接
+        self.connections = max(1, int(connections))
+        self.streaming = streaming
+        # 解压清单，只解压匹配的成员；为空时解压全部
+        self.extract_members = extract_members
+        # 解压出的文件（相对于解压目录），用于直接定位bin目录
+        self.extracted_files = []
+        # 上游产物的版本信息（地址、ETag、Last-Modified、sha256），安装时写入安装信息
+        self.upstream = {}
+        self.install_dir = get_install_dir(target_name)
         self.temp_dir = None
         self.extract_dir = None
+        self.download_task = None
+        # 合并各阶段的进度回调，按固定帧率发信号，避免界面卡顿
+        self.progress = ProgressAggregator(self._emit_progress)
+        # 阶段检查点，resume_state 为上次未完成的安装，从其最后完成的阶段继续
+        self.state_store = InstallStateStore()
+        self.state = resume_state
 
     def run(self):
         try:
-            # 创建临时目录
-            self.temp_dir = Path(tempfile.mkdtemp())
-            print(f"创建临时目录: {self.temp_dir}")
-
-            # 下载文件
-            self.status_updated.emit("正在下载...")
-            downloaded_file = self._download_file()
-            print(f"下载完成: {downloaded_file}")
+            self._prepare_state()
+            completed = phase_index(self.state.get("completed"))
 
-            # 解压文件
-            self.status_updated.emit("正在解压...")
-            extracted_dir = self._extract_file(downloaded_file)
+            if completed >= phase_index("extract"):
+                extracted_dir = Path(self.state["extract_dir"])
+                self.extracted_files = self.state.get("extracted_files", [])
+                print(f"沿用上次解压的文件: {extracted_dir}")
+            else:
+                extracted_dir = self._download_and_extract(completed)
+                self.state_store.checkpoint(
+                    self.target_name,
+                    self.state,
+                    "extract",
+                    extract_dir=str(extracted_dir),
+                    extracted_files=self.extracted_files,
+                    upstream=self.upstream,
+                )
             print(f"解压完成: {extracted_dir}")
 
-            # 安装到永久位置
-            self.status_updated.emit("正在安装...")
-            permanent_dir = self._install_to_permanent_location(extracted_dir)
+            if completed < phase_index("install"):
+                # 安装到永久位置
+                self.status_updated.emit("正在安装...")
+                self.progress.set_phase("install")
+                self._install_to_permanent_location(extracted_dir)
+                self.state_store.checkpoint(self.target_name, self.state, "install")
+            permanent_dir = self.install_dir
             print(f"安装完成: {permanent_dir}")
 
-            # 配置PATH
-            self.status_updated.emit("正在配置环境变量...")
-            print("开始配置PATH...")
-            self._configure_path(permanent_dir)
-            print("PATH配置完成")
-
-            # 保存安装信息
-            print("保存安装信息...")
-            self._save_installation_info(permanent_dir)
-            print("安装信息保存完成")
+            if completed < phase_index("path"):
+                # 配置PATH
+                self.status_updated.emit("正在配置环境变量...")
+                print("开始配置PATH...")
+                self._configure_path(permanent_dir)
+                self.state_store.checkpoint(self.target_name, self.state, "path")
+                print("PATH配置完成")
+
+            if completed < phase_index("register"):
+                # 保存安装信息
+                print("保存安装信息...")
+                self._save_installation_info(permanent_dir)
+                self.state_store.checkpoint(self.target_name, self.state, "register")
+                print("安装信息保存完成")
 
             # 清理临时文件
             if self.temp_dir and self.temp_dir.exists():
                 shutil.rmtree(self.temp_dir)
                 print("临时文件清理完成")
 
+            # 安装成功后才删除暂存的下载文件和检查点；从检查点继续时没有下载任务，
+            # 暂存目录按地址删除
+            if self.download_task:
+                self.download_task.cleanup()
+            else:
+                remove_staging_dir(self.url)
+            self.state_store.clear(self.target_name)
+
             print("发送下载完成信号...")
             self.download_finished.emit(True, f"{self.target_name} 安装成功！")
 
         except Exception as e:
             print(f"下载过程中出现异常: {e}")
-            # 清理临时文件
-            if self.temp_dir and self.temp_dir.exists():
+            # 已解压的临时目录保留给下次继续安装，否则清理
+            # （暂存目录中的未完成下载保留，用于重试时续传）
+            extracted = self.state and phase_index(self.state.get("completed")) >= phase_index("extract")
+            if not extracted and self.temp_dir and self.temp_dir.exists():
                 shutil.rmtree(self.temp_dir)
             self.download_finished.emit(False, f"安装失败: {str(e)}")
 
+    def _prepare_state(self):
+        """准备检查点：继续安装时校验上次各阶段的产出，产出缺失的阶段需要重做"""
+        if self.state is None:
+            # 重新安装时放弃同名工具上次未完成的安装
+            self.state_store.discard(self.target_name)
+            self.state = {
+                "target_name": self.target_name,
+                "url": self.url,
+                "mirrors": self.mirrors,
+                "checksum_url": self.checksum_url,
+                "expected_sha256": self.expected_sha256,
+                "extract_members": self.extract_members,
+                "local_file": str(self.local_file) if self.local_file else "",
+                "completed": None,
+            }
+        else:
+            print(f"继续上次未完成的安装，已完成阶段: {self.state.get('completed')}")
+            self.upstream = self.state.get("upstream", {})
+
+        completed = phase_index(self.state.get("completed"))
+        temp_dir = Path(self.state["temp_dir"]) if self.state.get("temp_dir") else None
+        downloaded_file = self.state.get("downloaded_file")
+        if completed >= phase_index("install") and not self.install_dir.exists():
+            completed = phase_index("extract")
+        # 安装阶段会把解压目录整个移走，只有停在解压阶段时才需要解压目录
+        extracted = temp_dir and (temp_dir / "extracted").exists()
+        if completed == phase_index("extract") and not extracted:
+            completed = phase_index("download")
+        if completed == phase_index("download") and not (downloaded_file and Path(downloaded_file).exists()):
+            completed = -1
+        self.state["completed"] = INSTALL_PHASES[completed] if completed >= 0 else None
+
+        if completed >= phase_index("extract"):
+            self.temp_dir = temp_dir
+        else:
+            if temp_dir and temp_dir.exists():
+                shutil.rmtree(temp_dir)
+            # 在安装目录所在的文件系统上创建临时目录
+            self.temp_dir = create_staging_dir(self.install_dir)
+            print(f"创建临时目录: {self.temp_dir}")
+        self.state["temp_dir"] = str(self.temp_dir)
+        self.state_store.save(self.target_name, self.state)
+
+    def _download_and_extract(self, completed):
+        """下载（或沿用上次下载的文件）并解压，返回解压目录"""
+        if completed >= phase_index("download"):
+            downloaded_file = Path(self.state["downloaded_file"])
+            self.expected_sha256 = self.state.get("expected_sha256")
+            print(f"沿用上次下载的文件: {downloaded_file}")
+        else:
+            self.expected_sha256 = self._get_expected_sha256()
+            if self.local_file:
+                # 离线模式：校验本地压缩包后直接解压
+                self.status_updated.emit("正在校验本地文件...")
+                self.progress.set_phase("verify")
+                downloaded_file = self._use_local_file()
+            else:
+                if self.streaming:
+                    # 流式模式：边下载边解压，不落地完整压缩包
+                    self.status_updated.emit("正在下载并解压...")
+                    self.progress.set_phase("download")
+                    extracted_dir = self._stream_download_and_extract()
+                    if extracted_dir is not None:
+                        return extracted_dir
+
+                # 下载文件
+                self.status_updated.emit("正在下载...")
+                self.progress.set_phase("download")
+                downloaded_file = self._download_file()
+                print(f"下载完成: {downloaded_file}")
+            self.state_store.checkpoint(
+                self.target_name,
+                self.state,
+                "download",
+                downloaded_file=str(downloaded_file),
+                expected_sha256=self.expected_sha256,
+                upstream=self.upstream,
+            )
+
+        # 解压文件
+        self.status_updated.emit("正在解压...")
+        self.progress.set_phase("extract")
+        return self._extract_file(downloaded_file)
+
     def _download_file(self):
         """下载文件"""
         if self.temp_dir is None:
             raise Exception("临时目录未初始化")
 
-        response = requests.get(self.url, stream=True)
+        # 沿用下载地址中的文件名（例如 Python-3.11.0.tgz），解压时按文件头识别格式
+        file_name = Path(urlparse(self.url).path).name
+        if "." not in file_name:
+            file_name = f"{self.target_name}.zip"
+        if self.resumable:
+            return self._download_with_cache(file_name)
+
+        # 开始传输前检查磁盘空间
+        self._check_disk_space(
+            probe_download(self.url)["total_size"],
+            download_dir=self.temp_dir,
+            extracted_size=self._pre_download_extracted_size(),
+        )
+        response = get_session().get(self.url, stream=True)
         response.raise_for_status()
+        self._record_upstream(self.url, response.url, response.headers)
 
         total_size = int(response.headers.get("content-length", 0))
         downloaded_size = 0
+        digest = hashlib.sha256()
 
-        downloaded_file = self.temp_dir / f"{self.target_name}.zip"
+        downloaded_file = self.temp_dir / file_name
         with open(downloaded_file, "wb") as f:
             for chunk in response.iter_content(chunk_size=8192):
                 if chunk:
                     f.write(chunk)
+                    digest.update(chunk)
                     downloaded_size += len(chunk)
-                    if total_size > 0:
-                        progress = int((downloaded_size / total_size) * 100)
-                        self.progress_updated.emit(progress)
+                    self._on_download_progress(downloaded_size, total_size)
 
+        verify_sha256(digest.hexdigest(), self.expected_sha256)
+        self.upstream["sha256"] = digest.hexdigest()
         return downloaded_file
 
+    def _get_expected_sha256(self):
+        """获取预期的sha256，校验文件获取失败时不阻止安装"""
+        if self.expected_sha256:
+            return self.expected_sha256
+        if self.local_file:
+            # 离线模式只读取压缩包旁边的校验文件
+            return find_local_checksum(self.local_file)
+        if not self.checksum_url:
+            return None
+        file_name = urlparse(self.url).path.rsplit("/", 1)[-1]
+        try:
+            expected_sha256 = fetch_release_checksum(self.checksum_url, file_name)
+        except requests.RequestException as e:
+            print(f"获取校验文件失败，跳过校验: {e}")
+            return None
+        if expected_sha256:
+            print(f"预期sha256: {expected_sha256}")
+        return expected_sha256
+
+    def _download_with_cache(self, file_name):
+        """优先使用下载缓存，未命中时断点续传/分段下载并写入缓存"""
+        cache = ArtifactCache()
+        if self.expected_sha256:
+            # 已知sha256时直接按内容查找，完全不需要联网
+            cached_file = cache.lookup_sha256(self.expected_sha256)
+            if cached_file:
+                print(f"命中下载缓存: {cached_file}")
+                return self._use_cached_file(cached_file)
+            # 本地没有时先问局域网节点，只需局域网传输
+            # 不知道sha256时无法确认节点提供的文件可信，不向节点获取
+            peer_file = self._fetch_from_peers(cache, self.expected_sha256)
+            if peer_file:
+                return peer_file
+
+        try:
+            source_url, info, mirror_urls, min_speed = self._select_source()
+        except requests.RequestException:
+            # 无法联网确认文件版本时，使用该产物最近一次缓存的文件
+            cached_file = cache.lookup_latest(self.mirrors)
+            if cached_file:
+                print(f"网络不可用，使用缓存文件: {cached_file}")
+                return self._use_cached_file(cached_file)
+            raise
+
+        self.upstream = {
+            "source_url": source_url,
+            "resolved_url": info["url"],
+            "etag": info["etag"],
+            "last_modified": info["last_modified"],
+        }
+        validator = get_validator(info["etag"], info["last_modified"])
+        # 命中的blob在查找时已确认内容与文件名（sha256）一致
+        cached_file = cache.lookup(source_url, validator)
+        if cached_file and self.expected_sha256 and cached_file.name != self.expected_sha256:
+            # 该地址缓存的文件与上游公布的sha256不符，淘汰这个blob后重新下载
+            cache.remove(cached_file.name)
+            cached_file = None
+        if cached_file:
+            print(f"命中下载缓存: {cached_file}")
+            return self._use_cached_file(cached_file)
+        self._check_disk_space(info["total_size"], extracted_size=self._pre_download_extracted_size())
+
+        # 断点续传：未完成的文件保存在稳定的暂存目录中
+        # 服务器支持范围请求时按配置的连接数分段并发下载
+        # 暂存目录按官方地址确定，换了镜像重试时也能找到同一个目录
+        self.download_task = SegmentedDownload(
+            source_url,
+            file_name,
+            connections=self.connections,
+            staging_dir=get_staging_dir(self.url),
+            mirror_urls=mirror_urls,
+            min_speed=min_speed,
+        )
+        downloaded_file = self.download_task.run(self._on_download_progress, info=info)
+        try:
+            verify_sha256(self.download_task.sha256, self.expected_sha256)
+        except ChecksumMismatchError:
+            # 校验失败的文件不能留给下次续传或复用（它尚未写入缓存）
+            self.download_task.discard_target()
+            raise
+        self.upstream["sha256"] = self.download_task.sha256
+        return cache.put(
+            downloaded_file, source_url, validator, sha256=self.download_task.sha256
+        )
+
+    def _fetch_from_peers(self, cache, sha256):
+        """按上游给出的sha256从局域网节点获取文件，未启用或所有节点都没有时返回None"""
+        if not is_peer_cache_enabled():
+            return None
+        peers = get_peers()
+        if not peers:
+            return None
+        self.status_updated.emit("正在从局域网节点获取...")
+        # 传输中的文件放在暂存目录中，超过缓存上限未移入缓存时随暂存目录一起清理
+        result = fetch_from_peers(
+            peers,
+            cache,
+            sha256,
+            progress_callback=self._on_download_progress,
+            incoming_dir=get_staging_dir(self.url),
+        )
+        if result is None:
+            self.status_updated.emit("正在下载...")
+            return None
+        peer_file, self.upstream["sha256"] = result
+        return peer_file
+
+    def _use_cached_file(self, cached_file):
+        """使用缓存文件，下载阶段直接完成"""
+        self.status_updated.emit("使用已缓存的文件...")
+        # 缓存的blob以sha256命名
+        self.upstream["sha256"] = cached_file.name
+        size = cached_file.stat().st_size
+        self._on_download_progress(size, size)
+        return cached_file
+
+    def _use_local_file(self):
+        """校验本地压缩包，作为下载结果直接使用"""
+        if not self.local_file.is_file():
+            raise Exception(f"本地文件不存在: {self.local_file}")
+        extracted_size = None
+        if self.extract_members:
+            extracted_size = extracted_members_size(self.local_file, self.extract_members)
+        self._check_disk_space(
+            self.local_file.stat().st_size, keep_archive=False, extracted_size=extracted_size
+        )
+        sha256 = compute_sha256(self.local_file, self._on_download_progress)
+        verify_sha256(sha256, self.expected_sha256)
+        if not self.expected_sha256:
+            print("没有找到校验文件，跳过校验")
+        self.upstream = {"local_file": str(self.local_file), "sha256": sha256}
+        return self.local_file
+
+    def _select_source(self):
+        """选择下载源，返回(地址, 探测信息, 备用镜像, 切换镜像的速度下限)"""
+        if len(self.mirrors) <= 1:
+            return self.url, probe_download(self.url), [], 0
+
+        self.status_updated.emit("正在选择最快的下载源...")
+        ranked = MirrorProber().rank(self.mirrors)
+        for best in ranked:
+            try:
+                info = probe_download(best["url"])
+                break
+            except requests.RequestException as e:
+                print(f"下载源不可用 {best['url']}: {e}")
+        else:
+            raise requests.ConnectionError("所有下载源均不可用")
+
+        # 只有文件大小一致的镜像才能在下载中途接替
+        mirror_urls = [
+            result["url"]
+            for result in ranked
+            if result["url"] != best["url"] and result["total_size"] == info["total_size"]
+        ]
+        print(f"选择下载源: {best['url']}")
+        self.status_updated.emit("正在下载...")
+        return best["url"], info, mirror_urls, best["throughput"] * SLOW_SOURCE_RATIO
+
+    def _record_upstream(self, source_url, resolved_url, headers):
+        """记录上游产物的版本信息"""
+        self.upstream = {
+            "source_url": source_url,
+            "resolved_url": resolved_url,
+            "etag": headers.get("ETag", ""),
+            "last_modified": headers.get("Last-Modified", ""),
+        }
+
+    def _check_disk_space(self, download_size, keep_archive=True, download_dir=None, extracted_size=None):
+        """下载前检查暂存目录和安装目录所在磁盘的剩余空间，避免传输到一半才发现磁盘已满
+
+        extracted_size 为已知的解压后大小，为None时按压缩包大小估计。
+        """
+        if download_size <= 0:
+            return
+        footprint = estimate_footprint(download_size, keep_archive, extracted_size)
+        check_disk_space({
+            download_dir or get_staging_root(): footprint["download"],
+            self.install_dir.parent: footprint["extracted"],
+        })
+
+    def _pre_download_extracted_size(self):
+        """下载前为解压预留的大小
+
+        只解压部分成员的zip，所选成员的大小在下载后从中央目录读取并精确检查，
+        下载前不按整个压缩包预留；其余情况返回None，按压缩比估计。
+        """
+        if self.extract_members and Path(urlparse(self.url).path).suffix.lower() == ".zip":
+            return 0
+        return None
+
+    def _check_extract_space(self, extracted_size):
+        """解压前按所选成员的实际大小检查安装目录所在磁盘的剩余空间"""
+        check_disk_space({self.install_dir.parent: extracted_size})
+
+    def _on_download_progress(self, downloaded_size, total_size):
+        """下载、解压、安装各阶段共用的进度回调，可能来自多个线程"""
+        self.progress.update(downloaded_size, total_size)
+
+    def _emit_progress(self, info):
+        """由进度汇总器按固定帧率调用"""
+        self.progress_updated.emit(info["percent"])
+        self.progress_info_updated.emit(info)
+
+    def _stream_download_and_extract(self):
+        """边下载边解压，服务器不支持所需的读取方式时返回None"""
+        if self.temp_dir is None:
+            raise Exception("临时目录未初始化")
+
+        extract_dir = self.temp_dir / "extracted"
+        extract_dir.mkdir(exist_ok=True)
+
+        if is_tar_url(self.url):
+            # tar包顺序解压，直接读取HTTP响应流
+            response = get_session().get(self.url, stream=True)
+            response.raise_for_status()
+            self._record_upstream(self.url, response.url, response.headers)
+            response.raw.decode_content = True
+            total_size = int(response.headers.get("content-length", 0))
+            self._check_disk_space(total_size, keep_archive=False)
+            with response:
+                sha256, self.extracted_files = extract_tar_stream(
+                    response.raw,
+                    extract_dir,
+                    total_size,
+                    self._on_download_progress,
+                    self.extract_members,
+                )
+            verify_sha256(sha256, self.expected_sha256)
+            self.upstream["sha256"] = sha256
+            return extract_dir
+
+        if self.expected_sha256:
+            # zip按成员跳读，无法在流式解压时计算整个文件的哈希
+            print("需要校验sha256，改为先下载再解压")
+            return None
+
+        # zip包先用范围请求取尾部的中央目录，再按成员顺序流式读取
+        info = probe_download(self.url)
+        self.upstream = {
+            "source_url": self.url,
+            "resolved_url": info["url"],
+            "etag": info["etag"],
+            "last_modified": info["last_modified"],
+        }
+        if not info["accept_ranges"]:
+            print("服务器不支持范围请求，改为先下载再解压")
+            return None
+        self._check_disk_space(
+            info["total_size"], keep_archive=False, extracted_size=0 if self.extract_members else None
+        )
+        with HttpRangeFile(info["url"], info["total_size"]) as remote_file:
+            if self.extract_members:
+                self._check_extract_space(zip_members_size(remote_file, self.extract_members))
+            self.extracted_files = extract_zip(
+                remote_file, extract_dir, self._on_download_progress, self.extract_members
+            )
+            print(f"流式解压完成，共传输 {remote_file.bytes_fetched} 字节")
+        return extract_dir
+
     def _extract_file(self, file_path):
         """解压文件"""
         if self.temp_dir is None:
@@ -156,39 +640,35 @@ class SmartDownloadManager(QThread):
         extract_dir = self.temp_dir / "extracted"
         extract_dir.mkdir(exist_ok=True)
 
-        with zipfile.ZipFile(file_path, "r") as zip_ref:
-            zip_ref.extractall(extract_dir)
+        if self.extract_members:
+            # 只解压部分成员时按其实际大小检查，压缩包目录中读不到大小时
+            # 下载前已按压缩比检查过
+            extracted_size = extracted_members_size(Path(file_path), self.extract_members)
+            if extracted_size is not None:
+                self._check_extract_space(extracted_size)
+
+        self.extracted_files = extract_archive(
+            Path(file_path), extract_dir, self._on_download_progress, self.extract_members
+        )
+        if self.extract_members and not self.extracted_files:
+            raise Exception("压缩包中没有找到所需的文件")
+        print(f"解压了 {len(self.extracted_files)} 个文件")
 
         return extract_dir
 
     def _install_to_permanent_location(self, extracted_dir):
         """安装到永久位置"""
-        # 获取当前项目的根目录
-        # 从当前文件路径向上查找，直到找到包含pyproject.toml的目录
+        # 在项目根目录创建与工具同名的目录，例如 ./ffmpeg
+        print(f"安装到项目根目录: {self.install_dir}")
 
-        
-        # 在项目根目录创建ffmpeg目录
-        install_dir = Path() / "ffmpeg"
-        print(f"安装到项目根目录: {install_dir}")
-        
-        # 创建安装目录
-        install_dir.mkdir(parents=True, exist_ok=True)
-        print(f"安装目录已创建: {install_dir}")
-
-        # 复制文件
-        if extracted_dir.exists():
-            print(f"开始复制文件，源目录: {extracted_dir}")
-            for item in extracted_dir.iterdir():
-                print(f"复制项目: {item.name}")
-                if item.is_dir():
-                    shutil.copytree(item, install_dir / item.name, dirs_exist_ok=True)
-                else:
-                    shutil.copy2(item, install_dir)
-            print(f"文件复制完成，目标目录: {install_dir}")
-        else:
-            print(f"警告：解压目录不存在: {extracted_dir}")
+        if not extracted_dir.exists():
+            raise Exception(f"解压目录不存在: {extracted_dir}")
+
+        # 临时目录与安装目录位于同一文件系统时只需一次重命名
+        install_directory(extracted_dir, self.install_dir, self._on_download_progress)
+        print(f"安装完成，目标目录: {self.install_dir}")
 
-        return install_dir
+        return self.install_dir
 
     def _configure_path(self, permanent_dir):
         """配置PATH环境变量"""
@@ -226,7 +706,7 @@ class SmartDownloadManager(QThread):
                 winreg.CloseKey(key)
 
                 # 刷新环境变量
-                self._refresh_environment_variables()
+                self._refresh_environment_variables(path_to_add)
                 print(f"已成功将 {path_to_add} 添加到系统PATH")
 
         except Exception as e:
@@ -246,113 +726,66 @@ class SmartDownloadManager(QThread):
                     new_path = current_path + ";" + path_to_add
                     winreg.SetValueEx(key, "Path", 0, winreg.REG_EXPAND_SZ, new_path)
                     winreg.CloseKey(key)
-                    self._refresh_environment_variables()
+                    self._refresh_environment_variables(path_to_add)
                     print(f"已成功将 {path_to_add} 添加到用户PATH")
             except Exception as e2:
                 print(f"配置用户PATH也失败: {e2}")
 
     def _configure_unix_path(self, permanent_dir):
-        """配置Unix PATH"""
-        try:
-            # 尝试写入系统级别的PATH配置文件
-            system_path_files = [
-                "/etc/environment",  # 系统环境变量
-                "/etc/profile",      # 系统profile
-            ]
-            
-            path_to_add = str(permanent_dir)
-            success = False
-            
-            for path_file in system_path_files:
-                try:
-                    if os.path.exists(path_file):
-                        with open(path_file, "r") as f:
-                            content = f.read()
-                        
-                        if path_to_add not in content:
-                            # 添加到系统PATH
-                            export_line = f'\nexport PATH="$PATH:{path_to_add}"\n'
-                            with open(path_file, "a") as f:
-                                f.write(export_line)
-                            
-                            print(f"已成功将 {path_to_add} 添加到系统PATH文件: {path_file}")
-                            success = True
-                            break
-                except Exception as e:
-                    print(f"写入系统PATH文件 {path_file} 失败: {e}")
-                    continue
-            
-            if not success:
-                print("系统PATH配置失败，尝试用户级配置...")
-                # 备选方案：使用用户shell配置文件
-                rc_file = self._get_shell_rc_file()
-                if rc_file:
-                    with open(rc_file, "r") as f:
-                        content = f.read()
-
-                    if path_to_add not in content:
-                        export_line = f'\nexport PATH="$PATH:{path_to_add}"\n'
-                        with open(rc_file, "a") as f:
-                            f.write(export_line)
-                        print(f"已成功将 {path_to_add} 添加到用户PATH文件: {rc_file}")
-
-            # 刷新当前进程的环境变量
-            self._refresh_environment_variables()
+        """配置Unix PATH
 
+        可执行文件链接到工具入口目录，入口目录只在第一次安装时加入PATH，
+        之后安装新工具或切换版本都不再修改配置文件，也不需要启动shell。
+        """
+        try:
+            shim_dir = get_shim_dir()
+            # 只链接工具的主程序，不链接pip3、2to3、python3-config等附带的程序
+            link_tools(permanent_dir, shim_dir, self._entry_point_names())
+            # 同时清理旧版本直接把bin目录追加到PATH的行
+            install_path_block(shim_dir, legacy_dirs=[str(permanent_dir)])
+            add_to_process_path(shim_dir)
         except Exception as e:
             print(f"配置Unix PATH失败: {e}")
 
-    def _refresh_environment_variables(self):
-        """刷新环境变量"""
+    def _refresh_environment_variables(self, path_dir):
+        """刷新环境变量，path_dir 为新加入PATH的目录"""
+        # 当前进程直接修改自己的环境变量
+        add_to_process_path(path_dir)
         try:
-            if platform.system() == "Windows":
-                # Windows: 使用更安全的方式通知环境变量更改
-                # 避免使用SendMessageW，因为它可能导致应用程序卡住
-                import ctypes
-                from ctypes import wintypes
-                
-                # 使用WM_SETTINGCHANGE消息，但只发送到当前进程
-                HWND_BROADCAST = 0xFFFF
-                WM_SETTINGCHANGE = 0x001A
-                
-                # 使用PostMessage而不是SendMessage，避免阻塞
-                try:
-                    ctypes.windll.user32.PostMessageW(
-                        HWND_BROADCAST, 
-                        WM_SETTINGCHANGE, 
-                        0, 
-                        0
-                    )
-                except Exception:
-                    # 如果PostMessage失败，静默忽略，不影响下载流程
-                    pass
-            else:
-                # Unix: 重新加载shell配置
-                os.environ["PATH"] = (
-                    subprocess.check_output(["bash", "-c", "echo $PATH"])
-                    .decode()
-                    .strip()
+            # Windows: 使用更安全的方式通知环境变量更改
+            # 避免使用SendMessageW，因为它可能导致应用程序卡住
+            import ctypes
+            from ctypes import wintypes
+            
+            # 使用WM_SETTINGCHANGE消息，但只发送到当前进程
+            HWND_BROADCAST = 0xFFFF
+            WM_SETTINGCHANGE = 0x001A
+            
+            # 使用PostMessage而不是SendMessage，避免阻塞
+            try:
+                ctypes.windll.user32.PostMessageW(
+                    HWND_BROADCAST, 
+                    WM_SETTINGCHANGE, 
+                    0, 
+                    0
                 )
+            except Exception:
+                # 如果PostMessage失败，静默忽略，不影响下载流程
+                pass
         except Exception as e:
             print(f"刷新环境变量失败: {e}")
 
-    def _get_shell_rc_file(self):
-        """获取shell配置文件路径"""
-        home = Path.home()
-        shell = os.environ.get("SHELL", "")
-
-        if "bash" in shell:
-            return home / ".bashrc"
-        elif "zsh" in shell:
-            return home / ".zshrc"
-        elif "fish" in shell:
-            return home / ".config" / "fish" / "config.fish"
-        else:
-            # 默认使用bash
-            return home / ".bashrc"
-
     def _find_bin_directory(self, base_dir: Path):
         """查找bin目录"""
+        # 按解压清单记录的文件直接定位，无需遍历目录；优先取主程序所在的目录，
+        # 有多个同名文件时（例如Python的venv模板中的python.exe）取层级最浅的
+        if self.extracted_files:
+            names = self._main_binary_names()
+            main_files = [name for name in self.extracted_files if Path(name).name.lower() in names]
+            if main_files:
+                return base_dir / Path(min(main_files, key=lambda name: len(Path(name).parts))).parent
+            return base_dir / Path(self.extracted_files[0]).parent
+
         # 首先查找标准的bin目录
         for item in base_dir.rglob("bin"):
             if item.is_dir():
@@ -366,26 +799,108 @@ class SmartDownloadManager(QThread):
         # 如果还是找不到，返回base_dir本身
         return base_dir
 
+    def _find_main_binary(self, permanent_dir):
+        """查找工具的主程序，例如 ffmpeg.exe"""
+        bin_dir = self._find_bin_directory(permanent_dir)
+        for name in self._main_binary_names():
+            binary = bin_dir / name
+            if binary.is_file():
+                return binary
+        return None
+
+    def _entry_point_names(self):
+        """加入PATH的入口：主程序，FFmpeg再加上ffprobe"""
+        names = self._main_binary_names()
+        if self.target_name.lower() == "ffmpeg":
+            names += [name.replace("ffmpeg", "ffprobe") for name in names]
+        return names
+
+    def _main_binary_names(self):
+        """主程序可能的文件名，预编译的Python在Linux和macOS上只有python3"""
+        name = self.target_name.lower()
+        if platform.system() == "Windows":
+            return [f"{name}.exe"]
+        return [name, f"{name}3"] if name == "python" else [name]
+
+    def _get_binary_version(self, binary):
+        """安装时运行一次主程序获取版本，之后检测直接读取登记信息"""
+        version_flag = "--version" if self.target_name.lower() == "python" else "-version"
+        try:
+            result = subprocess.run(
+                [str(binary), version_flag], capture_output=True, text=True, timeout=5
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"获取版本失败: {e}")
+            return ""
+        output = result.stdout.strip() or result.stderr.strip()
+        return output.split("\n")[0] if output else ""
+
+    def _get_installed_size(self, permanent_dir):
+        """计算安装后的总大小"""
+        if self.extracted_files:
+            paths = [permanent_dir / name for name in self.extracted_files]
+        else:
+            paths = [
+                Path(root) / name
+                for root, _, names in os.walk(permanent_dir)
+                for name in names
+            ]
+        return sum(path.stat().st_size for path in paths if path.is_file())
+
     def _save_installation_info(self, permanent_dir):
-        """保存安装信息"""
+        """保存安装信息到配置目录下的安装登记表"""
+        # 重定向后的地址（例如GitHub的签名下载地址）会过期，检查更新时使用下载时请求的地址
+        release_tag = resolve_release_tag(
+            self.upstream.get("source_url", ""), self.upstream.get("resolved_url", "")
+        )
+        binary = self._find_main_binary(permanent_dir)
+        version = self._get_binary_version(binary) if binary else ""
         info = {
+            "name": self.target_name,
             "install_dir": str(permanent_dir),
             "install_time": datetime.datetime.now().isoformat(),
-            "version": "1.0.0",
+            "version": version or release_tag or "unknown",
+            "binary": str(binary) if binary else "",
+            "bin_dir": str(binary.parent) if binary else "",
+            "size": self._get_installed_size(permanent_dir),
+            "url": self.url,
+            "source_url": self.upstream.get("source_url", ""),
+            "etag": self.upstream.get("etag", ""),
+            "last_modified": self.upstream.get("last_modified", ""),
+            "release_tag": release_tag,
+            "sha256": self.upstream.get("sha256", ""),
+            "local_file": self.upstream.get("local_file", ""),
+            # 记录解压出的文件，之后查找可执行文件时无需遍历目录
+            "files": self.extracted_files,
         }
-
-        info_file = permanent_dir / "install_info.json"
-        with open(info_file, "w") as f:
-            json.dump(info, f, indent=2)
+        InstallRegistry().register(self.target_name, info)
 
 
 class SmartDownloadDialog:
     """智能下载对话框 - 使用全局弹窗系统"""
 
-    def __init__(self, url, target_name, parent=None):
+    def __init__(
+        self,
+        url,
+        target_name,
+        parent=None,
+        expected_sha256=None,
+        checksum_url=None,
+        mirrors=None,
+        extract_members=None,
+        local_file=None,
+        resume_state=None,
+    ):
         self.url = url
         self.target_name = target_name
         self.parent = parent
+        self.expected_sha256 = expected_sha256
+        self.checksum_url = checksum_url
+        self.mirrors = mirrors
+        self.extract_members = extract_members
+        self.local_file = local_file
+        # 上次未完成的安装的检查点
+        self.resume_state = resume_state
         self.download_manager = None
         self.progress_dialog = None
 
@@ -394,7 +909,7 @@ class SmartDownloadDialog:
         # 创建进度条弹窗
         from src.gui.widgets.global_dialog import ProgressDialog
         self.progress_dialog = ProgressDialog(
-            f"下载 {self.target_name}",
+            f"{'安装' if self.local_file else '下载'} {self.target_name}",
             "正在准备下载...",
             self.parent
         )
@@ -413,10 +928,19 @@ class SmartDownloadDialog:
             self.download_manager.wait()
         
         # 创建新的下载管理器
-        self.download_manager = SmartDownloadManager(self.url, self.target_name)
+        self.download_manager = SmartDownloadManager(
+            self.url,
+            self.target_name,
+            expected_sha256=self.expected_sha256,
+            checksum_url=self.checksum_url,
+            mirrors=self.mirrors,
+            extract_members=self.extract_members,
+            local_file=self.local_file,
+            resume_state=self.resume_state,
+        )
         
         # 连接进度信号到进度条
-        self.download_manager.progress_updated.connect(self.progress_dialog.set_progress)
+        self.download_manager.progress_info_updated.connect(self.progress_dialog.set_progress_info)
         self.download_manager.status_updated.connect(self.progress_dialog.set_status)
         self.download_manager.download_finished.connect(self.on_download_finished)
         
@@ -439,18 +963,88 @@ class SmartDownloadDialog:
             
             result = show_multi_button_dialog(
                 "下载失败",
-                f"下载过程中出现错误：{message}\n\n请检查网络连接后重试。",
+                f"下载过程中出现错误：{message}\n\n请检查网络连接后重试，已下载的部分将继续使用。",
                 buttons,
                 self.parent
             )
             
             if result == "重试":
-                # 重新开始下载
-                self.start_download()
+                # 重新打开进度弹窗，从上次完成的阶段和下载断点继续
+                self.resume_state = InstallStateStore().load(self.target_name)
+                self.exec()
+
 
 
 
 
+class ArtifactDetailsFetcher(QThread):
+    """在后台获取产物的实际大小和sha256，用于下载前向用户展示占用空间"""
+
+    details_fetched = Signal(dict)
+
+    def __init__(self, artifact):
+        super().__init__()
+        self.artifact = artifact
+
+    def run(self):
+        # 离线产物目录中已有该构建时不需要联网
+        local_file = find_offline_artifact(self.artifact)
+        if local_file:
+            details = {"expected_size": local_file.stat().st_size, "expected_sha256": None}
+        else:
+            details = fetch_artifact_details(self.artifact)
+        details["local_file"] = str(local_file) if local_file else ""
+        self.details_fetched.emit(details)
+
+
+class InterpreterScanner(QThread):
+    """在后台扫描本机所有的Python解释器"""
+
+    scan_finished = Signal(list)
+
+    def run(self):
+        try:
+            inventory = scan_interpreters()
+        except Exception as e:
+            print(f"扫描解释器失败: {e}")
+            inventory = []
+        self.scan_finished.emit(inventory)
+
+
+class VersionTableItem(QTableWidgetItem):
+    """按版本号而不是字符串排序的表格项，3.9 排在 3.11 之前"""
+
+    def __lt__(self, other):
+        return parse_version(self.text()) < parse_version(other.text())
+
+
+class ToolchainUpdateChecker(QThread):
+    """工具链更新检查器"""
+
+    check_finished = Signal(bool, bool, str)  # success, update_available, message
+
+    def __init__(self, target_name):
+        super().__init__()
+        self.target_name = target_name
+
+    def run(self):
+        install_info = InstallRegistry().get(self.target_name)
+        if install_info is None:
+            self.check_finished.emit(False, False, f"{self.target_name} 不是通过本程序安装的，无法检查更新")
+            return
+        try:
+            update_available = check_for_update(install_info)
+        except Exception as e:
+            print(f"检查更新失败: {e}")
+            self.check_finished.emit(False, False, f"检查更新失败: {e}")
+            return
+
+        version = install_info.get("version") or install_info.get("install_time", "")
+        if update_available:
+            self.check_finished.emit(True, True, f"{self.target_name} 有新版本可用（当前版本: {version}）")
+        else:
+            self.check_finished.emit(True, False, f"{self.target_name} 已是最新版本（{version}）")
+
 
 class EnvironmentDetector(QThread):
     """环境检测器"""
@@ -465,74 +1059,91 @@ class EnvironmentDetector(QThread):
         self.ffmpeg_path = ""
         self.detect_python_only = False
         self.detect_ffmpeg_only = False
+        # 后台重新检测上次的结果，结果不变时不发出信号
+        self.revalidate = False
+        self.registry = InstallRegistry()
+        self.cache = DetectionCache()
 
     def run(self):
-        """运行检测"""
-        if self.detect_python_only:
-            self.auto_detect_python()
-        elif self.detect_ffmpeg_only:
-            self.auto_detect_ffmpeg()
-        else:
-            # 默认检测两个
-            self.auto_detect_python()
-            self.auto_detect_ffmpeg()
+        """运行检测，Python和FFmpeg同时检测，各自的结果一确定就发出"""
+        tools = []
+        if not self.detect_ffmpeg_only:
+            tools.append("python")
+        if not self.detect_python_only:
+            tools.append("ffmpeg")
+
+        candidates = {}
+        for tool in tools:
+            # 本程序安装的工具直接读取登记信息，无需启动子进程
+            entry = self.registry.resolve(tool)
+            if entry:
+                self._emit_result(tool, True, entry["binary"], entry["version"])
+            else:
+                candidates[tool] = self._get_candidates(tool)
+
+        python_candidates = candidates.pop("python", None)
+        thread = None
+        if candidates:
+            thread = threading.Thread(target=self._probe_tools, args=(candidates,), daemon=True)
+            thread.start()
+        if python_candidates is not None:
+            self._detect_python(python_candidates)
+        if thread:
+            thread.join()
         self.detection_finished.emit()
 
-    def auto_detect_python(self):
-        """自动检测Python"""
+    def _probe_tools(self, candidates):
+        """并发运行各工具候选的版本命令"""
         try:
-            # 检查系统PATH中的Python
-            result = subprocess.run(
-                ["python", "--version"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                version = result.stdout.strip() or result.stderr.strip()
-                # 获取python命令的完整路径
-                python_path = shutil.which("python")
-                if python_path:
-                    # 强制转换为小写扩展名
-                    normalized_path = self._normalize_path(python_path)
-                    self.python_detected.emit(True, normalized_path, version)
-                else:
-                    self.python_detected.emit(True, "python", version)
-                return
+            probe_concurrently(candidates, self._emit_result, cache=self.cache)
+        except Exception as e:
+            for tool in candidates:
+                self._emit_failure(tool, f"检测失败: {str(e)}")
 
-            # 检查python3
-            result = subprocess.run(
-                ["python3", "--version"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                version = result.stdout.strip() or result.stderr.strip()
-                # 获取python3命令的完整路径
-                python_path = shutil.which("python3")
-                if python_path:
-                    # 强制转换为小写扩展名
-                    normalized_path = self._normalize_path(python_path)
-                    self.python_detected.emit(True, normalized_path, version)
-                else:
-                    self.python_detected.emit(True, "python3", version)
-                return
+    def _detect_python(self, candidates):
+        """内省候选解释器（每个只启动一次），选出最适合运行真寻Bot的一个
 
-            # 检查py命令（Windows）
-            if platform.system() == "Windows":
-                result = subprocess.run(
-                    ["py", "--version"], capture_output=True, text=True, timeout=5
-                )
-                if result.returncode == 0:
-                    version = result.stdout.strip() or result.stderr.strip()
-                    # 获取py命令的完整路径
-                    python_path = shutil.which("py")
-                    if python_path:
-                        # 强制转换为小写扩展名
-                        normalized_path = self._normalize_path(python_path)
-                        self.python_detected.emit(True, normalized_path, version)
-                    else:
-                        self.python_detected.emit(True, "py", version)
-                    return
-
-            # 检查常见安装路径
-            common_paths = []
+        先只内省PATH和常见安装路径中的候选，其中有可以直接使用的解释器时
+        不再扫描；否则再内省PATH和各版本管理工具中的其他解释器。两轮都先
+        从安装目录读取版本，筛掉版本不受支持的，不为它们启动子进程。
+        """
+        paths = skip_incompatible([path for path, _ in candidates])
+        try:
+            infos = introspect_interpreters(paths)
+            ranked = rank_interpreters(paths, infos)
+            if not ranked or check_interpreter(ranked[0][1])[1]:
+                # 扫描目录不启动子进程
+                seen = {os.path.normcase(os.path.realpath(path)) for path, _ in candidates}
+                others = [item["path"] for item in find_interpreters() if item["real_path"] not in seen]
+                others = skip_incompatible(others)
+                if others:
+                    infos.update(introspect_interpreters(others))
+                    paths += others
+                    ranked = rank_interpreters(paths, infos)
+        except Exception as e:
+            self._emit_failure("python", f"检测失败: {str(e)}")
+            return
+        if not ranked:
+            self._emit_result("python", False, "", "")
+            return
+
+        path, info = ranked[0]
+        compatible, problems = check_interpreter(info)
+        print(f"共内省 {len(ranked)} 个解释器，选用: {path}（{info['version']}）")
+        if not compatible:
+            self._emit_failure("python", f"未找到兼容的Python，{'；'.join(problems)}")
+            return
+        version = f"Python {info['version']}"
+        if problems:
+            version += f"，{'；'.join(problems)}"
+        self._emit_result("python", True, path, version)
+
+    def _get_candidates(self, tool):
+        """按优先级列出候选：PATH中的命令在前，常见安装路径在后"""
+        if tool == "python":
+            names = ["python", "python3"]
             if platform.system() == "Windows":
+                names.append("py")
                 common_paths = [
                     r"C:\Python311\python.exe",
                     r"C:\Python310\python.exe",
@@ -547,54 +1158,9 @@ class EnvironmentDetector(QThread):
                     "/usr/local/bin/python3",
                     "/opt/homebrew/bin/python3",
                 ]
-
-            for path in common_paths:
-                if platform.system() == "Windows":
-                    path = os.path.expandvars(path)
-                if os.path.exists(path):
-                    try:
-                        result = subprocess.run(
-                            [path, "--version"],
-                            capture_output=True,
-                            text=True,
-                            timeout=5,
-                        )
-                        if result.returncode == 0:
-                            version = result.stdout.strip() or result.stderr.strip()
-                            # 强制转换为小写扩展名
-                            normalized_path = self._normalize_path(path)
-                            self.python_detected.emit(True, normalized_path, version)
-                            return
-                    except:
-                        pass
-
-            self.python_detected.emit(False, "未找到Python", "")
-
-        except Exception as e:
-            self.python_detected.emit(False, f"检测失败: {str(e)}", "")
-
-    def auto_detect_ffmpeg(self):
-        """自动检测FFmpeg"""
-        try:
-            # 检查系统PATH中的FFmpeg
-            result = subprocess.run(
-                ["ffmpeg", "-version"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                # 提取版本信息
-                version_line = result.stdout.split("\n")[0] if result.stdout else ""
-                # 获取ffmpeg命令的完整路径
-                ffmpeg_path = shutil.which("ffmpeg")
-                if ffmpeg_path:
-                    # 强制转换为小写扩展名
-                    normalized_path = self._normalize_path(ffmpeg_path)
-                    self.ffmpeg_detected.emit(True, normalized_path, version_line)
-                else:
-                    self.ffmpeg_detected.emit(True, "ffmpeg", version_line)
-                return
-
-            # 检查常见安装路径
-            common_paths = []
+            version_flag = "--version"
+        else:
+            names = ["ffmpeg"]
             if platform.system() == "Windows":
                 common_paths = [
                     r"C:\ffmpeg\bin\ffmpeg.exe",
@@ -607,35 +1173,27 @@ class EnvironmentDetector(QThread):
                     "/usr/local/bin/ffmpeg",
                     "/opt/homebrew/bin/ffmpeg",
                 ]
+            version_flag = "-version"
+        common_paths = [os.path.expandvars(path) for path in common_paths]
+        return build_candidates(names, common_paths, version_flag)
+
+    def _emit_result(self, tool, found, path, version):
+        """记录并发出检测结果，可能在探测线程中调用"""
+        if not found:
+            self._emit_failure(tool, "未找到Python" if tool == "python" else "未找到FFmpeg")
+            return
+        # 强制转换为小写扩展名
+        self._emit(tool, True, self._normalize_path(path), version)
 
-            for path in common_paths:
-                if platform.system() == "Windows":
-                    path = os.path.expandvars(path)
-                if os.path.exists(path):
-                    try:
-                        result = subprocess.run(
-                            [path, "-version"],
-                            capture_output=True,
-                            text=True,
-                            timeout=5,
-                        )
-                        if result.returncode == 0:
-                            version_line = (
-                                result.stdout.split("\n")[0] if result.stdout else ""
-                            )
-                            # 强制转换为小写扩展名
-                            normalized_path = self._normalize_path(path)
-                            self.ffmpeg_detected.emit(
-                                True, normalized_path, version_line
-                            )
-                            return
-                    except:
-                        pass
-
-            self.ffmpeg_detected.emit(False, "未找到FFmpeg", "")
+    def _emit_failure(self, tool, message):
+        self._emit(tool, False, message, "")
 
-        except Exception as e:
-            self.ffmpeg_detected.emit(False, f"检测失败: {str(e)}", "")
+    def _emit(self, tool, found, path, version):
+        changed = self.cache.set_tool(tool, found, path, version)
+        if self.revalidate and not changed:
+            return
+        signal = self.python_detected if tool == "python" else self.ffmpeg_detected
+        signal.emit(found, path, version)
 
     def _normalize_path(self, path):
         """标准化路径，确保扩展名为小写"""
@@ -654,6 +1212,11 @@ class EnvironmentPage(QWidget):
     def __init__(self):
         super().__init__()
         self.detector = EnvironmentDetector()
+        # 检测进行中又请求检测时记下请求，当前检测结束后再执行
+        self.pending_detection = None
+        self.update_checker = None
+        self.details_fetcher = None
+        self.interpreter_scanner = None
         self.setup_ui()
         self.setup_connections()
 
@@ -822,12 +1385,24 @@ class EnvironmentPage(QWidget):
         self.auto_detect_python_btn = AnimatedButton("自动检测")
         button_layout.addWidget(self.auto_detect_python_btn)
 
+        # 扫描全部解释器按钮
+        scan_btn = AnimatedButton("扫描全部")
+        scan_btn.setSecondaryStyle()
+        scan_btn.clicked.connect(self.scan_interpreters)
+        button_layout.addWidget(scan_btn)
+
         # 浏览按钮
         browse_btn = AnimatedButton("浏览")
         browse_btn.setSecondaryStyle()
         browse_btn.clicked.connect(self.browse_python_path)
         button_layout.addWidget(browse_btn)
 
+        # 离线安装按钮
+        offline_btn = AnimatedButton("离线安装")
+        offline_btn.setSecondaryStyle()
+        offline_btn.clicked.connect(self.install_python_offline)
+        button_layout.addWidget(offline_btn)
+
         # 添加按钮到表单
         button_label = QLabel("操作")
         button_label.setStyleSheet("""
@@ -860,6 +1435,36 @@ class EnvironmentPage(QWidget):
         """)
         form_layout.addRow(status_label, self.python_status_label)
 
+        # 本机所有的解释器，点击表头排序，双击选用
+        self.interpreter_table = QTableWidget(0, 4)
+        self.interpreter_table.setHorizontalHeaderLabels(["版本", "架构", "来源", "路径"])
+        self.interpreter_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.interpreter_table.verticalHeader().setVisible(False)
+        self.interpreter_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.interpreter_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.interpreter_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.interpreter_table.setSortingEnabled(True)
+        self.interpreter_table.setMinimumHeight(180)
+        self.interpreter_table.setVisible(False)
+        self.interpreter_table.setStyleSheet("""
+            QTableWidget {
+                border: 1px solid #ced4da;
+                border-radius: 6px;
+                font-size: 12px;
+                color: #495057;
+                background-color: white;
+            }
+            QHeaderView::section {
+                background-color: #f8f9fa;
+                border: none;
+                border-bottom: 1px solid #e1e5e9;
+                padding: 4px 8px;
+                font-size: 12px;
+            }
+        """)
+        self.interpreter_table.cellDoubleClicked.connect(self.on_interpreter_selected)
+        form_layout.addRow(self.interpreter_table)
+
         group.setLayout(form_layout)
         layout.addWidget(group)
 
@@ -942,6 +1547,18 @@ class EnvironmentPage(QWidget):
         browse_btn.clicked.connect(self.browse_ffmpeg_path)
         button_layout.addWidget(browse_btn)
 
+        # 离线安装按钮
+        offline_btn = AnimatedButton("离线安装")
+        offline_btn.setSecondaryStyle()
+        offline_btn.clicked.connect(self.install_ffmpeg_offline)
+        button_layout.addWidget(offline_btn)
+
+        # 检查更新按钮
+        self.check_ffmpeg_update_btn = AnimatedButton("检查更新")
+        self.check_ffmpeg_update_btn.setSecondaryStyle()
+        self.check_ffmpeg_update_btn.clicked.connect(self.check_ffmpeg_update)
+        button_layout.addWidget(self.check_ffmpeg_update_btn)
+
         # 添加按钮到表单
         button_label = QLabel("操作:")
         button_label.setStyleSheet("""
@@ -989,8 +1606,80 @@ class EnvironmentPage(QWidget):
         """页面显示事件"""
         super().showEvent(event)
 
+    def offer_resume_installs(self):
+        """启动时询问是否继续上次中断的安装"""
+        store = InstallStateStore()
+        resumed = False
+        for state in store.get_pending():
+            target_name = state["target_name"]
+            completed = state.get("completed")
+            if completed:
+                progress = f"已完成“{INSTALL_PHASE_NAMES.get(completed, completed)}”阶段"
+            else:
+                progress = "尚未完成任何阶段"
+            buttons = [
+                {"text": "继续安装", "type": "primary"},
+                {"text": "放弃", "type": "default"}
+            ]
+            result = show_multi_button_dialog(
+                "继续安装",
+                f"{target_name} 上次的安装没有完成（{progress}）。\n\n是否从中断处继续安装？",
+                buttons,
+                self,
+            )
+            if result != "继续安装":
+                store.discard(target_name)
+                continue
+            dialog = SmartDownloadDialog(
+                state["url"],
+                target_name,
+                self,
+                expected_sha256=state.get("expected_sha256"),
+                checksum_url=state.get("checksum_url"),
+                mirrors=state.get("mirrors"),
+                extract_members=state.get("extract_members"),
+                local_file=state.get("local_file") or None,
+                resume_state=state,
+            )
+            dialog.exec()
+            resumed = True
+        if resumed:
+            # 安装完成后重新检测环境
+            QTimer.singleShot(1000, self.start_detection)
+
+    def restore_detection(self):
+        """先显示上次的检测结果，再在后台重新检测，结果有变化时才更新"""
+        cache = DetectionCache()
+        python_entry = cache.get_tool("python")
+        if python_entry:
+            self.on_python_detected(python_entry["found"], python_entry["path"], python_entry["version"])
+        ffmpeg_entry = cache.get_tool("ffmpeg")
+        if ffmpeg_entry:
+            self.show_ffmpeg_status(ffmpeg_entry["found"], ffmpeg_entry["path"], ffmpeg_entry["version"])
+
+        if self.detector.isRunning():
+            return
+        self.detector.detect_python_only = False
+        self.detector.detect_ffmpeg_only = False
+        self.detector.revalidate = True
+        self.detector.start()
+
     def start_detection(self):
         """开始检测"""
+        self._start_detector(python_only=False, ffmpeg_only=False)
+
+    def _start_detector(self, python_only, ffmpeg_only):
+        """启动一次完整检测（不是后台重新检测）
+
+        检测线程仍在运行时（例如启动时的后台重新检测）QThread.start 不会
+        重新运行，此时排队，等当前检测结束后再检测，避免显示过时的结果。
+        """
+        if self.detector.isRunning():
+            self.pending_detection = (python_only, ffmpeg_only)
+            return
+        self.detector.detect_python_only = python_only
+        self.detector.detect_ffmpeg_only = ffmpeg_only
+        self.detector.revalidate = False
         self.detector.python_path = self.python_path_edit.text().strip()
         self.detector.ffmpeg_path = self.ffmpeg_path_edit.text().strip()
         self.detector.start()
@@ -1008,7 +1697,8 @@ class EnvironmentPage(QWidget):
                 }
             """)
         else:
-            self.python_status_label.setText(f"❌ 检测失败 ({version})")
+            # 失败时原因在路径一栏
+            self.python_status_label.setText(f"❌ 检测失败 ({version or path})")
             self.python_status_label.setStyleSheet("""
                 QLabel {
                     color: #dc3545;
@@ -1017,38 +1707,135 @@ class EnvironmentPage(QWidget):
                 }
             """)
 
+    def scan_interpreters(self):
+        """扫描本机所有的Python解释器"""
+        if self.interpreter_scanner and self.interpreter_scanner.isRunning():
+            return
+        self.python_status_label.setText("正在扫描解释器...")
+        self.interpreter_scanner = InterpreterScanner()
+        self.interpreter_scanner.scan_finished.connect(self.on_interpreters_scanned)
+        self.interpreter_scanner.start()
+
+    def on_interpreters_scanned(self, inventory):
+        """显示扫描到的解释器"""
+        table = self.interpreter_table
+        # 填充时关闭排序，否则每插入一项都会重新排序
+        table.setSortingEnabled(False)
+        table.setRowCount(len(inventory))
+        for row, item in enumerate(inventory):
+            table.setItem(row, 0, VersionTableItem(item["version"].replace("Python", "").strip()))
+            table.setItem(row, 1, QTableWidgetItem(item["arch"] or "未知"))
+            table.setItem(row, 2, QTableWidgetItem(item["source"]))
+            path_item = QTableWidgetItem(self._normalize_path(item["path"]))
+            path_item.setToolTip(item["real_path"])
+            table.setItem(row, 3, path_item)
+        table.setSortingEnabled(True)
+        table.setVisible(True)
+        self.python_status_label.setText(f"共找到 {len(inventory)} 个解释器，双击选用")
+
+    def on_interpreter_selected(self, row, column):
+        """选用列表中的解释器"""
+        version = self.interpreter_table.item(row, 0).text()
+        path = self.interpreter_table.item(row, 3).text()
+        self.on_python_detected(True, path, f"Python {version}")
+
+    def fetch_artifact_details(self, artifact, callback):
+        """在后台获取产物的大小，获取完成后调用 callback(details)"""
+        if self.details_fetcher and self.details_fetcher.isRunning():
+            return
+        self.details_fetcher = ArtifactDetailsFetcher(artifact)
+        self.details_fetcher.details_fetched.connect(callback)
+        self.details_fetcher.start()
+
+    def describe_footprint(self, artifact, details):
+        """下载前展示的占用空间，获取不到实际大小时使用登记的大致大小"""
+        size = details.get("expected_size") or artifact["approx_size"]
+        # 离线安装直接读取本地压缩包，不占用下载空间
+        footprint = estimate_footprint(size, keep_archive=not details.get("local_file"))
+        free_space = get_free_space(get_install_dir(artifact["name"]).parent)
+        return format_footprint(footprint, free_space)
+
     def show_python_download_dialog(self):
-        """显示Python下载对话框"""
-        buttons = [
-            {"text": "自动下载", "type": "primary"},
-            {"text": "手动下载", "type": "info"},
-            {"text": "取消", "type": "default"}
-        ]
-        
-        result = show_multi_button_dialog(
-            "Python未安装",
-            "检测到Python未安装，是否要下载并安装Python？",
-            buttons,
-            self,
+        """显示Python下载对话框，先获取下载大小"""
+        try:
+            artifact = get_python_artifact()
+        except Exception as e:
+            print(f"没有可自动下载的Python: {e}")
+            self.confirm_python_download(None, {})
+            return
+        self.fetch_artifact_details(
+            artifact, lambda details: self.confirm_python_download(artifact, details)
         )
 
-        if result == "自动下载":
-            self.download_python_3_11()
+    def confirm_python_download(self, artifact, details):
+        """确认是否下载Python，展示预计占用的磁盘空间"""
+        message = "检测到Python未安装，是否要下载并安装Python？"
+        buttons = [{"text": "手动下载", "type": "info"}, {"text": "取消", "type": "default"}]
+        if artifact:
+            message += f"\n\n{self.describe_footprint(artifact, details)}"
+            buttons.insert(0, {"text": "立即下载", "type": "primary"})
+
+        result = show_multi_button_dialog("Python未安装", message, buttons, self)
+
+        if result == "立即下载":
+            self.download_python_3_11(artifact, details)
         elif result == "手动下载":
             webbrowser.open("https://www.python.org/downloads/")
 
-    def download_python_3_11(self):
+    def download_python_3_11(self, artifact=None, details=None):
         """下载Python 3.11"""
-        if platform.system() == "Windows":
-            url = "https://www.python.org/ftp/python/3.11.0/python-3.11.0-amd64.exe"
-        else:
-            url = "https://www.python.org/ftp/python/3.11.0/Python-3.11.0.tgz"
+        details = details or {}
+        if artifact is None:
+            try:
+                artifact = get_python_artifact()
+            except Exception as e:
+                show_error_dialog("无法下载", str(e), self)
+                return
+        dialog = SmartDownloadDialog(
+            artifact["url"],
+            "Python",
+            self,
+            expected_sha256=details.get("expected_sha256"),
+            checksum_url=artifact["checksum_url"],
+            mirrors=artifact["mirrors"],
+            extract_members=artifact["extract_members"],
+            # 离线产物目录中已有该构建时直接从本地安装
+            local_file=details.get("local_file") or find_offline_artifact(artifact),
+        )
+        dialog.exec()
 
-        dialog = SmartDownloadDialog(url, "Python", self)
+    def install_python_offline(self):
+        """从本地压缩包离线安装Python"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择Python压缩包", "", ARCHIVE_FILE_FILTER
+        )
+        if not file_path:
+            return
+        try:
+            artifact = resolve_local_artifact(Path(file_path))
+        except Exception as e:
+            show_error_dialog("无法安装", str(e), self)
+            return
+        dialog = SmartDownloadDialog(
+            artifact["url"],
+            "Python",
+            self,
+            extract_members=artifact["extract_members"],
+            local_file=file_path,
+        )
         dialog.exec()
+        QTimer.singleShot(1000, self.auto_detect_python)
 
     def on_ffmpeg_detected(self, found, path, version):
         """FFmpeg检测结果"""
+        self.show_ffmpeg_status(found, path, version)
+        # 后台重新检测时不打扰用户，只更新状态
+        if not found and not self.detector.revalidate:
+            # 显示下载对话框
+            self.show_ffmpeg_download_dialog()
+
+    def show_ffmpeg_status(self, found, path, version):
+        """显示FFmpeg检测状态"""
         if found:
             self.ffmpeg_path_edit.setText(path)
             self.ffmpeg_status_label.setText(f"✅ 检测成功 ({version})")
@@ -1062,7 +1849,8 @@ class EnvironmentPage(QWidget):
                 }
             """)
         else:
-            self.ffmpeg_status_label.setText(f"❌ 检测失败 ({version})")
+            # 失败时原因在路径一栏
+            self.ffmpeg_status_label.setText(f"❌ 检测失败 ({version or path})")
             self.ffmpeg_status_label.setStyleSheet("""
                 QLabel {
                     color: #dc3545;
@@ -1072,25 +1860,19 @@ class EnvironmentPage(QWidget):
                     margin: 0;
                 }
             """)
-            # 显示下载对话框
-            self.show_ffmpeg_download_dialog()
 
     def check_and_add_ffmpeg_to_path(self, ffmpeg_path: str):
         """检查并添加FFmpeg到PATH"""
         try:
-            # 检查FFmpeg是否在PATH中
-            result = subprocess.run(
-                ["ffmpeg", "-version"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
+            # 检查FFmpeg是否在PATH中，只查找不运行
+            if shutil.which("ffmpeg"):
                 return True
 
             # 如果不在PATH中，尝试添加到PATH
-            ffmpeg_dir = str(Path(ffmpeg_path).parent)
             if platform.system() == "Windows":
-                self._add_ffmpeg_to_windows_path(ffmpeg_dir)
+                self._add_ffmpeg_to_windows_path(str(Path(ffmpeg_path).parent))
             else:
-                self._add_ffmpeg_to_unix_path(ffmpeg_dir)
+                self._add_ffmpeg_to_unix_path(Path(ffmpeg_path))
 
             return True
 
@@ -1120,94 +1902,94 @@ class EnvironmentPage(QWidget):
                 winreg.CloseKey(key)
 
                 # 刷新环境变量
-                self._refresh_current_process_environment()
+                self._refresh_current_process_environment(ffmpeg_dir)
 
         except Exception as e:
             print(f"添加FFmpeg到Windows PATH失败: {e}")
 
-    def _add_ffmpeg_to_unix_path(self, ffmpeg_dir: str):
-        """添加FFmpeg到Unix PATH"""
+    def _add_ffmpeg_to_unix_path(self, ffmpeg_path: Path):
+        """把FFmpeg链接到工具入口目录，入口目录已在PATH中时无需修改配置文件"""
         try:
-            # 获取shell配置文件
-            rc_file = self._get_shell_rc_file()
-            if not rc_file:
-                return
-
-            # 检查是否已经在PATH中
-            with open(rc_file, "r") as f:
-                content = f.read()
-
-            if ffmpeg_dir not in content:
-                # 添加到PATH
-                export_line = f'\nexport PATH="$PATH:{ffmpeg_dir}"\n'
-                with open(rc_file, "a") as f:
-                    f.write(export_line)
-
-                # 刷新当前进程的环境变量
-                self._refresh_current_process_environment()
+            shim_dir = get_shim_dir()
+            link_tool(ffmpeg_path, shim_dir)
+            ffprobe_path = ffmpeg_path.with_name(ffmpeg_path.name.replace("ffmpeg", "ffprobe"))
+            if ffprobe_path.is_file():
+                link_tool(ffprobe_path, shim_dir)
+            install_path_block(shim_dir, legacy_dirs=[str(ffmpeg_path.parent)])
+            add_to_process_path(shim_dir)
 
         except Exception as e:
             print(f"添加FFmpeg到Unix PATH失败: {e}")
 
-    def _get_shell_rc_file(self):
-        """获取shell配置文件路径"""
-        home = Path.home()
-        shell = os.environ.get("SHELL", "")
-
-        if "bash" in shell:
-            return home / ".bashrc"
-        elif "zsh" in shell:
-            return home / ".zshrc"
-        elif "fish" in shell:
-            return home / ".config" / "fish" / "config.fish"
-        else:
-            # 默认使用bash
-            return home / ".bashrc"
-
-    def _refresh_current_process_environment(self):
-        """刷新当前进程的环境变量"""
+    def _refresh_current_process_environment(self, path_dir):
+        """刷新当前进程的环境变量，path_dir 为新加入PATH的目录"""
+        # 当前进程直接修改自己的环境变量
+        add_to_process_path(path_dir)
         try:
-            if platform.system() == "Windows":
-                # Windows: 通知系统环境变量已更改
-                import ctypes
+            # Windows: 通知系统环境变量已更改
+            import ctypes
 
-                ctypes.windll.user32.SendMessageW(0xFFFF, 0x001A, 0, 0)
-            else:
-                # Unix: 重新加载shell配置
-                os.environ["PATH"] = (
-                    subprocess.check_output(["bash", "-c", "echo $PATH"])
-                    .decode()
-                    .strip()
-                )
+            ctypes.windll.user32.SendMessageW(0xFFFF, 0x001A, 0, 0)
         except Exception as e:
             print(f"刷新环境变量失败: {e}")
 
     def show_ffmpeg_download_dialog(self):
-        """显示FFmpeg下载对话框"""
+        """显示FFmpeg下载对话框，先获取下载大小"""
+        try:
+            artifact = get_ffmpeg_artifact()
+        except Exception as e:
+            show_error_dialog("无法下载", str(e), self)
+            return
+        self.fetch_artifact_details(
+            artifact, lambda details: self.confirm_ffmpeg_download(artifact, details)
+        )
+
+    def confirm_ffmpeg_download(self, artifact, details):
+        """确认是否下载FFmpeg，展示预计占用的磁盘空间"""
         buttons = [
-            {"text": "开始下载", "type": "primary"},
+            {"text": "立即下载", "type": "primary"},
             {"text": "取消", "type": "default"}
         ]
         
         result = show_multi_button_dialog(
             "FFmpeg未检测到",
-            "检测到您的系统中未安装FFmpeg。\n\nFFmpeg是处理音频和视频文件的重要工具，真寻Bot需要它来处理多媒体文件。\n\n是否要自动下载并安装FFmpeg？",
+            "检测到您的系统中未安装FFmpeg。\n\nFFmpeg是处理音频和视频文件的重要工具，真寻Bot需要它来处理多媒体文件。\n\n"
+            f"{self.describe_footprint(artifact, details)}\n\n是否要自动下载并安装FFmpeg？",
             buttons,
             self,
         )
 
         # 如果用户选择了下载，开始下载流程
-        if result == "开始下载":
+        if result == "立即下载":
+            self.start_ffmpeg_download()
+
+    def check_ffmpeg_update(self):
+        """在后台检查FFmpeg是否有更新"""
+        if self.update_checker and self.update_checker.isRunning():
+            return
+        self.check_ffmpeg_update_btn.setEnabled(False)
+        self.ffmpeg_status_label.setText("🔄 正在检查更新...")
+        self.update_checker = ToolchainUpdateChecker("FFmpeg")
+        self.update_checker.check_finished.connect(self.on_ffmpeg_update_checked)
+        self.update_checker.start()
+
+    def on_ffmpeg_update_checked(self, success, update_available, message):
+        """FFmpeg更新检查结果"""
+        self.check_ffmpeg_update_btn.setEnabled(True)
+        self.ffmpeg_status_label.setText(message)
+        if not success or not update_available:
+            return
+
+        buttons = [
+            {"text": "立即更新", "type": "primary"},
+            {"text": "稍后", "type": "default"}
+        ]
+        result = show_multi_button_dialog("发现新版本", f"{message}\n\n是否立即下载并安装？", buttons, self)
+        if result == "立即更新":
             self.start_ffmpeg_download()
 
     def start_ffmpeg_download(self):
         """开始FFmpeg下载流程"""
-        # 设置下载URL
-        if platform.system() == "Windows":
-            url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
-        else:
-            url = "https://evermeet.cx/ffmpeg/getrelease/zip"
-
         # 创建下载进度对话框
         download_dialog = FFmpegDownloadProgressDialog(self)
         download_dialog.exec()
@@ -1215,14 +1997,34 @@ class EnvironmentPage(QWidget):
         # 下载完成后重新检测FFmpeg
         QTimer.singleShot(1000, self.auto_detect_ffmpeg)
 
+    def install_ffmpeg_offline(self):
+        """从本地压缩包离线安装FFmpeg"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择FFmpeg压缩包", "", ARCHIVE_FILE_FILTER
+        )
+        if not file_path:
+            return
+        download_dialog = FFmpegDownloadProgressDialog(self, local_file=file_path)
+        download_dialog.exec()
+        QTimer.singleShot(1000, self.auto_detect_ffmpeg)
+
     def download_ffmpeg(self):
         """下载FFmpeg"""
-        if platform.system() == "Windows":
-            url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
-        else:
-            url = "https://evermeet.cx/ffmpeg/getrelease/zip"
-
-        dialog = SmartDownloadDialog(url, "FFmpeg", self)
+        try:
+            artifact = get_ffmpeg_artifact()
+        except Exception as e:
+            show_error_dialog("无法下载", str(e), self)
+            return
+        dialog = SmartDownloadDialog(
+            artifact["url"],
+            "FFmpeg",
+            self,
+            checksum_url=artifact["checksum_url"],
+            mirrors=artifact["mirrors"],
+            extract_members=artifact["extract_members"],
+            # 离线产物目录中已有该构建时直接从本地安装
+            local_file=find_offline_artifact(artifact),
+        )
         dialog.exec()
 
     def browse_python_path(self):
@@ -1304,20 +2106,22 @@ class EnvironmentPage(QWidget):
             self.on_ffmpeg_detected(False, f"检测失败: {str(e)}", "")
 
     def on_detection_finished(self):
-        """检测完成"""
-        pass
+        """检测完成，执行检测期间排队的检测"""
+        if self.pending_detection is None:
+            return
+        python_only, ffmpeg_only = self.pending_detection
+        self.pending_detection = None
+        # 信号在 run 返回前发出，等线程真正结束后才能再次启动
+        self.detector.wait()
+        self._start_detector(python_only, ffmpeg_only)
 
     def auto_detect_python(self):
         """自动检测Python"""
-        self.detector.detect_python_only = True
-        self.detector.detect_ffmpeg_only = False
-        self.detector.start()
+        self._start_detector(python_only=True, ffmpeg_only=False)
 
     def auto_detect_ffmpeg(self):
         """自动检测FFmpeg"""
-        self.detector.detect_python_only = False
-        self.detector.detect_ffmpeg_only = True
-        self.detector.start()
+        self._start_detector(python_only=False, ffmpeg_only=True)
 
     def _normalize_path(self, path):
         """标准化路径，确保扩展名为小写"""
@@ -1336,20 +2140,39 @@ class EnvironmentPage(QWidget):
 class FFmpegDownloadProgressDialog:
     """FFmpeg下载进度对话框 - 使用全局弹窗系统"""
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, local_file=None):
         self.parent = parent
         self.download_manager = None
         self.progress_dialog = None
+        self.artifact = None
+        # 离线安装使用的本地压缩包
+        self.local_file = Path(local_file) if local_file else None
+        self.resume_state = None
 
     def exec(self):
         """执行下载"""
+        if self.artifact is None:
+            # 按平台、架构选择构建，没有可用构建时不打开进度弹窗
+            try:
+                self._resolve_artifact()
+            except Exception as e:
+                show_error_dialog("无法下载", str(e), self.parent)
+                return
+
         # 创建进度条弹窗
         from src.gui.widgets.global_dialog import ProgressDialog
-        self.progress_dialog = ProgressDialog(
-            "正在下载FFmpeg",
-            "正在从官方源下载FFmpeg，请稍候...",
-            self.parent
-        )
+        if self.local_file:
+            self.progress_dialog = ProgressDialog(
+                "正在安装FFmpeg",
+                "正在从本地文件安装FFmpeg，请稍候...",
+                self.parent
+            )
+        else:
+            self.progress_dialog = ProgressDialog(
+                "正在下载FFmpeg",
+                "正在从官方源下载FFmpeg，请稍候...",
+                self.parent
+            )
         
         # 开始下载
         self.start_download()
@@ -1357,6 +2180,15 @@ class FFmpegDownloadProgressDialog:
         # 显示进度条弹窗
         self.progress_dialog.exec()
 
+    def _resolve_artifact(self):
+        """确定要安装的构建，离线产物目录中已有该构建时改为从本地安装"""
+        if self.local_file:
+            # 本地压缩包按文件名识别构建
+            self.artifact = resolve_local_artifact(self.local_file)
+            return
+        self.artifact = get_ffmpeg_artifact()
+        self.local_file = find_offline_artifact(self.artifact)
+
     def start_download(self):
         """开始下载"""
         # 如果已有下载管理器在运行，先停止它
@@ -1364,17 +2196,20 @@ class FFmpegDownloadProgressDialog:
             self.download_manager.quit()
             self.download_manager.wait()
         
-        # 设置下载URL
-        if platform.system() == "Windows":
-            url = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/ffmpeg-master-latest-win64-gpl.zip"
-        else:
-            url = "https://evermeet.cx/ffmpeg/getrelease/zip"
-
         # 创建新的下载管理器
-        self.download_manager = SmartDownloadManager(url, "FFmpeg")
+        artifact = self.artifact
+        self.download_manager = SmartDownloadManager(
+            artifact["url"],
+            "FFmpeg",
+            checksum_url=artifact["checksum_url"],
+            mirrors=artifact["mirrors"],
+            extract_members=artifact["extract_members"],
+            local_file=self.local_file,
+            resume_state=self.resume_state,
+        )
         
         # 连接进度信号到进度条
-        self.download_manager.progress_updated.connect(self.progress_dialog.set_progress)
+        self.download_manager.progress_info_updated.connect(self.progress_dialog.set_progress_info)
         self.download_manager.status_updated.connect(self.progress_dialog.set_status)
         self.download_manager.download_finished.connect(self.on_download_finished)
         
@@ -1407,15 +2242,16 @@ class FFmpegDownloadProgressDialog:
             
             result = show_multi_button_dialog(
                 "下载失败",
-                f"下载过程中出现错误：{message}\n\n请检查网络连接后重试。",
+                f"下载过程中出现错误：{message}\n\n请检查网络连接后重试，已下载的部分将继续使用。",
                 buttons,
                 self.parent
             )
             
             if result == "重试":
-                print("用户选择重试，重新开始下载...")
-                # 重新开始下载
-                self.start_download()
+                print("用户选择重试，从断点继续下载...")
+                # 重新打开进度弹窗，从上次完成的阶段和下载断点继续
+                self.resume_state = InstallStateStore().load("FFmpeg")
+                self.exec()
 
 
 
@@ -22,13 +22,33 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from src.gui.widgets import show_success_dialog
+from src.utils.artifact_cache import ArtifactCache
+from src.utils.config import ConfigManager
+from src.utils.http_client import reset_sessions
+from src.utils.peers import start_peer_server, stop_peer_server
+
+# 已接入配置文件的设置项
+PERSISTED_FIELDS = (
+    "download_connections",
+    "cache_size",
+    "proxy",
+    "offline_artifact_dir",
+    "peer_cache_enabled",
+    "peer_cache_port",
+    "lan_peers",
+)
+
 
 class SettingsPage(QWidget):
     """设置页面"""
 
     def __init__(self):
         super().__init__()
+        self.config_manager = ConfigManager()
+        self.form_fields = {}
         self.setup_ui()
+        self.load_settings()
 
     def setup_ui(self):
         """设置UI"""
@@ -255,8 +275,19 @@ class SettingsPage(QWidget):
                 ("启用硬件加速", "hardware_acceleration", True, "check"),
                 ("最大内存使用", "max_memory", "1024", "spin"),
                 ("缓存大小", "cache_size", "256", "spin"),
+                ("下载连接数", "download_connections", "4", "spin"),
+                ("下载代理", "proxy", "", "line"),
+                ("离线产物目录", "offline_artifact_dir", "", "line"),
+                ("局域网共享缓存", "peer_cache_enabled", False, "check"),
+                ("共享缓存端口", "peer_cache_port", "38766", "spin"),
+                ("局域网节点", "lan_peers", "", "line"),
             ],
         )
+        # 端口超出范围时共享缓存服务无法启动
+        self.form_fields["peer_cache_port"].setRange(1024, 65535)
+        # 0个连接无法拆分下载，0MB的缓存会在写入后立即淘汰
+        self.form_fields["cache_size"].setMinimum(1)
+        self.form_fields["download_connections"].setMinimum(1)
         scroll_layout.addWidget(performance_group)
 
         # 调试设置配置组
@@ -320,6 +351,7 @@ class SettingsPage(QWidget):
             if len(field) == 4:
                 label_text, field_name, default_value, field_type = field
                 widget = self.create_form_field(field_type, default_value)
+                self.form_fields[field_name] = widget
 
                 # 创建标签
                 label = QLabel(label_text)
@@ -462,8 +494,53 @@ class SettingsPage(QWidget):
             }
         """)
 
+        reset_btn.clicked.connect(self.reset_settings)
+        save_btn.clicked.connect(self.save_settings)
+
         button_layout.addWidget(reset_btn)
         button_layout.addStretch()
         button_layout.addWidget(save_btn)
 
         layout.addLayout(button_layout)
+
+    def load_settings(self):
+        """从配置文件加载设置"""
+        for field_name in PERSISTED_FIELDS:
+            widget = self.form_fields.get(field_name)
+            if isinstance(widget, QSpinBox):
+                widget.setValue(int(self.config_manager.get(field_name, widget.value())))
+            elif isinstance(widget, QLineEdit):
+                widget.setText(str(self.config_manager.get(field_name, widget.text())))
+            elif isinstance(widget, QCheckBox):
+                widget.setChecked(bool(self.config_manager.get(field_name, widget.isChecked())))
+
+    def reset_settings(self):
+        """恢复默认设置（保存后生效）"""
+        for field_name in PERSISTED_FIELDS:
+            widget = self.form_fields.get(field_name)
+            if isinstance(widget, QSpinBox):
+                widget.setValue(int(self.config_manager.default_config[field_name]))
+            elif isinstance(widget, QLineEdit):
+                widget.setText(str(self.config_manager.default_config[field_name]))
+            elif isinstance(widget, QCheckBox):
+                widget.setChecked(bool(self.config_manager.default_config[field_name]))
+
+    def save_settings(self):
+        """保存设置"""
+        for field_name in PERSISTED_FIELDS:
+            widget = self.form_fields.get(field_name)
+            if isinstance(widget, QSpinBox):
+                self.config_manager.set(field_name, widget.value())
+            elif isinstance(widget, QLineEdit):
+                self.config_manager.set(field_name, widget.text().strip())
+            elif isinstance(widget, QCheckBox):
+                self.config_manager.set(field_name, widget.isChecked())
+
+        # 代理设置可能变化，之后的请求使用新建的会话
+        reset_sessions()
+        # 按新的共享缓存设置重启服务
+        stop_peer_server()
+        start_peer_server()
+        # 缓存上限可能变小，立即按新上限淘汰
+        ArtifactCache().evict()
+        show_success_dialog("保存成功", "设置已保存", self)
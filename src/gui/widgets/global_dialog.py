@@ -19,6 +19,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from src.utils.progress import format_progress_detail
+
 
 class GlobalDialog(QDialog):
     """通用全局弹窗组件 - 支持多按钮"""
@@ -527,6 +529,17 @@ class ProgressDialog(GlobalDialog):
             }
         """)
         
+        # 创建速度和剩余时间标签
+        self.detail_label = QLabel()
+        self.detail_label.setStyleSheet("""
+            QLabel {
+                color: #718096;
+                font-size: 12px;
+                background: transparent;
+                font-family: "Segoe UI", "Microsoft YaHei", sans-serif;
+            }
+        """)
+        
         # 清除原有按钮
         self.clear_buttons()
         
@@ -545,9 +558,11 @@ class ProgressDialog(GlobalDialog):
             # 尝试将进度条添加到内容布局
             if hasattr(self, 'content_widget') and self.content_widget.layout():
                 self.content_widget.layout().addWidget(self.progress_bar)
+                self.content_widget.layout().addWidget(self.detail_label)
         except:
             # 如果失败，直接添加到主布局
             self.main_layout.addWidget(self.progress_bar)
+            self.main_layout.addWidget(self.detail_label)
     
     def setup_vertical_button_layout(self):
         """设置垂直按钮布局"""
@@ -603,6 +618,11 @@ class ProgressDialog(GlobalDialog):
     def set_status(self, status):
         """设置状态文本"""
         self.content_label.setText(status)
+    
+    def set_progress_info(self, info):
+        """设置进度详情（阶段、已完成大小、速度、剩余时间）"""
+        self.set_progress(info["percent"])
+        self.detail_label.setText(format_progress_detail(info))
 
 
 # 便捷函数
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+压缩包解压工具 - 按魔数识别格式，分派到 zip / tar.gz / tar.xz / tar.zst 等解压后端
+"""
+
+import fnmatch
+import hashlib
+import json
+import mmap
+import os
+import stat
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+# 按文件名识别的tar格式后缀
+TAR_SUFFIXES = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.xz",
+    ".txz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.zst",
+    ".tzst",
+)
+
+# 识别格式时读取的文件头长度，需覆盖tar头中位于257字节处的 ustar 标记
+SNIFF_SIZE = 512
+
+# 各压缩格式的魔数
+MAGIC_NUMBERS = (
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\x1f\x8b", "tar.gz"),
+    (b"\xfd7zXZ\x00", "tar.xz"),
+    (b"\x28\xb5\x2f\xfd", "tar.zst"),
+    (b"BZh", "tar.bz2"),
+)
+
+# 压缩后总大小超过该值的zip才多进程并行解压，小包启动进程不划算
+PARALLEL_ZIP_MIN_SIZE = 16 * 1024 * 1024
+
+# 解压子进程每处理多少字节汇报一次进度
+WORKER_PROGRESS_STEP = 1024 * 1024
+
+# 项目根目录，子进程以 python -m src.utils.archive 方式启动
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def is_tar_url(url: str) -> bool:
+    """根据URL路径判断是否为tar格式"""
+    return urlparse(url).path.lower().endswith(TAR_SUFFIXES)
+
+
+def sniff_format(header: bytes) -> Optional[str]:
+    """根据文件头的魔数识别压缩包格式，无法识别时返回None"""
+    for magic, archive_format in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return archive_format
+    if header[257:262] == b"ustar":
+        return "tar"
+    return None
+
+
+def sniff_file(file_path: Path) -> Optional[str]:
+    """识别文件的压缩包格式"""
+    with open(file_path, "rb") as f:
+        return sniff_format(f.read(SNIFF_SIZE))
+
+
+def open_zstd_reader(fileobj):
+    """打开zstd解压流，需要 Python 3.14 的 compression.zstd 或第三方 zstandard"""
+    try:
+        from compression import zstd
+
+        return zstd.ZstdFile(fileobj, "rb")
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise Exception("解压 tar.zst 需要安装 zstandard：pip install zstandard")
+    return zstandard.ZstdDecompressor().stream_reader(fileobj)
+
+
+def match_member(name: str, patterns: Optional[Sequence[str]]) -> bool:
+    """判断压缩包成员是否在解压清单内，清单为空时解压全部成员
+
+    清单中的每一项是相对于压缩包根目录的通配符，例如 "*/bin/ffmpeg.exe"。
+    """
+    if not patterns:
+        return True
+    name = name.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+class CountingReader:
+    """统计读取字节数并计算sha256的文件包装，用于流式解压时汇报进度和校验"""
+
+    def __init__(self, fileobj, total_size: int = 0, progress_callback=None):
+        self.fileobj = fileobj
+        self.total_size = total_size
+        self.progress_callback = progress_callback
+        self.bytes_read = 0
+        self.digest = hashlib.sha256()
+        self._buffer = b""
+
+    def _read_raw(self, size: int) -> bytes:
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        self.digest.update(data)
+        if self.progress_callback:
+            self.progress_callback(self.bytes_read, self.total_size)
+        return data
+
+    def peek(self, size: int) -> bytes:
+        """预读数据用于识别格式，不影响之后的读取"""
+        while len(self._buffer) < size:
+            data = self._read_raw(size - len(self._buffer))
+            if not data:
+                break
+            self._buffer += data
+        return self._buffer[:size]
+
+    def read(self, size: int = -1) -> bytes:
+        if self._buffer:
+            if size < 0:
+                data, self._buffer = self._buffer + self._read_raw(-1), b""
+            else:
+                data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        return self._read_raw(size)
+
+
+def _is_within_directory(directory: Path, target: Path) -> bool:
+    """检查目标路径是否位于目录内"""
+    try:
+        target.resolve().relative_to(directory.resolve())
+        return True
+    except ValueError:
+        return False
+
+
+def extract_tar_member(tar: tarfile.TarFile, member: tarfile.TarInfo, extract_dir: Path) -> None:
+    """安全地解压单个tar成员，拒绝跳出解压目录的路径"""
+    if hasattr(tarfile, "data_filter"):
+        tar.extract(member, extract_dir, filter="data")
+        return
+    if not _is_within_directory(extract_dir, extract_dir / member.name):
+        print(f"跳过不安全的压缩包成员: {member.name}")
+        return
+    if member.issym() or member.islnk():
+        link_target = (extract_dir / member.name).parent / member.linkname
+        if not _is_within_directory(extract_dir, link_target):
+            print(f"跳过不安全的链接: {member.name}")
+            return
+    tar.extract(member, extract_dir)
+
+
+def extract_tar_stream(
+    fileobj,
+    extract_dir: Path,
+    total_size: int = 0,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+) -> Tuple[str, List[str]]:
+    """边读边解压tar流，返回整个流的sha256和解压出的文件列表
+
+    fileobj 只需支持顺序读取（例如HTTP响应），解压过程只占用固定大小的缓冲区。
+    指定 patterns 时只解压清单内的成员。
+    """
+    reader = CountingReader(fileobj, total_size, progress_callback)
+    archive_format = sniff_format(reader.peek(SNIFF_SIZE))
+    if archive_format == "zip":
+        raise Exception("zip压缩包不能按tar流解压")
+    if archive_format == "tar.zst":
+        # tarfile 不支持zstd，先套一层解压流，进度和哈希仍按压缩数据统计
+        source, mode = open_zstd_reader(reader), "r|"
+    else:
+        source, mode = reader, "r|*"
+
+    extracted_files = []
+    with tarfile.open(fileobj=source, mode=mode) as tar:
+        for member in tar:
+            if not match_member(member.name, patterns):
+                continue
+            extract_tar_member(tar, member, extract_dir)
+            if not member.isdir():
+                extracted_files.append(member.name)
+    # tar结束标记之后可能还有填充数据，读完才能得到完整的哈希
+    while reader.read(1024 * 1024):
+        pass
+    return reader.digest.hexdigest(), extracted_files
+
+
+def extract_zip_member(zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, extract_dir: Path) -> None:
+    """解压单个zip成员，并恢复Unix下打包时的可执行权限（zipfile 不处理权限）"""
+    target = zip_ref.extract(info, extract_dir)
+    mode = info.external_attr >> 16
+    if info.create_system == 3 and mode & 0o111 and stat.S_ISREG(mode):
+        os.chmod(target, stat.S_IMODE(mode))
+
+
+def zip_members_size(zip_source, patterns: Optional[Sequence[str]] = None) -> int:
+    """zip中匹配清单的成员解压后的总大小，从中央目录读取，不读成员数据"""
+    with zipfile.ZipFile(zip_source, "r") as zip_ref:
+        return sum(
+            info.file_size
+            for info in zip_ref.infolist()
+            if not info.is_dir() and match_member(info.filename, patterns)
+        )
+
+
+def extracted_members_size(file_path: Path, patterns: Optional[Sequence[str]] = None) -> Optional[int]:
+    """解压后的大小，能从压缩包目录中得到时（zip）返回，否则（tar需要完整解压才知道）返回None"""
+    if sniff_file(file_path) != "zip":
+        return None
+    return zip_members_size(file_path, patterns)
+
+
+def extract_zip(
+    zip_source,
+    extract_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """解压zip，按成员在压缩包中的顺序读取，并按压缩后大小汇报进度，返回解压出的文件列表
+
+    zip_source 可以是文件路径，也可以是可随机读取的文件对象（例如 HttpRangeFile）。
+    指定 patterns 时只读取中央目录中匹配清单的成员，其余成员的数据完全不读。
+    """
+    with zipfile.ZipFile(zip_source, "r") as zip_ref:
+        members = sorted(
+            (info for info in zip_ref.infolist() if match_member(info.filename, patterns)),
+            key=lambda info: info.header_offset,
+        )
+        total_size = sum(info.compress_size for info in members)
+        extracted_size = 0
+        for info in members:
+            extract_zip_member(zip_ref, info, extract_dir)
+            extracted_size += info.compress_size
+            if progress_callback:
+                progress_callback(extracted_size, total_size)
+    return [info.filename for info in members if not info.is_dir()]
+
+
+def extract_tar_file(
+    file_path: Path,
+    extract_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """顺序读取并解压本地tar包（含gz/bz2/xz/zst压缩），返回解压出的文件列表"""
+    with open(file_path, "rb") as f:
+        _, extracted_files = extract_tar_stream(
+            f, extract_dir, os.path.getsize(file_path), progress_callback, patterns
+        )
+    return extracted_files
+
+
+def can_use_worker() -> bool:
+    """能否启动解压子进程
+
+    子进程以 python -m src.utils.archive 启动，打包成单个可执行文件后
+    （sys.frozen）没有可用的解释器和源码目录，此时只能在当前进程中解压。
+    """
+    return not getattr(sys, "frozen", False)
+
+
+def _run_worker(job: Dict[str, Any], on_message: Callable[[Dict[str, Any]], None]) -> None:
+    """启动解压子进程，任务以JSON写入标准输入，逐行读取子进程输出的JSON消息
+
+    不使用 multiprocessing：spawn 方式会在子进程中重新导入主模块，
+    而主模块导入时会请求管理员权限。
+    """
+    # 标准错误写入临时文件：子进程输出大量警告或异常信息时不会因管道写满而阻塞
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as stderr_file:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.utils.archive"],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
+            encoding="utf-8",
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        process.stdin.write(json.dumps(job))
+        process.stdin.close()
+        finished = False
+        for line in process.stdout:
+            if not line.startswith("{"):
+                print(line.rstrip())
+                continue
+            message = json.loads(line)
+            if message.get("finished"):
+                finished = True
+            on_message(message)
+        process.wait()
+        stderr_file.seek(0)
+        error = stderr_file.read()
+    if process.returncode != 0 or not finished:
+        raise Exception(f"解压失败: {error.strip()[-500:]}")
+
+
+def extract_tar_in_worker(
+    file_path: Path,
+    extract_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """在子进程中解压tar包，通过标准输出逐行接收进度和结果"""
+    if not can_use_worker():
+        return extract_tar_file(file_path, extract_dir, progress_callback, patterns)
+    extracted_files: List[str] = []
+
+    def on_message(message: Dict[str, Any]) -> None:
+        if message.get("finished"):
+            extracted_files.extend(message["files"])
+        elif progress_callback:
+            progress_callback(message["done"], message["total"])
+
+    job = {
+        "command": "tar",
+        "file": str(file_path),
+        "extract_dir": str(extract_dir),
+        "patterns": list(patterns) if patterns else None,
+    }
+    _run_worker(job, on_message)
+    return extracted_files
+
+
+def shard_members(members: List[zipfile.ZipInfo], shard_count: int) -> List[List[zipfile.ZipInfo]]:
+    """按压缩后大小把成员分配到各分片，每次把最大的成员放进当前最轻的分片"""
+    shards: List[List[zipfile.ZipInfo]] = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for info in sorted(members, key=lambda info: info.compress_size, reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(info)
+        loads[index] += info.compress_size
+    return [shard for shard in shards if shard]
+
+
+def _member_parent_dir(extract_dir: Path, name: str) -> Path:
+    """成员解压后所在的目录，与 zipfile 一样去掉绝对路径和 .. 部分"""
+    parts = [part for part in name.replace("\\", "/").split("/")[:-1] if part not in ("", ".", "..")]
+    return extract_dir.joinpath(*parts)
+
+
+def extract_zip_parallel(
+    file_path: Path,
+    extract_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """多进程并行解压zip，返回解压出的文件列表
+
+    zip的每个成员独立压缩，按压缩后大小把成员均匀分片，每个子进程用mmap
+    打开压缩包解压自己的分片，每解压完一个成员汇报一次进度。压缩包较小、
+    只有一个核心或无法启动子进程时直接在当前线程解压。
+    """
+    with zipfile.ZipFile(file_path, "r") as zip_ref:
+        members = [info for info in zip_ref.infolist() if match_member(info.filename, patterns)]
+    files = [info for info in members if not info.is_dir()]
+    total_size = sum(info.compress_size for info in files)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers <= 1 or total_size < PARALLEL_ZIP_MIN_SIZE or not can_use_worker():
+        return extract_zip(file_path, extract_dir, progress_callback, patterns)
+
+    # 先建好所有目录（目录成员以 / 结尾，本身也会被建出），避免多个进程同时创建同一目录
+    for info in members:
+        _member_parent_dir(extract_dir, info.filename).mkdir(parents=True, exist_ok=True)
+
+    shards = shard_members(files, workers)
+    print(f"并行解压: {len(files)} 个文件，{len(shards)} 个进程")
+    lock = threading.Lock()
+    extracted_size = [0]
+
+    def on_message(message: Dict[str, Any]) -> None:
+        if message.get("finished"):
+            return
+        with lock:
+            extracted_size[0] += message["size"]
+            done = extracted_size[0]
+        if progress_callback:
+            progress_callback(done, total_size)
+
+    def run_shard(shard: List[zipfile.ZipInfo]) -> None:
+        job = {
+            "command": "zip",
+            "file": str(file_path),
+            "extract_dir": str(extract_dir),
+            "members": [info.filename for info in shard],
+        }
+        _run_worker(job, on_message)
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        for future in [executor.submit(run_shard, shard) for shard in shards]:
+            future.result()
+    return [info.filename for info in files]
+
+
+# 压缩包格式 -> 解压后端，签名均为 (文件, 解压目录, 进度回调, 解压清单) -> 解压出的文件列表
+ARCHIVE_BACKENDS: Dict[str, Callable[..., List[str]]] = {
+    "zip": extract_zip_parallel,
+    "tar": extract_tar_file,
+    "tar.gz": extract_tar_file,
+    "tar.bz2": extract_tar_file,
+    "tar.zst": extract_tar_file,
+    # xz解压很吃CPU，放到子进程里避免拖慢界面
+    "tar.xz": extract_tar_in_worker,
+}
+
+
+def extract_archive(
+    file_path: Path,
+    extract_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    patterns: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """按文件头识别压缩包格式并解压，返回解压出的文件列表"""
+    archive_format = sniff_file(file_path)
+    if archive_format not in ARCHIVE_BACKENDS:
+        raise Exception(f"无法识别的压缩包格式: {file_path.name}")
+    print(f"压缩包格式: {archive_format}")
+    return ARCHIVE_BACKENDS[archive_format](file_path, extract_dir, progress_callback, patterns)
+
+
+class _MappedFile(mmap.mmap):
+    """只读内存映射文件，补上 zipfile 需要的 seekable（Python 3.13 之前的mmap没有）"""
+
+    def seekable(self) -> bool:
+        return True
+
+
+def _extract_zip_members(file_path: Path, extract_dir: Path, names: List[str]) -> None:
+    """解压指定的zip成员，通过mmap读取压缩包，多个进程共享同一份页缓存"""
+    with open(file_path, "rb") as f, _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with zipfile.ZipFile(mapped, "r") as zip_ref:
+            for name in names:
+                info = zip_ref.getinfo(name)
+                extract_zip_member(zip_ref, info, extract_dir)
+                print(json.dumps({"member": name, "size": info.compress_size}), flush=True)
+
+
+def _worker_main() -> None:
+    """解压子进程入口，从标准输入读取任务，进度和结果以JSON逐行写到标准输出"""
+    job = json.load(sys.stdin)
+    file_path, extract_dir = Path(job["file"]), Path(job["extract_dir"])
+
+    if job["command"] == "zip":
+        _extract_zip_members(file_path, extract_dir, job["members"])
+        print(json.dumps({"finished": True}), flush=True)
+        return
+
+    reported = [0]
+
+    def report_progress(done: int, total: int) -> None:
+        if done - reported[0] >= WORKER_PROGRESS_STEP or done >= total:
+            reported[0] = done
+            print(json.dumps({"done": done, "total": total}), flush=True)
+
+    extracted_files = extract_tar_file(file_path, extract_dir, report_progress, job["patterns"])
+    print(json.dumps({"finished": True, "files": extracted_files}), flush=True)
+
+
+if __name__ == "__main__":
+    _worker_main()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+下载产物缓存 - 按内容寻址，按最近使用时间淘汰
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import ConfigManager
+
+# 计算哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_index_lock = threading.Lock()
+
+
+def get_cache_key(url: str, validator: str) -> str:
+    """由URL和ETag（或Last-Modified）生成缓存键"""
+    return hashlib.sha256(f"{url}\n{validator}".encode("utf-8")).hexdigest()
+
+
+def compute_sha256(
+    file_path: Path, progress_callback: Optional[Callable[[int, int], None]] = None
+) -> str:
+    """计算文件的sha256，传入 progress_callback 时汇报进度(已读取, 总大小)"""
+    total_size = file_path.stat().st_size if progress_callback else 0
+    done = 0
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            if progress_callback:
+                done += len(chunk)
+                progress_callback(done, total_size)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """下载产物缓存
+
+    缓存目录位于配置目录下的 cache，blobs 按sha256存放，index.json 记录
+    URL+ETag 到sha256的映射以及每个blob的大小和最近访问时间。总大小超过
+    设置页中的“缓存大小”（MB）时按最近最少使用淘汰。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        config_manager = ConfigManager()
+        self.cache_dir = cache_dir or config_manager.config_dir / "cache"
+        self.blob_dir = self.cache_dir / "blobs"
+        self.index_file = self.cache_dir / "index.json"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        # 配置文件中的值可能小于设置页允许的下限，至少保留1MB
+        self.max_size = max(1, int(config_manager.get("cache_size", 256))) * 1024 * 1024
+
+    def _load_index(self) -> Dict[str, Any]:
+        """加载缓存索引"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                index.setdefault("keys", {})
+                index.setdefault("blobs", {})
+                return index
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {"keys": {}, "blobs": {}}
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        """保存缓存索引，先写临时文件再替换，避免索引损坏"""
+        temp_file = self.index_file.with_suffix(".tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.index_file)
+        except IOError as e:
+            print(f"保存缓存索引失败: {e}")
+
+    def get_blob_path(self, sha256: str) -> Path:
+        """获取blob的存放路径"""
+        return self.blob_dir / sha256[:2] / sha256
+
+    def lookup(self, url: str, validator: str) -> Optional[Path]:
+        """按URL和ETag查找缓存，命中时返回blob路径"""
+        if not validator:
+            return None
+        return self.lookup_key(get_cache_key(url, validator))
+
+    def lookup_key(self, cache_key: str) -> Optional[Path]:
+        """按缓存键查找缓存"""
+        with _index_lock:
+            index = self._load_index()
+            sha256 = index["keys"].get(cache_key, {}).get("sha256")
+            return self._touch(index, sha256)
+
+    def lookup_latest(self, urls: List[str]) -> Optional[Path]:
+        """无法联网确认ETag时，返回这些地址（同一产物的各镜像）最近一次缓存的blob"""
+        with _index_lock:
+            index = self._load_index()
+            entries = [entry for entry in index["keys"].values() if entry.get("url") in urls]
+            if not entries:
+                return None
+            latest = max(entries, key=lambda entry: entry.get("stored_time", 0))
+            return self._touch(index, latest.get("sha256"))
+
+    def lookup_sha256(self, sha256: str) -> Optional[Path]:
+        """按sha256查找缓存"""
+        with _index_lock:
+            return self._touch(self._load_index(), sha256)
+
+    def _touch(self, index: Dict[str, Any], sha256: Optional[str]) -> Optional[Path]:
+        """更新blob的最近访问时间，blob不存在或已损坏时清理索引
+
+        blob的大小或修改时间与写入缓存时不同，说明文件被改动过，重新计算
+        sha256，与文件名不符时删除。
+        """
+        if not sha256 or sha256 not in index["blobs"]:
+            return None
+        blob_path = self.get_blob_path(sha256)
+        entry = index["blobs"][sha256]
+        try:
+            blob_stat = blob_path.stat()
+        except OSError:
+            self._remove_from_index(index, sha256)
+            self._save_index(index)
+            return None
+        if blob_stat.st_size != entry["size"] or blob_stat.st_mtime_ns != entry.get("mtime"):
+            if compute_sha256(blob_path) != sha256:
+                print(f"缓存文件已损坏，删除: {sha256}")
+                self._remove_from_index(index, sha256)
+                self._save_index(index)
+                blob_path.unlink()
+                return None
+            entry["size"] = blob_stat.st_size
+            entry["mtime"] = blob_stat.st_mtime_ns
+        entry["last_access"] = time.time()
+        self._save_index(index)
+        return blob_path
+
+    def put(
+        self,
+        file_path: Path,
+        url: str,
+        validator: str,
+        sha256: Optional[str] = None,
+    ) -> Path:
+        """把下载好的文件移入缓存，返回blob路径
+
+        文件大于缓存上限时不缓存，原样返回文件路径。
+        """
+        size = file_path.stat().st_size
+        if size > self.max_size:
+            print(f"文件大小超过缓存上限，不缓存: {file_path.name}")
+            return file_path
+
+        sha256 = sha256 or compute_sha256(file_path)
+        blob_path = self.get_blob_path(sha256)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        if blob_path.exists():
+            file_path.unlink()
+        else:
+            shutil.move(str(file_path), str(blob_path))
+
+        with _index_lock:
+            index = self._load_index()
+            now = time.time()
+            index["blobs"][sha256] = {
+                "size": size,
+                "mtime": blob_path.stat().st_mtime_ns,
+                "file_name": file_path.name,
+                "last_access": now,
+            }
+            if validator:
+                index["keys"][get_cache_key(url, validator)] = {
+                    "url": url,
+                    "validator": validator,
+                    "sha256": sha256,
+                    "stored_time": now,
+                }
+            self._evict(index, keep=sha256)
+            self._save_index(index)
+        print(f"已缓存下载文件: {sha256}")
+        return blob_path
+
+    def remove(self, sha256: str) -> None:
+        """从缓存中删除blob"""
+        with _index_lock:
+            index = self._load_index()
+            self._remove_from_index(index, sha256)
+            self._save_index(index)
+        blob_path = self.get_blob_path(sha256)
+        if blob_path.exists():
+            blob_path.unlink()
+
+    def evict(self) -> None:
+        """按当前缓存上限淘汰"""
+        with _index_lock:
+            index = self._load_index()
+            self._evict(index)
+            self._save_index(index)
+
+    def get_total_size(self) -> int:
+        """获取缓存总大小"""
+        with _index_lock:
+            index = self._load_index()
+        return sum(blob["size"] for blob in index["blobs"].values())
+
+    def _evict(self, index: Dict[str, Any], keep: Optional[str] = None) -> None:
+        """淘汰最近最少使用的blob，直到总大小不超过上限"""
+        blobs = index["blobs"]
+        total_size = sum(blob["size"] for blob in blobs.values())
+        for sha256 in sorted(blobs, key=lambda key: blobs[key]["last_access"]):
+            if total_size <= self.max_size:
+                break
+            if sha256 == keep:
+                continue
+            total_size -= blobs[sha256]["size"]
+            self._remove_from_index(index, sha256)
+            blob_path = self.get_blob_path(sha256)
+            if blob_path.exists():
+                blob_path.unlink()
+            print(f"缓存已满，淘汰: {sha256}")
+
+    def _remove_from_index(self, index: Dict[str, Any], sha256: str) -> None:
+        """从索引中删除blob及指向它的键"""
+        index["blobs"].pop(sha256, None)
+        for key in [key for key, entry in index["keys"].items() if entry.get("sha256") == sha256]:
+            del index["keys"][key]
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+工具链下载产物登记 - 每个产物的下载地址、镜像和校验文件，按平台、架构和功能需求挑选最小的构建
+"""
+
+import platform
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import quote
+
+from .config import ConfigManager
+
+# GitHub Release 的国内加速代理，直接在原始地址前拼接
+GITHUB_PROXIES = (
+    "https://ghfast.top/",
+    "https://gh-proxy.com/",
+)
+
+BTBN_RELEASE = "https://github.com/BtbN/FFmpeg-Builds/releases/download/latest/"
+
+GYAN_BUILDS = "https://www.gyan.dev/ffmpeg/builds/"
+
+PYTHON_VERSION = "3.11.0"
+
+# python-build-standalone 的预编译Python，解压即可运行，自带pip和venv
+STANDALONE_RELEASE_TAG = "20240726"
+STANDALONE_PYTHON_VERSION = "3.11.9"
+STANDALONE_RELEASE = (
+    f"https://github.com/indygreg/python-build-standalone/releases/download/{STANDALONE_RELEASE_TAG}/"
+)
+
+MB = 1024 * 1024
+
+# platform.machine() 的各种写法 -> 统一的架构名
+MACHINE_ALIASES = {
+    "amd64": "x86_64",
+    "x86_64": "x86_64",
+    "x64": "x86_64",
+    "arm64": "arm64",
+    "aarch64": "arm64",
+    "armv8l": "arm64",
+}
+
+# 真寻Bot处理语音和音乐需要的FFmpeg编解码器
+FFMPEG_REQUIRED_FEATURES = ("libmp3lame", "libopus")
+
+# 安装真寻Bot依赖需要的Python组件
+PYTHON_REQUIRED_FEATURES = ("pip", "venv")
+
+# 各FFmpeg构建包含的编解码器，LGPL构建不含x264/x265等GPL库
+FFMPEG_GPL_FEATURES = ("libmp3lame", "libopus", "libvorbis", "libx264", "libx265")
+FFMPEG_LGPL_FEATURES = ("libmp3lame", "libopus", "libvorbis")
+
+PYTHON_FULL_FEATURES = ("pip", "venv", "tkinter")
+
+
+def github_mirrors(url: str) -> List[str]:
+    """GitHub地址及其代理镜像"""
+    return [url] + [proxy + url for proxy in GITHUB_PROXIES]
+
+
+def python_mirrors(version: str, file_name: str) -> List[str]:
+    """python.org 官方地址及国内镜像"""
+    return [
+        f"https://www.python.org/ftp/python/{version}/{file_name}",
+        f"https://mirrors.huaweicloud.com/python/{version}/{file_name}",
+        f"https://registry.npmmirror.com/-/binary/python/{version}/{file_name}",
+    ]
+
+
+def btbn_artifact(
+    target: str,
+    variant: str,
+    system: str,
+    machine: str,
+    approx_size: int,
+) -> Dict[str, Any]:
+    """BtbN FFmpeg 构建，target 如 win64 / linuxarm64，variant 如 gpl / lgpl-shared"""
+    windows = system == "Windows"
+    archive_format = "zip" if windows else "tar.xz"
+    file_name = f"ffmpeg-master-latest-{target}-{variant}.{archive_format}"
+    exe = ".exe" if windows else ""
+    extract_members = [f"*/bin/ffmpeg{exe}", f"*/bin/ffprobe{exe}"]
+    if variant.endswith("-shared"):
+        # 动态链接的构建还需要附带的库文件
+        extract_members += ["*/bin/*.dll"] if windows else ["*/lib/*.so*"]
+    return {
+        "name": "FFmpeg",
+        "tool": "ffmpeg",
+        "system": system,
+        "machines": [machine],
+        "features": list(FFMPEG_GPL_FEATURES if variant.startswith("gpl") else FFMPEG_LGPL_FEATURES),
+        "approx_size": approx_size,
+        "file_name": file_name,
+        "format": archive_format,
+        "installable": True,
+        "mirrors": github_mirrors(BTBN_RELEASE + file_name),
+        "checksum_url": BTBN_RELEASE + "checksums.sha256",
+        "extract_members": extract_members,
+    }
+
+
+def python_artifact(
+    file_name: str,
+    system: str,
+    machines: List[str],
+    approx_size: int,
+    archive_format: str,
+    features: Sequence[str] = PYTHON_FULL_FEATURES,
+    installable: bool = False,
+) -> Dict[str, Any]:
+    """python.org 发布的Python构建
+
+    除嵌入式版本外都是安装程序或源码包，解压后不能直接运行，只用于识别
+    用户手动下载的文件，不参与自动下载。
+    """
+    return {
+        "name": "Python",
+        "tool": "python",
+        "system": system,
+        "machines": machines,
+        "features": list(features),
+        "approx_size": approx_size,
+        "file_name": file_name,
+        "format": archive_format,
+        "installable": installable,
+        "mirrors": python_mirrors(PYTHON_VERSION, file_name),
+        "checksum_url": None,
+        "extract_members": None,
+    }
+
+
+def standalone_python_artifact(
+    triple: str, system: str, machine: str, approx_size: int
+) -> Dict[str, Any]:
+    """python-build-standalone 的 install_only 构建，triple 如 x86_64-unknown-linux-gnu"""
+    file_name = f"cpython-{STANDALONE_PYTHON_VERSION}+{STANDALONE_RELEASE_TAG}-{triple}-install_only.tar.gz"
+    return {
+        "name": "Python",
+        "tool": "python",
+        "system": system,
+        "machines": [machine],
+        "features": list(PYTHON_FULL_FEATURES),
+        "approx_size": approx_size,
+        "file_name": file_name,
+        "format": "tar.gz",
+        "installable": True,
+        "mirrors": github_mirrors(STANDALONE_RELEASE + quote(file_name)),
+        "checksum_url": STANDALONE_RELEASE + "SHA256SUMS",
+        "extract_members": None,
+    }
+
+
+# 产物ID -> 产物信息，mirrors 的第一项为官方地址，
+# extract_members 为解压清单（相对压缩包根目录的通配符），为None时解压全部，
+# approx_size 为大致下载大小，用于在满足需求的构建中挑选最小的一个，
+# format 为文件格式（压缩包格式，安装程序为 installer，源码包为 source），
+# installable 表示解压后即可运行，只有这样的构建才会被自动下载
+ARTIFACTS: Dict[str, Dict[str, Any]] = {
+    "ffmpeg-win64-gpl": btbn_artifact("win64", "gpl", "Windows", "x86_64", 190 * MB),
+    "ffmpeg-win64-lgpl": btbn_artifact("win64", "lgpl", "Windows", "x86_64", 120 * MB),
+    "ffmpeg-win64-lgpl-shared": btbn_artifact("win64", "lgpl-shared", "Windows", "x86_64", 55 * MB),
+    "ffmpeg-winarm64-lgpl": btbn_artifact("winarm64", "lgpl", "Windows", "arm64", 110 * MB),
+    "ffmpeg-linux64-gpl": btbn_artifact("linux64", "gpl", "Linux", "x86_64", 115 * MB),
+    "ffmpeg-linux64-lgpl": btbn_artifact("linux64", "lgpl", "Linux", "x86_64", 75 * MB),
+    "ffmpeg-linuxarm64-lgpl": btbn_artifact("linuxarm64", "lgpl", "Linux", "arm64", 65 * MB),
+    "ffmpeg-win64-essentials": {
+        "name": "FFmpeg",
+        "tool": "ffmpeg",
+        "system": "Windows",
+        "machines": ["x86_64"],
+        "features": list(FFMPEG_GPL_FEATURES),
+        "approx_size": 100 * MB,
+        "file_name": "ffmpeg-release-essentials.zip",
+        "format": "zip",
+        "installable": True,
+        "mirrors": [GYAN_BUILDS + "ffmpeg-release-essentials.zip"],
+        "checksum_url": GYAN_BUILDS + "ffmpeg-release-essentials.zip.sha256",
+        "extract_members": ["*/bin/ffmpeg.exe", "*/bin/ffprobe.exe"],
+    },
+    "ffmpeg-macos": {
+        "name": "FFmpeg",
+        "tool": "ffmpeg",
+        "system": "Darwin",
+        # Apple Silicon 通过 Rosetta 运行
+        "machines": ["x86_64", "arm64"],
+        "features": list(FFMPEG_GPL_FEATURES),
+        "approx_size": 25 * MB,
+        "file_name": "ffmpeg.zip",
+        "format": "zip",
+        "installable": True,
+        "mirrors": ["https://evermeet.cx/ffmpeg/getrelease/zip"],
+        "checksum_url": None,
+        "extract_members": ["ffmpeg"],
+    },
+    "python-3.11-win-amd64": python_artifact(
+        f"python-{PYTHON_VERSION}-amd64.exe", "Windows", ["x86_64"], 25 * MB, "installer"
+    ),
+    # 嵌入式版本不带pip和venv，不满足安装依赖的需要
+    "python-3.11-win-embed-amd64": python_artifact(
+        f"python-{PYTHON_VERSION}-embed-amd64.zip",
+        "Windows",
+        ["x86_64"],
+        8 * MB,
+        "zip",
+        features=(),
+        installable=True,
+    ),
+    "python-3.11-win-arm64": python_artifact(
+        f"python-{PYTHON_VERSION}-arm64.exe", "Windows", ["arm64"], 24 * MB, "installer"
+    ),
+    "python-3.11-source": python_artifact(
+        f"Python-{PYTHON_VERSION}.tgz", "Linux", ["x86_64", "arm64"], 26 * MB, "source"
+    ),
+    "python-3.11-source-xz": python_artifact(
+        f"Python-{PYTHON_VERSION}.tar.xz", "Linux", ["x86_64", "arm64"], 19 * MB, "source"
+    ),
+    "python-3.11-macos": python_artifact(
+        f"python-{PYTHON_VERSION}-macos11.pkg", "Darwin", ["x86_64", "arm64"], 40 * MB, "installer"
+    ),
+    "python-3.11-standalone-win-amd64": standalone_python_artifact(
+        "x86_64-pc-windows-msvc", "Windows", "x86_64", 30 * MB
+    ),
+    "python-3.11-standalone-linux-x86_64": standalone_python_artifact(
+        "x86_64-unknown-linux-gnu", "Linux", "x86_64", 30 * MB
+    ),
+    "python-3.11-standalone-linux-arm64": standalone_python_artifact(
+        "aarch64-unknown-linux-gnu", "Linux", "arm64", 30 * MB
+    ),
+    "python-3.11-standalone-macos-x86_64": standalone_python_artifact(
+        "x86_64-apple-darwin", "Darwin", "x86_64", 20 * MB
+    ),
+    "python-3.11-standalone-macos-arm64": standalone_python_artifact(
+        "aarch64-apple-darwin", "Darwin", "arm64", 20 * MB
+    ),
+}
+
+
+def get_artifact(artifact_id: str) -> Dict[str, Any]:
+    """获取产物信息，配置中的自定义镜像排在内置镜像之前"""
+    artifact = dict(ARTIFACTS[artifact_id])
+    extra_mirrors = ConfigManager().get("extra_mirrors", {}).get(artifact_id, [])
+    mirrors = []
+    for url in list(extra_mirrors) + artifact["mirrors"]:
+        if url not in mirrors:
+            mirrors.append(url)
+    artifact["id"] = artifact_id
+    artifact["mirrors"] = mirrors
+    artifact["url"] = artifact["mirrors"][0]
+    return artifact
+
+
+def find_artifact_by_file_name(file_name: str) -> Optional[Dict[str, Any]]:
+    """按发布页的文件名查找产物，用于离线安装时识别本地压缩包"""
+    for artifact_id, artifact in ARTIFACTS.items():
+        if artifact["file_name"] == file_name:
+            return get_artifact(artifact_id)
+    return None
+
+
+def get_platform() -> Dict[str, str]:
+    """当前平台的系统和统一后的架构名"""
+    machine = platform.machine().lower()
+    return {"system": platform.system(), "machine": MACHINE_ALIASES.get(machine, machine)}
+
+
+def resolve_artifact(
+    tool: str,
+    features: Sequence[str] = (),
+    system: Optional[str] = None,
+    machine: Optional[str] = None,
+) -> Dict[str, Any]:
+    """在适用于当前系统和架构、解压即可运行且包含所需功能的构建中挑选下载最小的一个"""
+    current = get_platform()
+    system = system or current["system"]
+    machine = machine or current["machine"]
+    candidates = [
+        artifact_id
+        for artifact_id, artifact in ARTIFACTS.items()
+        if artifact["tool"] == tool
+        and artifact["installable"]
+        and artifact["system"] == system
+        and machine in artifact["machines"]
+        and set(features) <= set(artifact["features"])
+    ]
+    if not candidates:
+        raise Exception(f"没有适用于 {system} {machine} 的 {tool} 构建")
+    artifact_id = min(candidates, key=lambda candidate: ARTIFACTS[candidate]["approx_size"])
+    print(f"选择构建: {artifact_id}（{system} {machine}）")
+    return get_artifact(artifact_id)
+
+
+def fetch_artifact_details(artifact: Dict[str, Any]) -> Dict[str, Any]:
+    """在下载开始前获取产物的实际大小和预期sha256，获取失败的项为空"""
+    from .download import fetch_release_checksum, probe_download
+
+    details: Dict[str, Any] = {"expected_size": 0, "expected_sha256": None}
+    try:
+        details["expected_size"] = probe_download(artifact["url"])["total_size"]
+    except Exception as e:
+        print(f"获取文件大小失败: {e}")
+    if artifact.get("checksum_url"):
+        try:
+            details["expected_sha256"] = fetch_release_checksum(
+                artifact["checksum_url"], artifact["file_name"]
+            )
+        except Exception as e:
+            print(f"获取校验文件失败: {e}")
+    return details
+
+
+def get_ffmpeg_artifact() -> Dict[str, Any]:
+    """获取当前平台的FFmpeg产物"""
+    return resolve_artifact("ffmpeg", FFMPEG_REQUIRED_FEATURES)
+
+
+def get_python_artifact() -> Dict[str, Any]:
+    """获取当前平台的Python 3.11产物"""
+    return resolve_artifact("python", PYTHON_REQUIRED_FEATURES)
@@ -24,6 +24,14 @@ class ConfigManager:
             "window_position": [100, 100],
             "theme": "light",
             "language": "zh_CN",
+            "download_connections": 4,
+            "cache_size": 256,
+            "streaming_extract": False,
+            "proxy": "",
+            "offline_artifact_dir": "",
+            "peer_cache_enabled": False,
+            "peer_cache_port": 38766,
+            "lan_peers": "",
         }
 
         self._load_config()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+检测缓存 - 记录各可执行文件的探测结果和各工具上次的检测结果
+
+探测结果按解析后的真实路径记录，并保存文件的修改时间、大小和inode。
+下次检测时这三项都没有变化的文件直接使用记录的版本，不再启动子进程；
+页面打开时先显示上次的检测结果，再在后台重新检测。
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .config import ConfigManager
+
+_cache_lock = threading.Lock()
+
+
+def get_file_signature(path: str) -> Optional[List[int]]:
+    """文件的修改时间、大小和inode，文件不存在时返回None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ino]
+
+
+def _cache_key(path: str, resolve_links: bool = True) -> str:
+    path = os.path.realpath(path) if resolve_links else os.path.abspath(path)
+    return os.path.normcase(path)
+
+
+class DetectionCache:
+    """检测缓存
+
+    缓存文件位于配置目录下的 detection_cache.json。probes 按真实路径记录
+    版本（执行失败的为False）和文件签名，introspection 以同样方式记录
+    解释器内省的结果，tools 记录每个工具上次的检测结果（是否找到、路径、
+    版本）。
+
+    探测结果先记在内存中，由 flush 一次写入，一次扫描数百个解释器时
+    不会反复读写缓存文件。
+    """
+
+    def __init__(
+        self, cache_file: Optional[Path] = None, section: str = "probes", resolve_links: bool = True
+    ):
+        self.cache_file = cache_file or ConfigManager().config_dir / "detection_cache.json"
+        # 探测结果所在的分区，不同的探测命令（--version、内省脚本）分开记录
+        self.section = section
+        # 是否按解析链接后的真实路径记录；虚拟环境中的解释器链接到基础解释器，
+        # 版本相同，但内省得到的 sys.prefix 和 site-packages 不同
+        self.resolve_links = resolve_links
+        # 已读取的缓存内容及读取时文件的修改时间，文件未变化时不重新读取
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_mtime: Optional[int] = None
+        # 尚未写入文件的探测结果
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> Dict[str, Any]:
+        """加载缓存"""
+        try:
+            mtime = self.cache_file.stat().st_mtime_ns
+        except OSError:
+            return {self.section: {}, "tools": {}}
+        if self._snapshot is not None and mtime == self._snapshot_mtime:
+            return self._snapshot
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            cache.setdefault(self.section, {})
+            cache.setdefault("tools", {})
+        except (json.JSONDecodeError, IOError):
+            return {self.section: {}, "tools": {}}
+        self._snapshot, self._snapshot_mtime = cache, mtime
+        return cache
+
+    def _save(self, cache: Dict[str, Any]) -> None:
+        """保存缓存，先写临时文件再替换，避免缓存损坏"""
+        temp_file = self.cache_file.with_suffix(".tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+            self._snapshot = None
+        except IOError as e:
+            print(f"保存检测缓存失败: {e}")
+
+    def lookup(self, path: str) -> Union[str, bool, None]:
+        """文件签名未变化时返回记录的版本（执行失败的为False），否则返回None"""
+        key = _cache_key(path, self.resolve_links)
+        with _cache_lock:
+            entry = self._pending.get(key) or self._load().get(self.section, {}).get(key)
+        if not entry or entry.get("signature") != get_file_signature(path):
+            return None
+        return entry.get("version")
+
+    def store(self, path: str, version: Union[str, bool]) -> None:
+        """记录文件的探测结果，调用 flush 后写入文件"""
+        signature = get_file_signature(path)
+        if signature is None:
+            return
+        with _cache_lock:
+            key = _cache_key(path, self.resolve_links)
+            self._pending[key] = {"signature": signature, "version": version}
+
+    def flush(self) -> None:
+        """把内存中的探测结果写入文件"""
+        with _cache_lock:
+            if not self._pending:
+                return
+            cache = self._load()
+            cache.setdefault(self.section, {}).update(self._pending)
+            self._pending = {}
+            self._save(cache)
+
+    def get_tool(self, tool: str) -> Optional[Dict[str, Any]]:
+        """工具上次的检测结果"""
+        with _cache_lock:
+            return self._load()["tools"].get(tool)
+
+    def set_tool(self, tool: str, found: bool, path: str, version: str) -> bool:
+        """记录工具的检测结果，返回结果是否与上次不同"""
+        entry = {"found": found, "path": path, "version": version}
+        with _cache_lock:
+            cache = self._load()
+            if cache["tools"].get(tool) == entry:
+                return False
+            cache["tools"][tool] = entry
+            cache.setdefault(self.section, {}).update(self._pending)
+            self._pending = {}
+            self._save(cache)
+        return True
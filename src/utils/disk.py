@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+磁盘空间 - 下载前检查各卷的剩余空间，下载时预分配目标文件
+"""
+
+import errno
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .progress import format_size
+
+# 解压后大小与压缩包大小之比的估计值，工具链中的可执行文件压缩率一般在1/3左右
+EXTRACT_SIZE_RATIO = 3
+
+# 每个卷额外保留的空间，避免把磁盘写满
+DISK_SPACE_MARGIN = 64 * 1024 * 1024
+
+
+class InsufficientSpaceError(Exception):
+    """磁盘空间不足"""
+
+
+def estimate_extracted_size(archive_size: int) -> int:
+    """估计压缩包解压后的大小"""
+    return archive_size * EXTRACT_SIZE_RATIO
+
+
+def estimate_footprint(
+    download_size: int, keep_archive: bool = True, extracted_size: Optional[int] = None
+) -> Dict[str, int]:
+    """估计安装占用的空间：下载的压缩包、解压（安装）后的文件以及合计
+
+    extracted_size 为已知的解压后大小（例如zip中央目录中所选成员的大小），
+    为None时按压缩比估计。
+    """
+    if extracted_size is None:
+        extracted_size = estimate_extracted_size(download_size)
+    return {
+        "download": download_size if keep_archive else 0,
+        "extracted": extracted_size,
+        "total": (download_size if keep_archive else 0) + extracted_size,
+    }
+
+
+def _existing_path(path: Path) -> Path:
+    """路径可能尚未创建，取最近的已存在的上级目录"""
+    path = Path(path).absolute()
+    while not path.exists() and path.parent != path:
+        path = path.parent
+    return path
+
+
+def get_free_space(path: Path) -> int:
+    """路径所在卷的剩余空间"""
+    return shutil.disk_usage(_existing_path(path)).free
+
+
+def check_disk_space(requirements: Dict[Path, int]) -> None:
+    """检查各路径所在的卷是否有足够空间，位于同一卷的需求合并计算
+
+    requirements 为 路径 -> 需要写入的字节数，空间不足时抛出 InsufficientSpaceError。
+    """
+    volumes: Dict[int, Dict] = {}
+    for path, size in requirements.items():
+        existing = _existing_path(path)
+        volume = volumes.setdefault(os.stat(existing).st_dev, {"path": existing, "size": 0})
+        volume["size"] += size
+
+    shortages: List[str] = []
+    for volume in volumes.values():
+        free = shutil.disk_usage(volume["path"]).free
+        needed = volume["size"] + DISK_SPACE_MARGIN
+        print(f"磁盘空间: {volume['path']} 需要 {format_size(needed)}，剩余 {format_size(free)}")
+        if free < needed:
+            shortages.append(
+                f"{volume['path']} 所在磁盘需要 {format_size(needed)}，仅剩 {format_size(free)}"
+            )
+    if shortages:
+        raise InsufficientSpaceError("磁盘空间不足：" + "；".join(shortages))
+
+
+def preallocate(fd: int, size: int) -> None:
+    """为文件预分配空间
+
+    支持 posix_fallocate 的系统上一次性分配全部磁盘块，空间不足时立即失败，
+    文件也更不容易产生碎片；不支持时退回为设置文件大小（稀疏文件）。
+    """
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise InsufficientSpaceError(f"磁盘空间不足，无法预分配 {format_size(size)}") from e
+            # 文件系统不支持（例如部分网络文件系统），退回为设置文件大小
+            print(f"预分配失败，改为直接设置文件大小: {e}")
+    os.ftruncate(fd, size)
+
+
+def format_footprint(footprint: Dict[str, int], free_space: Optional[int] = None) -> str:
+    """把占用空间格式化为提示文字"""
+    text = (
+        f"下载约 {format_size(footprint['download'])}，"
+        f"安装后约 {format_size(footprint['extracted'])}，"
+        f"共需约 {format_size(footprint['total'])} 磁盘空间"
+    )
+    if free_space is not None:
+        text += f"（剩余 {format_size(free_space)}）"
+    return text
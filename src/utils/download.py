@@ -0,0 +1,790 @@
+# -*- coding: utf-8 -*-
+"""
+下载工具 - 断点续传、多连接分段下载、边下载边校验与远程文件随机读取
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from .artifact_cache import HASH_CHUNK_SIZE, compute_sha256
+from .config import ConfigManager
+from .disk import preallocate
+from .http_client import get_session
+
+# 每写入多少字节保存一次下载日志
+JOURNAL_SAVE_INTERVAL = 1024 * 1024
+
+# 每个分段的最小大小，小文件不值得拆分
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+# 远程文件打开时预取的尾部大小，足以覆盖大多数zip的中央目录
+TAIL_PREFETCH_SIZE = 256 * 1024
+
+# 远程文件向前跳过的字节数小于该值时直接读取丢弃，不重新发起请求
+SEEK_SKIP_LIMIT = 64 * 1024
+
+# 下载的测速窗口（秒），窗口内速度低于下限时切换下载源
+SPEED_CHECK_INTERVAL = 5
+
+
+def get_staging_root() -> Path:
+    """获取下载暂存根目录"""
+    staging_root = ConfigManager().config_dir / "downloads"
+    staging_root.mkdir(parents=True, exist_ok=True)
+    return staging_root
+
+
+def _staging_path(url: str) -> Path:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return get_staging_root() / key
+
+
+def get_staging_dir(url: str) -> Path:
+    """获取指定URL的暂存目录，同一URL每次重试都得到同一个目录"""
+    staging_dir = _staging_path(url)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    return staging_dir
+
+
+def remove_staging_dir(url: str) -> None:
+    """删除指定URL的暂存目录，继续上次的安装时没有下载任务，只能按URL找到它"""
+    shutil.rmtree(_staging_path(url), ignore_errors=True)
+
+
+class SlowSourceError(Exception):
+    """下载源速度过慢，需要切换"""
+
+
+class ChecksumMismatchError(Exception):
+    """下载文件的sha256与预期不符"""
+
+    def __init__(self, expected: str, actual: str):
+        super().__init__(f"文件校验失败，sha256不匹配（预期 {expected[:12]}…，实际 {actual[:12]}…）")
+        self.expected = expected
+        self.actual = actual
+
+
+def verify_sha256(actual: str, expected: Optional[str]) -> None:
+    """校验sha256，expected 为空时不校验"""
+    if expected and actual.lower() != expected.strip().lower():
+        raise ChecksumMismatchError(expected, actual)
+
+
+def parse_checksum_file(content: str, file_name: str) -> Optional[str]:
+    """从sha256sum格式的校验文件中找到指定文件的sha256
+
+    也支持只包含一个哈希值的单文件校验文件（例如 xxx.zip.sha256）。
+    """
+    stripped = content.strip()
+    if len(stripped) == 64 and all(char in "0123456789abcdefABCDEF" for char in stripped):
+        return stripped.lower()
+    for line in content.splitlines():
+        parts = line.strip().split()
+        if len(parts) >= 2 and parts[-1].lstrip("*").split("/")[-1] == file_name:
+            return parts[0].lower()
+    return None
+
+
+def fetch_release_checksum(checksum_url: str, file_name: str) -> Optional[str]:
+    """从发布页提供的校验文件获取预期的sha256"""
+    response = get_session().get(checksum_url, timeout=(10, 30))
+    response.raise_for_status()
+    return parse_checksum_file(response.text, file_name)
+
+
+class OrderedHasher:
+    """按文件顺序增量计算sha256
+
+    写入位置恰好接在已哈希部分之后的数据块直接参与计算；乱序到达的数据
+    （例如分段下载的后续分段）在下载结束时再从文件中补读。
+    """
+
+    def __init__(self):
+        self.digest = hashlib.sha256()
+        self.position = 0
+        self._lock = threading.Lock()
+
+    def update(self, offset: int, data: bytes) -> None:
+        """提交一个已写入的数据块"""
+        with self._lock:
+            if offset == self.position:
+                self.digest.update(data)
+                self.position += len(data)
+
+    def finish(self, file_path: Path, total_size: int) -> str:
+        """补读尚未参与计算的部分，返回十六进制sha256"""
+        with self._lock:
+            if self.position < total_size:
+                with open(file_path, "rb") as f:
+                    f.seek(self.position)
+                    # 文件是预分配的，只读到 total_size 为止
+                    while self.position < total_size:
+                        chunk = f.read(min(HASH_CHUNK_SIZE, total_size - self.position))
+                        if not chunk:
+                            break
+                        self.digest.update(chunk)
+                        self.position += len(chunk)
+            return self.digest.hexdigest()
+
+
+def get_validator(etag: str, last_modified: str) -> str:
+    """获取校验标识，弱ETag不能用于If-Range，此时使用Last-Modified"""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return last_modified
+
+
+class DownloadJournal:
+    """下载日志 - 记录未完成下载的URL、校验标识和已接收字节数"""
+
+    def __init__(self, journal_file: Path):
+        self.journal_file = journal_file
+        self.url = ""
+        self.etag = ""
+        self.last_modified = ""
+        self.total_size = 0
+        self.downloaded_size = 0
+        # 分段下载时每段的 [起始, 结束, 已下载] 字节数
+        self.segments: List[List[int]] = []
+        self.load()
+
+    def load(self) -> None:
+        """加载下载日志"""
+        if not self.journal_file.exists():
+            return
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.url = data.get("url", "")
+            self.etag = data.get("etag", "")
+            self.last_modified = data.get("last_modified", "")
+            self.total_size = int(data.get("total_size", 0))
+            self.downloaded_size = int(data.get("downloaded_size", 0))
+            self.segments = [list(map(int, seg)) for seg in data.get("segments", [])]
+        except (json.JSONDecodeError, IOError, ValueError):
+            self.reset(self.url)
+
+    def save(self) -> None:
+        """保存下载日志"""
+        data: Dict[str, Any] = {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "total_size": self.total_size,
+            "downloaded_size": self.downloaded_size,
+            "segments": self.segments,
+        }
+        try:
+            with open(self.journal_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except IOError as e:
+            print(f"保存下载日志失败: {e}")
+
+    def reset(self, url: str) -> None:
+        """重置下载日志"""
+        self.url = url
+        self.etag = ""
+        self.last_modified = ""
+        self.total_size = 0
+        self.downloaded_size = 0
+        self.segments = []
+
+    def clear(self) -> None:
+        """删除下载日志"""
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+
+    def get_validator(self) -> str:
+        """获取If-Range校验标识"""
+        return get_validator(self.etag, self.last_modified)
+
+    def update_from_response(self, response: requests.Response) -> None:
+        """从响应头更新校验标识"""
+        self.etag = response.headers.get("ETag", "")
+        self.last_modified = response.headers.get("Last-Modified", "")
+
+
+def parse_content_range(value: str):
+    """解析Content-Range响应头，返回(起始字节, 总大小)"""
+    # 格式: bytes 100-999/1000
+    try:
+        unit, _, spec = value.partition(" ")
+        if unit.strip().lower() != "bytes":
+            return None, 0
+        byte_range, _, total = spec.partition("/")
+        start = int(byte_range.split("-")[0])
+        total_size = int(total) if total.strip() != "*" else 0
+        return start, total_size
+    except ValueError:
+        return None, 0
+
+
+class ResumableDownload:
+    """可断点续传的下载任务
+
+    未完成的文件和下载日志保存在稳定的暂存目录中，再次下载同一URL时
+    通过Range/If-Range请求从已接收的位置继续；服务器不支持范围请求
+    或文件已变化时自动回退为完整下载。
+    """
+
+    def __init__(self, url: str, file_name: str, staging_dir: Optional[Path] = None):
+        self.url = url
+        self.file_name = file_name
+        self.staging_dir = staging_dir or get_staging_dir(url)
+        self.part_file = self.staging_dir / f"{file_name}.part"
+        self.target_file = self.staging_dir / file_name
+        self.journal = DownloadJournal(self.staging_dir / "journal.json")
+        # 下载完成后文件的sha256，在写入的同时计算
+        self.sha256 = ""
+
+    def get_resume_offset(self) -> int:
+        """获取可续传的起始位置"""
+        if self.journal.url != self.url or not self.part_file.exists():
+            return 0
+        if self.journal.segments:
+            # 分段下载的文件是预分配的，文件大小不代表已接收的字节数
+            return 0
+        if not self.journal.get_validator():
+            return 0
+        # 文件是预分配的，以日志记录的已接收字节数为准
+        return min(self.journal.downloaded_size, self.part_file.stat().st_size)
+
+    def run(
+        self,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        source_url: Optional[str] = None,
+        min_speed: float = 0,
+    ) -> Path:
+        """执行下载，返回下载完成的文件路径
+
+        source_url 为实际请求的下载源（默认为 url），镜像的ETag与主下载源
+        不同，续传时不带If-Range。min_speed 大于0时，测速窗口内速度低于它
+        会抛出 SlowSourceError，已接收的部分记入下载日志，换源后继续。
+        """
+        if self._reuse_target_file():
+            return self.target_file
+
+        source_url = source_url or self.url
+        offset = self.get_resume_offset()
+        headers = {}
+        if offset > 0:
+            headers["Range"] = f"bytes={offset}-"
+            if source_url == self.url:
+                headers["If-Range"] = self.journal.get_validator()
+            print(f"尝试从 {offset} 字节处继续下载")
+
+        response = get_session().get(source_url, stream=True, headers=headers)
+        response.raise_for_status()
+
+        if response.status_code == 206 and offset > 0:
+            start, total_size = parse_content_range(response.headers.get("Content-Range", ""))
+            if start != offset:
+                # 服务器返回的范围与请求不符，放弃续传
+                response.close()
+                print("服务器返回的范围不匹配，重新完整下载")
+                self.discard()
+                return ResumableDownload.run(self, progress_callback, source_url, min_speed)
+            mode = "r+b"
+        else:
+            # 服务器忽略了Range或文件已变化，从头开始
+            if offset > 0:
+                print("服务器不支持续传或文件已变化，重新完整下载")
+            offset = 0
+            total_size = int(response.headers.get("content-length", 0))
+            mode = "wb"
+            self.journal.reset(self.url)
+            self.journal.update_from_response(response)
+
+        self.journal.total_size = total_size
+        self.journal.downloaded_size = offset
+        self.journal.save()
+
+        hasher = OrderedHasher()
+        if offset > 0:
+            # 续传时已有部分需要先计入哈希
+            hasher.finish(self.part_file, offset)
+
+        downloaded_size = offset
+        unsaved_size = 0
+        window_start = time.monotonic()
+        window_size = 0
+        try:
+            with open(self.part_file, mode) as f:
+                if offset > 0:
+                    f.seek(offset)
+                else:
+                    # 预分配完整大小，磁盘空间不足时在开始传输前就失败
+                    preallocate(f.fileno(), total_size)
+                for chunk in response.iter_content(chunk_size=8192):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    hasher.update(downloaded_size, chunk)
+                    downloaded_size += len(chunk)
+                    unsaved_size += len(chunk)
+                    if unsaved_size >= JOURNAL_SAVE_INTERVAL:
+                        f.flush()
+                        self.journal.downloaded_size = downloaded_size
+                        self.journal.save()
+                        unsaved_size = 0
+                    if progress_callback:
+                        progress_callback(downloaded_size, total_size)
+
+                    window_size += len(chunk)
+                    elapsed = time.monotonic() - window_start
+                    if elapsed >= SPEED_CHECK_INTERVAL:
+                        speed = window_size / elapsed
+                        if min_speed and speed < min_speed:
+                            f.flush()
+                            raise SlowSourceError(f"{speed / 1024:.0f}KB/s")
+                        window_start = time.monotonic()
+                        window_size = 0
+        finally:
+            response.close()
+            self.journal.downloaded_size = downloaded_size
+            self.journal.save()
+
+        if total_size > 0 and downloaded_size != total_size:
+            raise Exception(f"下载不完整: {downloaded_size}/{total_size} 字节")
+
+        self.sha256 = hasher.finish(self.part_file, downloaded_size)
+        self.part_file.replace(self.target_file)
+        return self.target_file
+
+    def _reuse_target_file(self) -> bool:
+        """上次已经完整下载时直接复用"""
+        if not self.target_file.exists() or self.journal.url != self.url:
+            return False
+        if self.journal.total_size not in (0, self.target_file.stat().st_size):
+            return False
+        self.sha256 = compute_sha256(self.target_file)
+        return True
+
+    def discard(self) -> None:
+        """丢弃未完成的文件和下载日志"""
+        if self.part_file.exists():
+            self.part_file.unlink()
+        self.journal.clear()
+        self.journal.reset(self.url)
+
+    def discard_target(self) -> None:
+        """丢弃已下载完成但校验失败的文件"""
+        if self.target_file.exists():
+            self.target_file.unlink()
+        self.discard()
+
+    def cleanup(self) -> None:
+        """安装成功后删除整个暂存目录"""
+        if self.staging_dir.exists():
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+def probe_download(url: str) -> Dict[str, Any]:
+    """探测下载地址是否支持范围请求，并获取文件大小和最终地址"""
+    # 用 bytes=0-0 代替HEAD，部分CDN对HEAD的处理与GET不一致
+    response = get_session().get(
+        url, headers={"Range": "bytes=0-0"}, stream=True, timeout=(10, 30)
+    )
+    try:
+        response.raise_for_status()
+        info: Dict[str, Any] = {
+            "url": response.url,
+            "accept_ranges": False,
+            "total_size": int(response.headers.get("content-length", 0)),
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+        }
+        if response.status_code == 206:
+            _, total_size = parse_content_range(response.headers.get("Content-Range", ""))
+            info["accept_ranges"] = total_size > 0
+            info["total_size"] = total_size
+        return info
+    finally:
+        response.close()
+
+
+def split_segments(total_size: int, connections: int) -> List[List[int]]:
+    """把文件拆分为若干 [起始, 结束, 已下载] 分段"""
+    count = max(1, min(connections, total_size // MIN_SEGMENT_SIZE))
+    segment_size = total_size // count
+    segments = []
+    for index in range(count):
+        start = index * segment_size
+        end = total_size - 1 if index == count - 1 else start + segment_size - 1
+        segments.append([start, end, 0])
+    return segments
+
+
+class SegmentedDownload(ResumableDownload):
+    """多连接分段下载任务
+
+    先用范围请求探测服务器能力，再把文件拆成多段并发下载，各段直接写入
+    同一个预分配文件的对应位置。服务器不支持范围请求时回退到单连接的
+    断点续传下载。分段进度同样记录在下载日志中，中断后只补下未完成的部分。
+
+    提供 mirror_urls 和 min_speed 时，某个分段（或单连接下载）的速度在
+    测速窗口内低于 min_speed（字节/秒）或连接出错，会从当前位置改用
+    下一个镜像继续下载。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        file_name: str,
+        connections: int = 4,
+        staging_dir: Optional[Path] = None,
+        mirror_urls: Optional[List[str]] = None,
+        min_speed: float = 0,
+    ):
+        super().__init__(url, file_name, staging_dir)
+        self.connections = connections
+        self.mirror_urls = [u for u in (mirror_urls or []) if u != url]
+        self.min_speed = min_speed
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def run(
+        self,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        info: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """执行下载，返回下载完成的文件路径
+
+        info 为 probe_download 的结果，调用方已经探测过时可传入以省去一次请求。
+        """
+        if self._reuse_target_file():
+            return self.target_file
+
+        if self.connections <= 1:
+            return self._run_single(progress_callback)
+
+        info = info or probe_download(self.url)
+        total_size = info["total_size"]
+        if not info["accept_ranges"] or total_size < MIN_SEGMENT_SIZE * 2:
+            print("服务器不支持范围请求或文件较小，使用单连接下载")
+            if self.journal.segments:
+                self.discard()
+            return self._run_single(progress_callback)
+
+        validator = get_validator(info["etag"], info["last_modified"])
+        if not self._can_resume_segments(info):
+            self.discard()
+            self.journal.reset(self.url)
+            self.journal.etag = info["etag"]
+            self.journal.last_modified = info["last_modified"]
+            self.journal.total_size = total_size
+            self.journal.segments = split_segments(total_size, self.connections)
+            # 预分配完整大小的文件，各分段直接写入自己的位置
+            with open(self.part_file, "wb") as f:
+                preallocate(f.fileno(), total_size)
+            self.journal.save()
+        else:
+            print("继续未完成的分段下载")
+
+        pending = [seg for seg in self.journal.segments if seg[0] + seg[2] <= seg[1]]
+        print(f"分段下载: {len(self.journal.segments)} 段, 待下载 {len(pending)} 段")
+
+        self._cancelled.clear()
+        self._hasher = OrderedHasher()
+        # 主下载源使用跳转后的地址，镜像源不使用If-Range（各镜像的ETag不同）
+        self._sources = [info["url"]] + self.mirror_urls
+        self._source_switches = 0
+        fd = os.open(self.part_file, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+        try:
+            with ThreadPoolExecutor(max_workers=len(pending) or 1) as executor:
+                futures = [
+                    executor.submit(
+                        self._fetch_segment,
+                        validator,
+                        segment,
+                        fd,
+                        progress_callback,
+                    )
+                    for segment in pending
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except Exception:
+                    self._cancelled.set()
+                    raise
+        finally:
+            os.close(fd)
+            with self._lock:
+                self.journal.downloaded_size = self._get_downloaded_size()
+                self.journal.save()
+
+        # 第一段在下载时已经计入哈希，其余分段从页缓存中补读
+        self.sha256 = self._hasher.finish(self.part_file, total_size)
+        self.part_file.replace(self.target_file)
+        return self.target_file
+
+    def _run_single(self, progress_callback: Optional[Callable[[int, int], None]]) -> Path:
+        """单连接下载，速度过慢或出错时与分段下载一样从当前位置改用下一个下载源"""
+        sources = [self.url] + self.mirror_urls
+        source_index = 0
+        switches = 0
+        while True:
+            can_switch = len(sources) > 1 and switches < len(sources) * 2
+            try:
+                return ResumableDownload.run(
+                    self,
+                    progress_callback,
+                    source_url=sources[source_index],
+                    min_speed=self.min_speed if can_switch else 0,
+                )
+            except (
+                SlowSourceError,
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                if not can_switch:
+                    raise
+                switches += 1
+                source_index = (source_index + 1) % len(sources)
+                print(f"单连接下载切换下载源 ({e}): {sources[source_index]}")
+
+    def _can_resume_segments(self, info: Dict[str, Any]) -> bool:
+        """检查是否可以继续上次的分段下载"""
+        journal = self.journal
+        if journal.url != self.url or not journal.segments:
+            return False
+        if not self.part_file.exists():
+            return False
+        if journal.total_size != info["total_size"]:
+            return False
+        if self.part_file.stat().st_size != journal.total_size:
+            return False
+        if journal.etag or info["etag"]:
+            return journal.etag == info["etag"]
+        return journal.last_modified == info["last_modified"]
+
+    def _get_downloaded_size(self) -> int:
+        """获取所有分段已下载的字节数"""
+        return sum(seg[2] for seg in self.journal.segments)
+
+    def _fetch_segment(self, validator, segment, fd, progress_callback):
+        """下载单个分段，速度过慢或出错时切换到下一个下载源"""
+        start, end, _ = segment
+        source_index = 0
+        while True:
+            url = self._sources[source_index]
+            with self._lock:
+                can_switch = (
+                    len(self._sources) > 1
+                    and self._source_switches < len(self._sources) * 2
+                )
+            try:
+                self._fetch_range(
+                    url,
+                    validator if source_index == 0 else "",
+                    segment,
+                    fd,
+                    progress_callback,
+                    can_switch,
+                )
+                return
+            except (
+                SlowSourceError,
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                if not can_switch or self._cancelled.is_set():
+                    raise
+                with self._lock:
+                    self._source_switches += 1
+                source_index = (source_index + 1) % len(self._sources)
+                print(f"分段 {start}-{end} 切换下载源 ({e}): {self._sources[source_index]}")
+
+    def _fetch_range(self, url, validator, segment, fd, progress_callback, check_speed):
+        """从指定下载源获取分段的剩余部分"""
+        start, end, done = segment
+        headers = {"Range": f"bytes={start + done}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+
+        response = get_session().get(url, stream=True, headers=headers)
+        try:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise Exception("文件在下载过程中发生变化，请重试")
+            range_start, _ = parse_content_range(response.headers.get("Content-Range", ""))
+            if range_start != start + done:
+                raise Exception("下载源返回的范围不匹配")
+
+            unsaved_size = 0
+            window_start = time.monotonic()
+            window_size = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                if self._cancelled.is_set():
+                    return
+                if not chunk:
+                    continue
+                offset = start + segment[2]
+                chunk = chunk[: end - offset + 1]
+                _pwrite(fd, chunk, offset)
+                self._hasher.update(offset, chunk)
+                with self._lock:
+                    segment[2] += len(chunk)
+                    unsaved_size += len(chunk)
+                    downloaded_size = self._get_downloaded_size()
+                    if unsaved_size >= JOURNAL_SAVE_INTERVAL:
+                        self.journal.downloaded_size = downloaded_size
+                        self.journal.save()
+                        unsaved_size = 0
+                if progress_callback:
+                    progress_callback(downloaded_size, self.journal.total_size)
+                if start + segment[2] > end:
+                    break
+
+                window_size += len(chunk)
+                elapsed = time.monotonic() - window_start
+                if elapsed >= SPEED_CHECK_INTERVAL:
+                    speed = window_size / elapsed
+                    if check_speed and speed < self.min_speed:
+                        raise SlowSourceError(f"{speed / 1024:.0f}KB/s")
+                    window_start = time.monotonic()
+                    window_size = 0
+        finally:
+            response.close()
+
+        if start + segment[2] <= end:
+            raise Exception(f"分段 {start}-{end} 下载不完整")
+
+
+_pwrite_lock = threading.Lock()
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """在指定位置写入数据，Windows没有os.pwrite时退化为加锁的seek+write"""
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+        return
+    with _pwrite_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while data:
+            written = os.write(fd, data)
+            data = data[written:]
+
+
+class HttpRangeFile(io.RawIOBase):
+    """基于范围请求的只读远程文件
+
+    打开时预取文件尾部（zip的中央目录所在位置），之后的读取沿用同一个
+    流式响应顺序读下去，只有发生较远的跳转时才重新发起范围请求。配合
+    zipfile 使用时，无需把整个压缩包写入磁盘即可按成员解压。
+    """
+
+    def __init__(self, url: str, total_size: int):
+        super().__init__()
+        self.url = url
+        self.total_size = total_size
+        self.session = get_session()
+        self.bytes_fetched = 0
+        self._pos = 0
+        self._response = None
+        self._stream_pos = -1
+        self._tail_start = max(0, total_size - TAIL_PREFETCH_SIZE)
+        self._tail = self._fetch_range(self._tail_start, total_size - 1)
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        """一次性获取指定范围的数据"""
+        response = self.session.get(
+            self.url, headers={"Range": f"bytes={start}-{end}"}
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise Exception("服务器不支持范围请求")
+        self.bytes_fetched += len(response.content)
+        return response.content
+
+    def _open_stream(self, start: int) -> None:
+        """从指定位置打开流式响应，读到尾部缓冲区之前为止"""
+        self._close_stream()
+        response = self.session.get(
+            self.url,
+            headers={"Range": f"bytes={start}-{self._tail_start - 1}"},
+            stream=True,
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            response.close()
+            raise Exception("服务器不支持范围请求")
+        self._response = response
+        self._stream_pos = start
+
+    def _close_stream(self) -> None:
+        """关闭当前的流式响应"""
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+            self._stream_pos = -1
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.total_size + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        if self._pos >= self.total_size or len(buffer) == 0:
+            return 0
+
+        if self._pos >= self._tail_start:
+            # 尾部数据已经预取
+            offset = self._pos - self._tail_start
+            data = self._tail[offset : offset + len(buffer)]
+        else:
+            gap = self._pos - self._stream_pos
+            if self._response is None or gap < 0 or gap > SEEK_SKIP_LIMIT:
+                self._open_stream(self._pos)
+            elif gap > 0:
+                # 小范围向前跳转，直接读取丢弃
+                self._read_stream(gap)
+            size = min(len(buffer), self._tail_start - self._pos)
+            data = self._read_stream(size)
+            if not data:
+                raise Exception("远程文件读取中断")
+
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def _read_stream(self, size: int) -> bytes:
+        """从流式响应中读取数据"""
+        data = self._response.raw.read(size)
+        self._stream_pos += len(data)
+        self.bytes_fetched += len(data)
+        return data
+
+    def close(self) -> None:
+        self._close_stream()
+        super().close()
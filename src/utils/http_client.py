@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP客户端 - 全局共享的连接池会话，统一超时、重试退避和代理设置
+"""
+
+import random
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import ConfigManager
+
+# 连接超时和读取超时（秒），读取超时针对两次收到数据之间的间隔
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# 连接失败、连接被重置或服务器返回5xx时的最大重试次数
+MAX_RETRIES = 3
+
+# 指数退避的基数和上限（秒），第n次重试前等待 基数 * 2^(n-1)，再加随机抖动
+BACKOFF_FACTOR = 0.5
+BACKOFF_MAX = 30
+
+# 需要重试的状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 每个主机保持的连接数，不小于分段下载的最大连接数
+POOL_SIZE = 16
+
+_session_lock = threading.Lock()
+_sessions: Dict[bool, requests.Session] = {}
+
+
+class JitterRetry(Retry):
+    """在指数退避的基础上加入随机抖动，避免多个连接同时重试"""
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return 0
+        return min(backoff * random.uniform(0.5, 1.5), BACKOFF_MAX)
+
+
+class TimeoutSession(requests.Session):
+    """未指定超时的请求使用默认超时，避免卡死的连接让线程永远等待"""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(retry: bool = True) -> requests.Session:
+    """创建会话
+
+    retry 为 False 时不重试，用于测速等需要快速失败的场景。代理优先使用
+    设置中的代理地址，未设置时沿用系统环境变量（HTTP_PROXY 等）。
+    """
+    session = TimeoutSession()
+    retries = JitterRetry(
+        total=MAX_RETRIES if retry else 0,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    proxy = ConfigManager().get("proxy", "")
+    if proxy:
+        session.proxies = {"http": proxy, "https": proxy}
+    return session
+
+
+def get_session(retry: bool = True) -> requests.Session:
+    """获取全局共享的会话，同一主机的请求复用连接，省去重复的TLS握手"""
+    with _session_lock:
+        session = _sessions.get(retry)
+        if session is None:
+            session = create_session(retry)
+            _sessions[retry] = session
+        return session
+
+
+def reset_sessions() -> None:
+    """关闭并丢弃共享会话，代理等设置变更后调用"""
+    with _session_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
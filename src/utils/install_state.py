@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+安装检查点 - 每完成一个安装阶段记录一次，程序异常退出或安装失败后可从上次完成的阶段继续
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import ConfigManager
+
+# 安装阶段，按执行顺序排列
+INSTALL_PHASES = ("download", "extract", "install", "path", "register")
+
+# 阶段名称，用于提示用户
+INSTALL_PHASE_NAMES = {
+    "download": "下载",
+    "extract": "解压",
+    "install": "安装",
+    "path": "配置环境变量",
+    "register": "登记",
+}
+
+_state_lock = threading.Lock()
+
+
+def phase_index(phase: Optional[str]) -> int:
+    """阶段的序号，尚未完成任何阶段时为-1"""
+    return INSTALL_PHASES.index(phase) if phase in INSTALL_PHASES else -1
+
+
+class InstallStateStore:
+    """安装检查点存储
+
+    每个工具一个JSON文件，位于配置目录下的 install_states。记录创建下载
+    管理器所需的参数、最后完成的阶段（completed）以及各阶段的产出（下载的
+    文件、临时目录、解压出的文件、上游版本信息等）。安装成功后删除。
+    """
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self.state_dir = state_dir or ConfigManager().config_dir / "install_states"
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+    def _state_file(self, name: str) -> Path:
+        return self.state_dir / f"{name.lower()}.json"
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """加载检查点，不存在或已损坏时返回None"""
+        state_file = self._state_file(name)
+        with _state_lock:
+            if not state_file.exists():
+                return None
+            try:
+                with open(state_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return None
+
+    def save(self, name: str, state: Dict[str, Any]) -> None:
+        """保存检查点，先写临时文件再替换，异常退出时也不会留下半个文件"""
+        state_file = self._state_file(name)
+        temp_file = state_file.with_suffix(".tmp")
+        state["updated_time"] = time.time()
+        with _state_lock:
+            try:
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(state, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, state_file)
+            except IOError as e:
+                print(f"保存安装检查点失败: {e}")
+
+    def checkpoint(self, name: str, state: Dict[str, Any], phase: str, **outputs: Any) -> None:
+        """记录阶段完成及其产出"""
+        state.update(outputs)
+        state["completed"] = phase
+        self.save(name, state)
+        print(f"检查点: {INSTALL_PHASE_NAMES.get(phase, phase)}完成")
+
+    def clear(self, name: str) -> None:
+        """删除检查点"""
+        with _state_lock:
+            state_file = self._state_file(name)
+            if state_file.exists():
+                state_file.unlink()
+
+    def discard(self, name: str) -> None:
+        """放弃未完成的安装，删除检查点和保留的临时目录"""
+        state = self.load(name)
+        if state and state.get("temp_dir"):
+            shutil.rmtree(state["temp_dir"], ignore_errors=True)
+        self.clear(name)
+
+    def get_pending(self) -> List[Dict[str, Any]]:
+        """所有未完成的安装，按更新时间排序"""
+        states = []
+        for state_file in self.state_dir.glob("*.json"):
+            state = self.load(state_file.stem)
+            if state and state.get("target_name"):
+                states.append(state)
+        return sorted(states, key=lambda state: state.get("updated_time", 0))
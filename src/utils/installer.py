@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+安装工具 - 版本化目录与原子切换
+"""
+
+import datetime
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+# 跨文件系统复制时的并发线程数
+COPY_WORKERS = 8
+
+# 切换版本后保留的旧版本数量
+KEEP_OLD_VERSIONS = 1
+
+
+def get_install_dir(target_name: str) -> Path:
+    """获取工具的安装目录（项目根目录下的同名小写目录）"""
+    return Path(target_name.lower()).absolute()
+
+
+def get_versions_dir(install_dir: Path) -> Path:
+    """获取存放各版本的目录"""
+    return install_dir.parent / f".{install_dir.name}-versions"
+
+
+def create_staging_dir(install_dir: Path) -> Path:
+    """在安装目录所在的文件系统上创建临时目录，保证安装时可以直接重命名"""
+    install_dir.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        return Path(tempfile.mkdtemp(prefix=f".{install_dir.name}-staging-", dir=install_dir.parent))
+    except OSError as e:
+        print(f"无法在安装目录旁创建临时目录，改用系统临时目录: {e}")
+        return Path(tempfile.mkdtemp())
+
+
+def is_same_filesystem(path_a: Path, path_b: Path) -> bool:
+    """判断两个路径是否位于同一文件系统"""
+    try:
+        return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+    except OSError:
+        return False
+
+
+def parallel_copytree(
+    source_dir: Path,
+    target_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """用线程池并发复制目录树，用于跨文件系统安装"""
+    files: List[Tuple[Path, Path]] = []
+    for root, dirs, file_names in os.walk(source_dir):
+        relative = Path(root).relative_to(source_dir)
+        (target_dir / relative).mkdir(parents=True, exist_ok=True)
+        for file_name in file_names:
+            files.append((Path(root) / file_name, target_dir / relative / file_name))
+
+    total_size = sum(source.stat().st_size for source, _ in files)
+    copied_size = 0
+
+    def copy_file(item):
+        source, target = item
+        shutil.copy2(source, target, follow_symlinks=False)
+        return source.stat().st_size if not source.is_symlink() else 0
+
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        for size in executor.map(copy_file, files):
+            copied_size += size
+            if progress_callback:
+                progress_callback(copied_size, total_size)
+
+
+def _swap_directory(version_dir: Path, install_dir: Path) -> None:
+    """把安装目录原子地切换到新版本
+
+    优先让安装目录成为指向版本目录的符号链接，通过 os.replace 替换链接
+    完成切换；无法创建符号链接时（例如Windows未开启开发者模式），改为
+    先把旧目录移开再把新版本目录重命名过去。
+    """
+    if install_dir.exists() and not install_dir.is_symlink():
+        # 旧版本是直接复制进来的普通目录，先移入版本目录
+        legacy_dir = version_dir.parent / f"legacy-{datetime.datetime.now():%Y%m%d%H%M%S}"
+        os.replace(install_dir, legacy_dir)
+        print(f"旧安装目录已移至: {legacy_dir}")
+
+    temp_link = install_dir.parent / f".{install_dir.name}.link-{os.getpid()}"
+    try:
+        if temp_link.is_symlink():
+            temp_link.unlink()
+        os.symlink(version_dir, temp_link, target_is_directory=True)
+        os.replace(temp_link, install_dir)
+        return
+    except OSError as e:
+        print(f"创建符号链接失败，改用目录重命名: {e}")
+        if temp_link.is_symlink():
+            temp_link.unlink()
+
+    if install_dir.is_symlink():
+        install_dir.unlink()
+    os.replace(version_dir, install_dir)
+
+
+def _cleanup_old_versions(versions_dir: Path, current: Path) -> None:
+    """删除多余的旧版本"""
+    old_versions = sorted(
+        (item for item in versions_dir.iterdir() if item.is_dir() and item != current),
+        key=lambda item: item.stat().st_mtime,
+        reverse=True,
+    )
+    for item in old_versions[KEEP_OLD_VERSIONS:]:
+        shutil.rmtree(item, ignore_errors=True)
+        print(f"已删除旧版本: {item}")
+
+
+def install_directory(
+    source_dir: Path,
+    install_dir: Path,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> Path:
+    """把解压好的目录安装为新版本并切换过去，返回安装目录
+
+    与安装目录位于同一文件系统时只做一次重命名，不复制任何数据；跨文件
+    系统时用线程池并发复制到版本目录。无论哪种方式，安装目录要么是旧版本，
+    要么是完整的新版本，不会出现只装了一半的状态。
+    """
+    versions_dir = get_versions_dir(install_dir)
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    version_dir = versions_dir / datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+    if is_same_filesystem(source_dir, versions_dir):
+        os.replace(source_dir, version_dir)
+        print(f"已重命名到版本目录: {version_dir}")
+    else:
+        print(f"跨文件系统安装，并发复制到: {version_dir}")
+        partial_dir = versions_dir / f".partial-{version_dir.name}"
+        parallel_copytree(source_dir, partial_dir, progress_callback)
+        os.replace(partial_dir, version_dir)
+
+    _swap_directory(version_dir, install_dir)
+    _cleanup_old_versions(versions_dir, version_dir)
+    if progress_callback:
+        progress_callback(1, 1)
+    return install_dir
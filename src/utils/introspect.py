@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+解释器内省 - 在候选解释器中运行一次探测脚本，取得判断能否运行真寻Bot所需的全部信息
+
+脚本以 -I -S 运行（不读取环境变量和用户目录，不自动导入site），输出一行
+JSON：版本、实现、位数、架构、sys.prefix、pip/venv/ssl/sqlite3 是否可用以及
+site-packages 路径。原来只能从 --version 得到版本，检查其他组件还要再启动
+几次解释器。
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .artifacts import PYTHON_VERSION
+from .detection_cache import DetectionCache
+from .probe import PROBE_DEADLINE, probe_concurrently
+from .python_version import read_python_version
+
+# 真寻Bot支持的Python版本范围 [最低, 最高)
+MIN_PYTHON_VERSION = (3, 10)
+MAX_PYTHON_VERSION = (4, 0)
+
+# 推荐的版本，与本程序下载安装的版本一致
+RECOMMENDED_PYTHON_VERSION = tuple(int(part) for part in PYTHON_VERSION.split(".")[:2])
+
+# 创建虚拟环境、安装依赖和运行真寻Bot需要的模块
+REQUIRED_MODULES = ("pip", "venv", "ssl", "sqlite3")
+
+# 在候选解释器中运行的脚本，需兼容较旧的Python 3，失败时以非零状态退出
+INTROSPECT_SCRIPT = r"""
+import json, os, platform, struct, sys
+
+def can_import(name):
+    try:
+        __import__(name)
+        return True
+    except Exception:
+        return False
+
+import site
+try:
+    # 3.11 以前虚拟环境的 sys.prefix 由 site 设置，-S 时需手动处理
+    site.venv(None)
+    site_packages = [path for path in site.getsitepackages() if os.path.isdir(path)]
+except Exception:
+    site_packages = []
+modules = {
+    "pip": any(os.path.isdir(os.path.join(path, "pip")) for path in site_packages),
+    "venv": can_import("venv") and can_import("ensurepip"),
+    "ssl": can_import("ssl"),
+    "sqlite3": can_import("sqlite3"),
+}
+print(json.dumps({
+    "version": platform.python_version(),
+    "version_info": list(sys.version_info[:3]),
+    "implementation": sys.implementation.name,
+    "bits": struct.calcsize("P") * 8,
+    "machine": platform.machine(),
+    "executable": sys.executable,
+    "prefix": sys.prefix,
+    "base_prefix": getattr(sys, "base_prefix", sys.prefix),
+    "modules": modules,
+    "site_packages": site_packages,
+}))
+"""
+
+
+def build_introspect_command(executable: str) -> List[str]:
+    """在解释器中运行探测脚本的命令行"""
+    return [executable, "-I", "-S", "-c", INTROSPECT_SCRIPT]
+
+
+def parse_introspection(output: str) -> Optional[Dict[str, Any]]:
+    """解析探测脚本的输出，格式不对时返回None"""
+    try:
+        info = json.loads(output.strip().splitlines()[-1])
+    except (ValueError, IndexError, AttributeError):
+        return None
+    if not isinstance(info, dict) or not isinstance(info.get("version_info"), list):
+        return None
+    info.setdefault("modules", {})
+    return info
+
+
+def introspect_interpreters(
+    paths: Sequence[str], deadline: float = PROBE_DEADLINE, cache: Optional[DetectionCache] = None
+) -> Dict[str, Dict[str, Any]]:
+    """并发内省多个解释器，每个只启动一次，返回 路径 -> 内省结果
+
+    文件未变化的直接使用缓存。缺少模块的结果不写入缓存，之后安装了pip等
+    组件（解释器文件本身不变）时能重新检测到。
+    """
+    if cache is None:
+        cache = DetectionCache(section="introspection", resolve_links=False)
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for path in paths:
+        output = cache.lookup(path)
+        info = parse_introspection(output) if isinstance(output, str) else None
+        if info:
+            results[path] = info
+        else:
+            pending.append(path)
+
+    outputs: Dict[str, str] = {}
+
+    def on_resolved(path, found, _, output):
+        if found:
+            outputs[path] = output
+
+    probe_concurrently(
+        {path: [(path, build_introspect_command(path))] for path in pending},
+        on_resolved,
+        deadline=deadline,
+        first_line=False,
+    )
+
+    for path, output in outputs.items():
+        info = parse_introspection(output)
+        if info is None:
+            print(f"无法解析解释器内省结果: {path}")
+            continue
+        results[path] = info
+        if all(info["modules"].get(module) for module in REQUIRED_MODULES):
+            cache.store(path, output)
+    cache.flush()
+    return results
+
+
+def skip_incompatible(paths: Sequence[str]) -> List[str]:
+    """不启动解释器筛掉版本不受支持的候选
+
+    能从安装目录读取到版本且不在支持范围内的不再内省，读不到版本的保留。
+    """
+    kept = []
+    for path in paths:
+        version = read_python_version(path)
+        if version:
+            minor = tuple(int(part) for part in version.split()[-1].split(".")[:2])
+            if not MIN_PYTHON_VERSION <= minor < MAX_PYTHON_VERSION:
+                continue
+        kept.append(path)
+    return kept
+
+
+def check_interpreter(info: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """检查解释器能否运行真寻Bot，返回(版本是否兼容, 问题列表)"""
+    version = tuple(info["version_info"][:2])
+    problems = []
+    compatible = MIN_PYTHON_VERSION <= version < MAX_PYTHON_VERSION
+    if not compatible:
+        problems.append(
+            f"版本 {info.get('version', '')} 不受支持，需要 "
+            f"{MIN_PYTHON_VERSION[0]}.{MIN_PYTHON_VERSION[1]} 及以上"
+        )
+    missing = [module for module in REQUIRED_MODULES if not info["modules"].get(module)]
+    if missing:
+        problems.append("缺少 " + "、".join(missing))
+    if info.get("bits") != 64:
+        problems.append(f"{info.get('bits')}位解释器")
+    return compatible, problems
+
+
+def score_interpreter(info: Dict[str, Any]) -> Tuple:
+    """解释器的排序依据，越大越适合运行真寻Bot
+
+    依次比较：版本是否兼容、缺少的模块数、是否为CPython、是否64位、
+    是否为推荐版本、版本号。
+    """
+    compatible, _ = check_interpreter(info)
+    missing = sum(1 for module in REQUIRED_MODULES if not info["modules"].get(module))
+    version = tuple(info["version_info"][:3])
+    return (
+        compatible,
+        -missing,
+        info.get("implementation") == "cpython",
+        info.get("bits") == 64,
+        version[:2] == RECOMMENDED_PYTHON_VERSION,
+        version,
+    )
+
+
+def rank_interpreters(
+    paths: Sequence[str], infos: Dict[str, Dict[str, Any]]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """按适合程度排序内省成功的解释器，同样合适时保持候选原来的优先级"""
+    ranked = [(path, infos[path]) for path in paths if path in infos]
+    # sorted 是稳定排序，得分相同的候选保持原来的顺序
+    return sorted(ranked, key=lambda item: score_interpreter(item[1]), reverse=True)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+解释器清单 - 扫描PATH和各版本管理工具的安装目录，列出本机所有的Python解释器
+
+每个目录只用 os.scandir 读取一次，按文件名筛选出解释器，同一个程序
+（python、python3、python3.11 等链接到同一文件）按真实路径只保留一个。
+版本优先从安装目录中的文件读取，读不到时才并发探测，文件未变化的直接
+使用检测缓存；架构从可执行文件的文件头读取，不需要启动子进程。
+"""
+
+import glob
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .artifacts import MACHINE_ALIASES
+from .detection_cache import DetectionCache
+from .probe import probe_concurrently
+from .python_version import INTERPRETER_NAME, read_python_version
+
+# 目录名中带这些内容的PATH条目不是真正的解释器（版本管理工具的转发脚本、应用商店别名）
+SKIPPED_PATH_PARTS = ("shims", "WindowsApps")
+
+# ELF e_machine -> 架构名
+ELF_MACHINES = {0x03: "x86", 0x28: "arm", 0x3E: "x86_64", 0xB7: "arm64", 0xF3: "riscv64"}
+
+# PE Machine -> 架构名
+PE_MACHINES = {0x014C: "x86", 0x8664: "x86_64", 0xAA64: "arm64"}
+
+# Mach-O cputype -> 架构名
+MACHO_CPU_TYPES = {0x01000007: "x86_64", 0x0100000C: "arm64"}
+
+
+def _version_dirs(pattern: str) -> List[str]:
+    """展开版本管理工具按版本分目录的安装路径"""
+    return sorted(glob.glob(os.path.expanduser(os.path.expandvars(pattern))))
+
+
+def get_search_roots() -> List[Tuple[str, str]]:
+    """要扫描的目录及其来源，按优先级排列：PATH在前，各版本管理工具在后"""
+    roots: List[Tuple[str, str]] = []
+    for entry in os.environ.get("PATH", "").split(os.pathsep):
+        if entry and not any(part in entry for part in SKIPPED_PATH_PARTS):
+            roots.append((entry, "PATH"))
+
+    home = Path.home()
+    pyenv_root = os.environ.get("PYENV_ROOT", str(home / ".pyenv"))
+    conda_roots = [str(home / name) for name in ("miniconda3", "anaconda3", "miniforge3", "mambaforge")]
+    if os.environ.get("CONDA_PREFIX"):
+        conda_roots.insert(0, os.environ["CONDA_PREFIX"])
+
+    if os.name == "nt":
+        patterns = [
+            (os.path.join(pyenv_root, "pyenv-win", "versions", "*"), "pyenv"),
+            (r"%APPDATA%\uv\python\*", "uv"),
+            (r"%LOCALAPPDATA%\Programs\Python\Python*", "官方安装"),
+            (r"C:\Python*", "官方安装"),
+        ]
+        for conda_root in conda_roots:
+            patterns.append((conda_root, "conda"))
+            patterns.append((os.path.join(conda_root, "envs", "*"), "conda"))
+    else:
+        patterns = [
+            (os.path.join(pyenv_root, "versions", "*", "bin"), "pyenv"),
+            (os.path.join(os.environ.get("ASDF_DATA_DIR", "~/.asdf"), "installs", "python", "*", "bin"), "asdf"),
+            ("~/.local/share/uv/python/*/bin", "uv"),
+            ("~/.rye/py/*/bin", "rye"),
+            ("/Library/Frameworks/Python.framework/Versions/*/bin", "官方安装"),
+        ]
+        for conda_root in conda_roots:
+            patterns.append((os.path.join(conda_root, "bin"), "conda"))
+            patterns.append((os.path.join(conda_root, "envs", "*", "bin"), "conda"))
+    # 当前目录下的虚拟环境
+    venv_bin = "Scripts" if os.name == "nt" else "bin"
+    for name in (".venv", "venv"):
+        patterns.append((os.path.join(os.getcwd(), name, venv_bin), "venv"))
+
+    for pattern, source in patterns:
+        for directory in _version_dirs(pattern):
+            roots.append((directory, source))
+    return roots
+
+
+def scan_directory(directory: str) -> List[str]:
+    """读取一次目录，返回其中的解释器"""
+    found = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not INTERPRETER_NAME.match(entry.name):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if os.name != "nt" and not os.access(entry.path, os.X_OK):
+                    continue
+                found.append(entry.path)
+    except OSError:
+        # 目录不存在或没有权限
+        pass
+    # python 排在 python3、python3.11 之前，同一程序保留最常用的名字
+    return sorted(found, key=lambda path: (len(os.path.basename(path)), path))
+
+
+def read_binary_arch(path: str) -> str:
+    """从可执行文件的文件头读取架构（ELF、PE、Mach-O），无法识别时返回空字符串"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(64)
+            if header[:4] == b"\x7fELF" and len(header) >= 20:
+                byte_order = "<" if header[5] == 1 else ">"
+                return ELF_MACHINES.get(struct.unpack(byte_order + "H", header[18:20])[0], "")
+            if header[:2] == b"MZ" and len(header) >= 64:
+                pe_offset = struct.unpack("<I", header[60:64])[0]
+                f.seek(pe_offset)
+                pe_header = f.read(6)
+                if pe_header[:4] == b"PE\0\0":
+                    return PE_MACHINES.get(struct.unpack("<H", pe_header[4:6])[0], "")
+                return ""
+            if header[:4] in (b"\xcf\xfa\xed\xfe", b"\xce\xfa\xed\xfe") and len(header) >= 8:
+                return MACHO_CPU_TYPES.get(struct.unpack("<I", header[4:8])[0], "")
+            if header[:4] == b"\xca\xfe\xba\xbe":
+                return "universal"
+    except (OSError, struct.error):
+        pass
+    return ""
+
+
+def normalize_machine(machine: str) -> str:
+    """统一架构名的写法"""
+    return MACHINE_ALIASES.get(machine.lower(), machine.lower())
+
+
+def parse_version(version: str) -> Tuple[int, ...]:
+    """从版本输出中取出版本号用于排序，例如 "Python 3.11.9" -> (3, 11, 9)"""
+    match = re.search(r"(\d+(?:\.\d+)*)", version or "")
+    if not match:
+        return ()
+    return tuple(int(part) for part in match.group(1).split("."))
+
+
+def find_interpreters(roots: Optional[List[Tuple[str, str]]] = None) -> List[Dict[str, Any]]:
+    """列出所有解释器（路径、真实路径、来源），按真实路径去重，不启动子进程"""
+    interpreters: List[Dict[str, Any]] = []
+    seen_dirs = set()
+    seen = set()
+    for directory, source in roots if roots is not None else get_search_roots():
+        directory_key = os.path.normcase(os.path.abspath(directory))
+        if directory_key in seen_dirs:
+            continue
+        seen_dirs.add(directory_key)
+        for path in scan_directory(directory):
+            real_path = os.path.normcase(os.path.realpath(path))
+            if real_path in seen:
+                continue
+            seen.add(real_path)
+            interpreters.append({"path": path, "real_path": real_path, "source": source})
+    return interpreters
+
+
+def scan_interpreters(
+    roots: Optional[List[Tuple[str, str]]] = None, cache: Optional[DetectionCache] = None
+) -> List[Dict[str, Any]]:
+    """列出所有可用的解释器及其版本和架构
+
+    版本能从安装目录中的文件读取的不运行解释器，其余的在探测线程池中并发
+    运行版本命令，文件未变化的直接使用检测缓存；运行失败的（损坏的安装、
+    无效的链接）不列出。
+    """
+    interpreters = find_interpreters(roots)
+    cache = cache if cache is not None else DetectionCache()
+    results: Dict[str, str] = {}
+
+    def on_resolved(real_path, found, path, version):
+        if found:
+            results[real_path] = version
+
+    # 每个解释器单独确定结果，互不等待
+    probe_concurrently(
+        {item["real_path"]: [(item["path"], [item["path"], "--version"])] for item in interpreters},
+        on_resolved,
+        cache=cache,
+        version_reader=read_python_version,
+    )
+
+    inventory = []
+    for item in interpreters:
+        version = results.get(item["real_path"])
+        if version is None:
+            continue
+        arch = read_binary_arch(item["real_path"])
+        item.update({"version": version, "arch": normalize_machine(arch) if arch else ""})
+        inventory.append(item)
+    return inventory
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+镜像测速 - 并发探测各镜像的首字节时间和吞吐量，选出最快的下载源
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .config import ConfigManager
+from .download import parse_content_range
+from .http_client import get_session
+
+# 每个镜像测速时下载的字节数
+PROBE_SIZE = 256 * 1024
+
+# 测速结果的有效期（秒）
+PROBE_CACHE_TTL = 10 * 60
+
+# 整轮测速的超时时间（秒）
+PROBE_TIMEOUT = 8
+
+# 按预计下载该大小所需的时间给镜像排序
+RANKING_REFERENCE_SIZE = 50 * 1024 * 1024
+
+# 下载中速度低于测速吞吐量的该比例时视为断崖式下降，切换镜像
+SLOW_SOURCE_RATIO = 0.2
+
+_cache_lock = threading.Lock()
+
+
+def estimate_download_time(result: Dict[str, Any], size: int = RANKING_REFERENCE_SIZE) -> float:
+    """根据首字节时间和吞吐量估算下载指定大小所需的秒数"""
+    if not result.get("ok") or result.get("throughput", 0) <= 0:
+        return float("inf")
+    return result["ttfb"] + size / result["throughput"]
+
+
+class MirrorProber:
+    """镜像测速器
+
+    对所有镜像同时发起小范围的GET请求，记录首字节时间（TTFB）和吞吐量，
+    综合两者估算下载时间并排序。结果缓存在配置目录中，有效期内不重复测速。
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, ttl: float = PROBE_CACHE_TTL):
+        self.cache_file = cache_file or ConfigManager().config_dir / "mirror_probe.json"
+        self.ttl = ttl
+
+    def _load_cache(self) -> Dict[str, Any]:
+        """加载测速缓存"""
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def _save_cache(self, cache: Dict[str, Any]) -> None:
+        """保存测速缓存"""
+        temp_file = self.cache_file.with_suffix(".tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except IOError as e:
+            print(f"保存镜像测速缓存失败: {e}")
+
+    def probe(self, url: str) -> Dict[str, Any]:
+        """测速单个镜像"""
+        result: Dict[str, Any] = {
+            "url": url,
+            "ok": False,
+            "ttfb": 0.0,
+            "throughput": 0.0,
+            "total_size": 0,
+            "time": time.time(),
+        }
+        start_time = time.monotonic()
+        try:
+            # 测速不重试，失败的镜像直接排除
+            response = get_session(retry=False).get(
+                url,
+                headers={"Range": f"bytes=0-{PROBE_SIZE - 1}"},
+                stream=True,
+                timeout=(5, PROBE_TIMEOUT),
+            )
+            with response:
+                response.raise_for_status()
+                received = 0
+                first_byte_time = None
+                for chunk in response.iter_content(chunk_size=16384):
+                    if first_byte_time is None:
+                        first_byte_time = time.monotonic()
+                    received += len(chunk)
+                    if received >= PROBE_SIZE:
+                        break
+                    if time.monotonic() - start_time > PROBE_TIMEOUT:
+                        break
+                end_time = time.monotonic()
+
+            if first_byte_time is None:
+                return result
+            result["ttfb"] = first_byte_time - start_time
+            # 数据在一个块内到达时按总耗时估算吞吐量
+            transfer_time = end_time - first_byte_time
+            if transfer_time < 1e-3:
+                transfer_time = max(end_time - start_time, 1e-3)
+            result["throughput"] = received / transfer_time
+            if response.status_code == 206:
+                _, result["total_size"] = parse_content_range(
+                    response.headers.get("Content-Range", "")
+                )
+            else:
+                result["total_size"] = int(response.headers.get("content-length", 0))
+            result["ok"] = True
+        except requests.RequestException as e:
+            print(f"镜像测速失败 {url}: {e}")
+        return result
+
+    def rank(self, urls: List[str], use_cache: bool = True) -> List[Dict[str, Any]]:
+        """并发测速所有镜像，按预计下载时间从快到慢返回可用镜像"""
+        now = time.time()
+        with _cache_lock:
+            cache = self._load_cache() if use_cache else {}
+
+        results: Dict[str, Dict[str, Any]] = {}
+        to_probe = []
+        for url in urls:
+            cached = cache.get(url)
+            # 失败的结果不复用，一次网络波动不应让镜像在有效期内一直不可用
+            if cached and cached.get("ok") and now - cached.get("time", 0) < self.ttl:
+                results[url] = cached
+            else:
+                to_probe.append(url)
+
+        if to_probe:
+            print(f"测速 {len(to_probe)} 个镜像...")
+            with ThreadPoolExecutor(max_workers=len(to_probe)) as executor:
+                futures = [executor.submit(self.probe, url) for url in to_probe]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result["url"]] = result
+
+            with _cache_lock:
+                cache = self._load_cache()
+                for url in to_probe:
+                    if results[url].get("ok"):
+                        cache[url] = results[url]
+                    else:
+                        cache.pop(url, None)
+                # 顺便清理过期的记录
+                cache = {
+                    url: result
+                    for url, result in cache.items()
+                    if now - result.get("time", 0) < self.ttl
+                }
+                self._save_cache(cache)
+
+        ranked = sorted(
+            (result for result in results.values() if result.get("ok")),
+            key=estimate_download_time,
+        )
+        for result in ranked:
+            print(
+                f"镜像 {result['url']}: TTFB {result['ttfb'] * 1000:.0f}ms, "
+                f"吞吐量 {result['throughput'] / 1024:.0f}KB/s"
+            )
+        return ranked
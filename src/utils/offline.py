@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+离线安装 - 从本地压缩包或预先准备的产物目录安装工具链，全程不联网
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .artifacts import find_artifact_by_file_name
+from .config import ConfigManager
+from .download import parse_checksum_file
+
+# 产物目录中可能存在的校验文件列表，与发布页提供的格式一致
+CHECKSUM_LIST_NAMES = ("checksums.sha256", "SHA256SUMS", "sha256sums.txt")
+
+
+def get_offline_dir() -> Optional[Path]:
+    """设置页中配置的离线产物目录，未配置或不存在时返回None"""
+    offline_dir = ConfigManager().get("offline_artifact_dir", "")
+    if not offline_dir:
+        return None
+    offline_dir = Path(offline_dir).expanduser()
+    return offline_dir if offline_dir.is_dir() else None
+
+
+def find_offline_artifact(
+    artifact: Dict[str, Any], search_dir: Optional[Path] = None
+) -> Optional[Path]:
+    """在产物目录中查找产物的压缩包
+
+    产物目录可以直接存放发布页的原始文件，也可以按产物ID分子目录存放，
+    例如 <目录>/ffmpeg-win64-lgpl-shared/ffmpeg-master-latest-win64-lgpl-shared.zip。
+    """
+    search_dir = search_dir or get_offline_dir()
+    if search_dir is None:
+        return None
+    for candidate in (
+        search_dir / artifact["file_name"],
+        search_dir / artifact.get("id", "") / artifact["file_name"],
+    ):
+        if candidate.is_file():
+            print(f"找到离线产物: {candidate}")
+            return candidate
+    return None
+
+
+def find_local_checksum(file_path: Path) -> Optional[str]:
+    """从压缩包旁边的校验文件中读取预期的sha256，没有校验文件时返回None"""
+    candidates = [file_path.with_name(file_path.name + ".sha256")]
+    candidates += [file_path.with_name(name) for name in CHECKSUM_LIST_NAMES]
+    for checksum_file in candidates:
+        if not checksum_file.is_file():
+            continue
+        try:
+            content = checksum_file.read_text(encoding="utf-8", errors="ignore")
+        except OSError as e:
+            print(f"读取校验文件失败 {checksum_file}: {e}")
+            continue
+        expected_sha256 = parse_checksum_file(content, file_path.name)
+        if expected_sha256:
+            return expected_sha256
+    return None
+
+
+def resolve_local_artifact(file_path: Path) -> Dict[str, Any]:
+    """按文件名识别本地压缩包对应的产物，识别不到时解压全部文件
+
+    安装程序和源码包解压后不能直接运行，直接报错。
+    """
+    artifact = find_artifact_by_file_name(file_path.name)
+    if artifact:
+        if not artifact["installable"]:
+            raise Exception(f"{file_path.name} 是安装程序或源码包，无法直接解压安装")
+        return artifact
+    return {
+        "file_name": file_path.name,
+        "url": file_path.absolute().as_uri(),
+        "mirrors": [],
+        "checksum_url": None,
+        "extract_members": None,
+    }
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+局域网共享缓存 - 通过HTTP向同一网络中的其他机器提供下载缓存，
+机器之间通过配置的节点列表或UDP广播互相发现
+
+同一网络中的多台机器只需从外网下载一次，其余机器从局域网节点获取。
+节点未经认证，局域网中任何机器都能应答，因此只有预期的sha256来自上游
+发布信息时才向节点获取，获取到的文件按该sha256校验后才会使用。
+"""
+
+import hashlib
+import json
+import re
+import socket
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import requests
+
+from .artifact_cache import ArtifactCache
+from .config import ConfigManager
+from .http_client import get_session
+
+# 共享缓存的HTTP端口
+DEFAULT_PEER_PORT = 38766
+
+# UDP发现端口，所有节点相同
+DISCOVERY_PORT = 38765
+
+DISCOVERY_MESSAGE = b"zhenxun-peer-discover"
+
+# 等待发现回复的时间（秒）
+DISCOVERY_TIMEOUT = 1.0
+
+# 局域网内连接应当很快，连不上的节点尽快跳过
+PEER_TIMEOUT = (2, 30)
+
+# 局域网请求不走设置中的代理
+NO_PROXY = {"http": None, "https": None}
+
+# 传输时每次读取的字节数
+CHUNK_SIZE = 1024 * 1024
+
+_HEX64 = re.compile(r"^[0-9a-f]{64}$")
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def is_peer_cache_enabled() -> bool:
+    """是否启用局域网共享缓存"""
+    return bool(ConfigManager().get("peer_cache_enabled", False))
+
+
+def parse_peer_list(value) -> List[str]:
+    """解析配置的节点列表，支持列表或逗号分隔的字符串，未写端口时使用默认端口"""
+    if isinstance(value, str):
+        value = value.replace("，", ",").split(",")
+    peers = []
+    for peer in value or []:
+        peer = str(peer).strip()
+        if not peer:
+            continue
+        if ":" not in peer:
+            peer = f"{peer}:{DEFAULT_PEER_PORT}"
+        if peer not in peers:
+            peers.append(peer)
+    return peers
+
+
+class _PeerRequestHandler(BaseHTTPRequestHandler):
+    """共享缓存的HTTP接口
+
+    GET /blobs/<sha256>  按sha256获取文件
+    """
+
+    server_version = "ZhenxunPeerCache/1.0"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "blobs" or not _HEX64.match(parts[1]):
+            self.send_error(404)
+            return
+        blob_path = ArtifactCache().lookup_sha256(parts[1])
+        if blob_path is None:
+            self.send_error(404)
+            return
+
+        try:
+            f = open(blob_path, "rb")
+        except OSError:
+            self.send_error(404)
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(blob_path.stat().st_size))
+            self.end_headers()
+            if send_body:
+                self.wfile.flush()
+                # 由内核直接把文件发送到套接字
+                self.connection.sendfile(f)
+
+    def log_message(self, format, *args):
+        print(f"局域网节点 {self.client_address[0]}: {format % args}")
+
+
+class PeerCacheServer:
+    """共享缓存服务，包括HTTP接口和UDP发现应答"""
+
+    def __init__(self, port: int = DEFAULT_PEER_PORT, discovery_port: int = DISCOVERY_PORT):
+        self.instance_id = uuid.uuid4().hex
+        self.http_server = ThreadingHTTPServer(("", port), _PeerRequestHandler)
+        self.http_server.daemon_threads = True
+        self.port = self.http_server.server_address[1]
+        self.discovery_port = discovery_port
+        self.discovery_socket = None
+        self._threads = []
+
+    def start(self) -> None:
+        """在后台线程中启动服务"""
+        self._threads.append(threading.Thread(target=self.http_server.serve_forever, daemon=True))
+        try:
+            self.discovery_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.discovery_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, "SO_REUSEPORT"):
+                # 同一台机器上的多个实例共用发现端口
+                self.discovery_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.discovery_socket.bind(("", self.discovery_port))
+            self._threads.append(threading.Thread(target=self._answer_discovery, daemon=True))
+        except OSError as e:
+            print(f"无法监听发现端口，只能通过节点列表访问: {e}")
+            self.discovery_socket = None
+        for thread in self._threads:
+            thread.start()
+        print(f"局域网共享缓存已启动，端口: {self.port}")
+
+    def stop(self) -> None:
+        """停止服务"""
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        if self.discovery_socket:
+            self.discovery_socket.close()
+
+    def _answer_discovery(self) -> None:
+        """应答发现广播，告知本节点的HTTP端口"""
+        reply = json.dumps({"id": self.instance_id, "port": self.port}).encode("utf-8")
+        while True:
+            try:
+                data, address = self.discovery_socket.recvfrom(1024)
+            except OSError:
+                # 套接字已关闭
+                return
+            if data == DISCOVERY_MESSAGE:
+                try:
+                    self.discovery_socket.sendto(reply, address)
+                except OSError as e:
+                    print(f"应答发现请求失败: {e}")
+
+
+def start_peer_server() -> Optional[PeerCacheServer]:
+    """按配置启动本进程的共享缓存服务，已启动或未启用时不重复启动"""
+    global _server
+    if not is_peer_cache_enabled():
+        return None
+    with _server_lock:
+        if _server is None:
+            port = int(ConfigManager().get("peer_cache_port", DEFAULT_PEER_PORT))
+            try:
+                _server = PeerCacheServer(port)
+            except OSError as e:
+                print(f"启动局域网共享缓存失败: {e}")
+                return None
+            _server.start()
+        return _server
+
+
+def stop_peer_server() -> None:
+    """停止本进程的共享缓存服务"""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
+
+
+def discover_peers(
+    timeout: float = DISCOVERY_TIMEOUT, discovery_port: int = DISCOVERY_PORT
+) -> List[str]:
+    """广播发现请求，返回回复的节点（host:port），不包括本进程"""
+    own_id = _server.instance_id if _server else None
+    peers = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.settimeout(timeout)
+        try:
+            sock.sendto(DISCOVERY_MESSAGE, ("<broadcast>", discovery_port))
+        except OSError as e:
+            print(f"发送发现广播失败: {e}")
+            return peers
+        while True:
+            try:
+                data, address = sock.recvfrom(1024)
+            except OSError:
+                # 超时
+                break
+            try:
+                reply = json.loads(data.decode("utf-8"))
+                peer = f"{address[0]}:{int(reply['port'])}"
+            except (ValueError, KeyError, TypeError):
+                continue
+            if reply.get("id") != own_id and peer not in peers:
+                peers.append(peer)
+    return peers
+
+
+def get_peers() -> List[str]:
+    """配置的节点列表加上广播发现的节点"""
+    peers = parse_peer_list(ConfigManager().get("lan_peers", ""))
+    for peer in discover_peers():
+        if peer not in peers:
+            peers.append(peer)
+    return peers
+
+
+def fetch_from_peers(
+    peers: List[str],
+    cache: ArtifactCache,
+    sha256: str,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    incoming_dir: Optional[Path] = None,
+) -> Optional[Tuple[Path, str]]:
+    """按sha256从局域网节点获取文件并放入本地缓存
+
+    sha256 必须来自上游发布的校验信息：节点提供的内容不可信，只能用
+    可信的sha256校验。返回(文件路径, sha256)，所有节点都没有时返回None。
+
+    传输中的文件写入 incoming_dir（默认为缓存下的 incoming）。文件超过
+    缓存上限时不缓存，返回的就是 incoming_dir 中的文件，由调用方删除；
+    传入下载暂存目录时随暂存目录一起清理。
+    """
+    if not sha256:
+        return None
+    sha256 = sha256.lower()
+    path = f"blobs/{sha256}"
+
+    incoming_dir = incoming_dir or cache.cache_dir / "incoming"
+    incoming_dir.mkdir(parents=True, exist_ok=True)
+    for peer in peers:
+        peer_url = f"http://{peer}/{path}"
+        temp_file = incoming_dir / f"{uuid.uuid4().hex}.part"
+        blob_path = None
+        try:
+            response = get_session(retry=False).get(
+                peer_url, stream=True, timeout=PEER_TIMEOUT, proxies=NO_PROXY
+            )
+            with response:
+                if response.status_code != 200:
+                    continue
+                # 没有声明大小的应答无法限制写入量，不接收
+                total_size = int(response.headers.get("Content-Length", 0))
+                if total_size <= 0:
+                    print(f"局域网节点 {peer} 未提供文件大小，跳过")
+                    continue
+                digest = hashlib.sha256()
+                done = 0
+                with open(temp_file, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        done += len(chunk)
+                        if done > total_size:
+                            raise OSError("应答超过声明的大小")
+                        f.write(chunk)
+                        digest.update(chunk)
+                        if progress_callback:
+                            progress_callback(done, total_size)
+            actual_sha256 = digest.hexdigest()
+            if actual_sha256 != sha256:
+                print(f"局域网节点 {peer} 的文件校验失败，跳过")
+                continue
+            print(f"从局域网节点获取: {peer_url}")
+            blob_path = cache.put(temp_file, "", "", sha256=actual_sha256)
+            return blob_path, actual_sha256
+        except (requests.RequestException, OSError, ValueError) as e:
+            print(f"局域网节点不可用 {peer}: {e}")
+        finally:
+            # 校验失败、传输中断的文件都要删除；成功时已移入缓存或交给调用方
+            if blob_path is None and temp_file.exists():
+                temp_file.unlink()
+    return None
+
+
+def main() -> None:
+    """单独运行共享缓存服务，例如在同一台机器上模拟另一个节点"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="真寻Bot GUI 局域网共享缓存")
+    parser.add_argument("--port", type=int, default=DEFAULT_PEER_PORT, help="HTTP端口")
+    args = parser.parse_args()
+
+    server = PeerCacheServer(args.port)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+并发探测 - 在有界线程池中同时运行各候选程序的版本命令，按优先级确定结果
+
+按顺序逐个运行时，一个卡住的候选（pyenv shim、Windows 应用商店的 python
+别名等）就要等满超时才能轮到下一个。并发探测时每个工具的结果在优先级
+更高的候选都已失败、且自身成功时立即确定，其余仍在运行的探测随即终止；
+整体超过截止时间时取已成功的候选中优先级最高的一个。
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# 同时运行的探测进程数
+PROBE_WORKERS = 4
+
+# 单个候选的超时（秒）
+PROBE_TIMEOUT = 5
+
+# 全部探测的截止时间（秒）
+PROBE_DEADLINE = 8
+
+# 检查取消和超时的间隔（秒）
+POLL_INTERVAL = 0.05
+
+# (路径, 命令行)
+Candidate = Tuple[str, List[str]]
+
+
+def build_candidates(
+    names: Sequence[str], paths: Sequence[str], version_flag: str
+) -> List[Candidate]:
+    """按优先级生成候选：先是PATH中的命令，再是常见安装路径，同一程序只探测一次"""
+    candidates: List[Candidate] = []
+    seen = set()
+    for executable in [shutil.which(name) for name in names] + list(paths):
+        if not executable or not os.path.isfile(executable):
+            continue
+        real_path = os.path.normcase(os.path.realpath(executable))
+        if real_path in seen:
+            continue
+        seen.add(real_path)
+        candidates.append((executable, [executable, version_flag]))
+    return candidates
+
+
+def run_probe(
+    command: List[str],
+    cancel_event: threading.Event,
+    timeout: float = PROBE_TIMEOUT,
+    first_line: bool = True,
+) -> Union[str, bool, None]:
+    """运行版本命令，成功时返回输出的第一行（first_line 为 False 时返回全部标准输出），
+    命令执行失败时返回False，超时或被取消时返回None"""
+    try:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            # 单独的进程组，终止时连同shim启动的子进程一起终止
+            start_new_session=os.name == "posix",
+        )
+    except OSError:
+        return None
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel_event.is_set() or time.monotonic() > deadline:
+                _kill_probe(process)
+                return None
+    if process.returncode != 0:
+        return False
+    if not first_line:
+        return stdout
+    output = stdout.strip() or stderr.strip()
+    return output.split("\n")[0].strip() if output else ""
+
+
+def _kill_probe(process: subprocess.Popen) -> None:
+    """终止探测进程，不等待可能仍被孙进程占用的输出管道"""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        pass
+    process.wait()
+    for pipe in (process.stdout, process.stderr):
+        if pipe:
+            pipe.close()
+
+
+class _ToolProbe:
+    """一个工具的所有候选及其探测结果"""
+
+    def __init__(self, candidates: List[Candidate]):
+        self.candidates = candidates
+        # 每个候选的结果：None 为尚未完成，False 为失败，字符串为版本
+        self.results: List = [None] * len(candidates)
+        self.cancel_event = threading.Event()
+        self.resolved = False
+
+    def resolve(self, final: bool = False) -> Optional[Tuple[bool, str, str]]:
+        """按优先级判断结果能否确定，final 为截止时间已到，取已成功的最优候选"""
+        for (path, _), result in zip(self.candidates, self.results):
+            if result is None and not final:
+                return None
+            if isinstance(result, str):
+                return True, path, result
+        return False, "", ""
+
+
+def probe_concurrently(
+    tools: Dict[str, List[Candidate]],
+    on_resolved: Callable[[str, bool, str, str], None],
+    deadline: float = PROBE_DEADLINE,
+    max_workers: int = PROBE_WORKERS,
+    cache=None,
+    version_reader: Optional[Callable[[str], Optional[str]]] = None,
+    first_line: bool = True,
+) -> None:
+    """并发探测多个工具的候选，每个工具的结果一经确定立即回调 on_resolved(工具, 是否找到, 路径, 版本)
+
+    回调在工作线程中调用；函数在所有工具都有结果后返回，最迟不超过截止时间。
+    传入 cache（DetectionCache）时，文件未变化的候选直接使用缓存的版本，
+    新探测完成（成功或执行失败）的候选写入缓存。传入 version_reader 时先用它
+    不运行程序读取版本，返回None的候选才需要探测。
+    """
+    probes = {tool: _ToolProbe(candidates) for tool, candidates in tools.items()}
+    lock = threading.Lock()
+
+    for probe in probes.values():
+        for index, (path, _) in enumerate(probe.candidates):
+            version = version_reader(path) if version_reader else None
+            if version is None and cache is not None:
+                version = cache.lookup(path)
+            if version is not None:
+                probe.results[index] = version
+
+    def finish(tool: str, final: bool = False) -> None:
+        probe = probes[tool]
+        with lock:
+            if probe.resolved:
+                return
+            outcome = probe.resolve(final)
+            if outcome is None:
+                return
+            probe.resolved = True
+        # 结果已确定，终止该工具其余仍在运行的探测
+        probe.cancel_event.set()
+        on_resolved(tool, *outcome)
+
+    def task(tool: str, index: int) -> None:
+        probe = probes[tool]
+        if probe.cancel_event.is_set():
+            return
+        path, command = probe.candidates[index]
+        version = run_probe(command, probe.cancel_event, first_line=first_line)
+        # 超时或被取消的结果不能说明程序本身的情况，不写入缓存
+        if version is not None and cache is not None:
+            cache.store(path, version)
+        with lock:
+            probe.results[index] = version if version is not None else False
+        finish(tool)
+
+    start_time = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = []
+    try:
+        # 没有候选或缓存已足以确定结果的工具无需探测
+        for tool in tools:
+            finish(tool)
+        # 按优先级交错提交，每个工具的首选候选最先开始
+        longest = max((len(candidates) for candidates in tools.values()), default=0)
+        for index in range(longest):
+            for tool, candidates in tools.items():
+                probe = probes[tool]
+                if index < len(candidates) and not probe.resolved and probe.results[index] is None:
+                    futures.append(executor.submit(task, tool, index))
+        wait(futures, timeout=max(deadline - (time.monotonic() - start_time), 0))
+    finally:
+        for tool, probe in probes.items():
+            if not probe.resolved:
+                print(f"{tool} 探测超过截止时间，使用已有结果")
+            finish(tool, final=True)
+        executor.shutdown(wait=True, cancel_futures=True)
+        if cache is not None:
+            cache.flush()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+进度汇总 - 合并高频进度回调，按固定帧率向界面汇报
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+# 每秒最多汇报的次数
+PROGRESS_FPS = 10
+
+# 计算速度时使用的时间窗口（秒）
+SPEED_WINDOW = 3.0
+
+# 阶段名称
+PHASE_NAMES = {
+    "download": "下载",
+    "verify": "校验",
+    "extract": "解压",
+    "install": "安装",
+}
+
+
+def format_size(size: float) -> str:
+    """格式化字节数"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def format_duration(seconds: float) -> str:
+    """格式化剩余时间"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}秒"
+    if seconds < 3600:
+        return f"{seconds // 60}分{seconds % 60}秒"
+    return f"{seconds // 3600}小时{seconds % 3600 // 60}分"
+
+
+def format_progress_detail(info: Dict[str, Any]) -> str:
+    """把进度信息格式化为一行说明，例如“下载 12.0 MB / 80.0 MB · 5.2 MB/s · 剩余 13秒”"""
+    parts = [PHASE_NAMES.get(info.get("phase"), info.get("phase") or "")]
+    if info.get("total"):
+        parts[0] += f" {format_size(info['done'])} / {format_size(info['total'])}"
+    if info.get("speed"):
+        parts.append(f"{format_size(info['speed'])}/s")
+    if info.get("eta") is not None:
+        parts.append(f"剩余 {format_duration(info['eta'])}")
+    return " · ".join(part for part in parts if part)
+
+
+class ProgressAggregator:
+    """进度汇总器
+
+    下载、解压、安装各阶段的回调可能来自多个线程、每秒成千上万次，
+    汇总器只记录最新的进度，按固定帧率调用 emit_callback，且只在显示的
+    内容（百分比、速度、剩余时间）发生变化时才调用。阶段切换和阶段完成
+    总是立即汇报；两次汇报之间被合并的最新进度在间隔结束时补发，进度
+    停滞时界面也会显示最后的数据。
+    """
+
+    def __init__(
+        self,
+        emit_callback: Callable[[Dict[str, Any]], None],
+        fps: int = PROGRESS_FPS,
+    ):
+        self.emit_callback = emit_callback
+        self.interval = 1.0 / fps
+        self._lock = threading.Lock()
+        self._phase = "download"
+        self._samples = deque()
+        self._last_emit_time = 0.0
+        self._last_key = None
+        # 被合并、尚未汇报的最新进度 (done, total) 及补发定时器
+        self._pending = None
+        self._timer: Optional[threading.Timer] = None
+
+    def set_phase(self, phase: str) -> None:
+        """切换阶段，进度和速度从零开始统计"""
+        with self._lock:
+            # 先补发上一阶段最后的进度
+            self._flush_locked()
+            self._phase = phase
+            self._samples.clear()
+            info = self._snapshot(0, 0, time.monotonic())
+            self._emit(info, time.monotonic())
+
+    def update(self, done: int, total: int) -> None:
+        """记录进度，必要时汇报，可在任意线程调用"""
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, done))
+            while len(self._samples) > 2 and now - self._samples[0][0] > SPEED_WINDOW:
+                self._samples.popleft()
+
+            finished = total > 0 and done >= total
+            elapsed = now - self._last_emit_time
+            if not finished and elapsed < self.interval:
+                self._pending = (done, total)
+                if self._timer is None:
+                    self._timer = threading.Timer(self.interval - elapsed, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._pending = None
+            self._emit(self._snapshot(done, total, now), now)
+
+    def flush(self) -> None:
+        """立即汇报被合并的最新进度"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending is not None:
+            done, total = self._pending
+            self._pending = None
+            now = time.monotonic()
+            self._emit(self._snapshot(done, total, now), now)
+
+    def _snapshot(self, done: int, total: int, now: float) -> Dict[str, Any]:
+        """计算当前的百分比、速度和剩余时间"""
+        speed = 0.0
+        if len(self._samples) >= 2:
+            start_time, start_done = self._samples[0]
+            if now - start_time > 0:
+                speed = max(done - start_done, 0) / (now - start_time)
+        eta: Optional[float] = None
+        if total > 0 and speed > 0:
+            eta = max(total - done, 0) / speed
+        return {
+            "phase": self._phase,
+            "percent": int(done * 100 / total) if total > 0 else 0,
+            "done": done,
+            "total": total,
+            "speed": speed,
+            "eta": eta,
+        }
+
+    def _emit(self, info: Dict[str, Any], now: float) -> None:
+        """显示内容有变化时才汇报"""
+        key = (
+            info["phase"],
+            info["percent"],
+            round(info["speed"] / 1024 / 100),
+            None if info["eta"] is None else int(info["eta"]),
+        )
+        if key == self._last_key:
+            return
+        self._last_key = key
+        self._last_emit_time = now
+        self.emit_callback(info)
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Python版本 - 不运行解释器，从安装目录中的文件读取版本
+
+可用的线索有：虚拟环境的 pyvenv.cfg、标准库目录 lib/pythonX.Y、
+libpython 动态库（Windows 为 pythonXY.dll）、头文件 patchlevel.h 以及
+Windows 可执行文件的版本资源。各线索互相印证时直接采用，互相矛盾或
+都不存在时返回None，由调用方运行 --version 探测。
+"""
+
+import ctypes
+import os
+import re
+from typing import Optional, Set, Tuple
+
+if os.name == "nt":
+    INTERPRETER_NAME = re.compile(r"^python(\d(\.\d+)?)?\.exe$", re.IGNORECASE)
+else:
+    INTERPRETER_NAME = re.compile(r"^python(\d(\.\d+)?)?$")
+
+Version = Tuple[int, ...]
+
+_LIB_DIR = re.compile(r"^python(\d)\.(\d+)$")
+_LIBPYTHON = re.compile(r"^libpython(\d)\.(\d+)[a-z]*\.(so|dylib)")
+_WINDOWS_DLL = re.compile(r"^python(\d)(\d+)\.dll$", re.IGNORECASE)
+_PY_VERSION = re.compile(r'#define\s+PY_VERSION\s+"(\d+)\.(\d+)\.(\d+)')
+_CFG_VERSION = re.compile(r"^\s*version(?:_info)?\s*=\s*(\d+)\.(\d+)\.(\d+)", re.MULTILINE)
+
+
+def _name_hint(path: str) -> Version:
+    """文件名中的版本，例如 python3.11 -> (3, 11)，python3 -> (3,)"""
+    match = INTERPRETER_NAME.match(os.path.basename(path))
+    if not match or not match.group(1):
+        return ()
+    return tuple(int(part) for part in match.group(1).split("."))
+
+
+def _list_dir(directory: str) -> Set[str]:
+    try:
+        return set(os.listdir(directory))
+    except OSError:
+        return set()
+
+
+def _read_file(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _read_pyvenv_cfg(executable: str) -> Optional[Version]:
+    """虚拟环境的 pyvenv.cfg 记录创建时基础解释器的完整版本"""
+    bin_dir = os.path.dirname(os.path.abspath(executable))
+    for directory in (os.path.dirname(bin_dir), bin_dir):
+        match = _CFG_VERSION.search(_read_file(os.path.join(directory, "pyvenv.cfg")))
+        if match:
+            return tuple(int(part) for part in match.groups())
+    return None
+
+
+def _read_prefix_versions(real_path: str) -> Set[Version]:
+    """安装目录中的标准库目录和libpython动态库给出的主次版本"""
+    versions: Set[Version] = set()
+    bin_dir = os.path.dirname(real_path)
+    if os.name == "nt":
+        for name in _list_dir(bin_dir):
+            match = _WINDOWS_DLL.match(name)
+            if match:
+                versions.add((int(match.group(1)), int(match.group(2))))
+        return versions
+
+    lib_dir = os.path.join(os.path.dirname(bin_dir), "lib")
+    for name in _list_dir(lib_dir):
+        match = _LIB_DIR.match(name)
+        # 只有真正的标准库目录才算数，排除只放了site-packages的目录
+        if match and os.path.isfile(os.path.join(lib_dir, name, "os.py")):
+            versions.add((int(match.group(1)), int(match.group(2))))
+    for directory in (lib_dir, bin_dir):
+        for name in _list_dir(directory):
+            match = _LIBPYTHON.match(name)
+            if match:
+                versions.add((int(match.group(1)), int(match.group(2))))
+    return versions
+
+
+def _read_patchlevel(real_path: str, minor: Version) -> Optional[Version]:
+    """头文件 patchlevel.h 中的完整版本"""
+    bin_dir = os.path.dirname(real_path)
+    if os.name == "nt":
+        header_dirs = [os.path.join(bin_dir, "include")]
+    else:
+        include_dir = os.path.join(os.path.dirname(bin_dir), "include")
+        prefix = "python%d.%d" % minor
+        header_dirs = [
+            os.path.join(include_dir, name)
+            for name in sorted(_list_dir(include_dir))
+            if name == prefix or (name.startswith(prefix) and not name[len(prefix)].isdigit())
+        ]
+    for header_dir in header_dirs:
+        match = _PY_VERSION.search(_read_file(os.path.join(header_dir, "patchlevel.h")))
+        if match:
+            return tuple(int(part) for part in match.groups())
+    return None
+
+
+def _read_pe_version(real_path: str) -> Optional[Version]:
+    """Windows 可执行文件版本资源中的版本
+
+    python.exe 的文件版本为 主.次.微*1000+发布级别*10+序号.构建号，
+    例如 3.11.9150.1013 对应 3.11.9。
+    """
+    if os.name != "nt":
+        return None
+
+    class VS_FIXEDFILEINFO(ctypes.Structure):
+        _fields_ = [
+            ("dwSignature", ctypes.c_uint32),
+            ("dwStrucVersion", ctypes.c_uint32),
+            ("dwFileVersionMS", ctypes.c_uint32),
+            ("dwFileVersionLS", ctypes.c_uint32),
+        ]
+
+    try:
+        version_dll = ctypes.windll.version
+        size = version_dll.GetFileVersionInfoSizeW(real_path, None)
+        if not size:
+            return None
+        buffer = ctypes.create_string_buffer(size)
+        if not version_dll.GetFileVersionInfoW(real_path, 0, size, buffer):
+            return None
+        info = ctypes.c_void_p()
+        length = ctypes.c_uint()
+        if not version_dll.VerQueryValueW(buffer, "\\", ctypes.byref(info), ctypes.byref(length)):
+            return None
+        fixed = ctypes.cast(info, ctypes.POINTER(VS_FIXEDFILEINFO)).contents
+    except (AttributeError, OSError):
+        return None
+    if fixed.dwSignature != 0xFEEF04BD:
+        return None
+    return (
+        fixed.dwFileVersionMS >> 16,
+        fixed.dwFileVersionMS & 0xFFFF,
+        (fixed.dwFileVersionLS >> 16) // 1000,
+    )
+
+
+def _compatible(version: Version, other: Version) -> bool:
+    """两个版本在共有的部分上一致，例如 (3, 11) 与 (3, 11, 9)"""
+    length = min(len(version), len(other))
+    return version[:length] == other[:length]
+
+
+def read_python_version(executable: str) -> Optional[str]:
+    """不运行解释器读取版本，返回与 --version 相同格式的字符串（如 "Python 3.11.9"）
+
+    只能确定主次版本时返回 "Python 3.11"；线索互相矛盾、不足以确定主次版本
+    或文件不是Python解释器时返回None。
+    """
+    if not INTERPRETER_NAME.match(os.path.basename(executable)):
+        return None
+    real_path = os.path.realpath(executable)
+    if not os.path.isfile(real_path):
+        return None
+
+    # 文件名可能是 python3.11，也可能是指向 python3.11 的 python3
+    name_hint, real_hint = _name_hint(executable), _name_hint(real_path)
+    if not _compatible(name_hint, real_hint):
+        return None
+    hint = max(name_hint, real_hint, key=len)
+
+    # 同一安装目录下可能有多个版本的标准库，只保留与文件名相符的
+    candidates = {version for version in _read_prefix_versions(real_path) if _compatible(version, hint)}
+    venv_version = _read_pyvenv_cfg(executable)
+    if venv_version:
+        if not _compatible(venv_version, hint):
+            return None
+        candidates.add(venv_version[:2])
+    if len(candidates) != 1:
+        return None
+    minor = candidates.pop()
+
+    full_versions = {venv_version} if venv_version else set()
+    for version in (_read_patchlevel(real_path, minor), _read_pe_version(real_path)):
+        if version:
+            full_versions.add(version)
+    if any(version[:2] != minor for version in full_versions) or len(full_versions) > 1:
+        return None
+    version = full_versions.pop() if full_versions else minor
+    return "Python " + ".".join(str(part) for part in version)
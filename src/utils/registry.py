@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+安装登记 - 集中记录本程序安装的工具，检测环境时无需启动子进程
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import ConfigManager
+
+_registry_lock = threading.Lock()
+
+
+class InstallRegistry:
+    """安装登记表
+
+    登记表位于配置目录下的 installations.json，按工具名（小写）记录版本、
+    路径、哈希、大小、安装时间以及主程序的大小和修改时间。主程序的大小
+    和修改时间与登记一致时直接采用登记的信息，否则视为失效。
+    """
+
+    def __init__(self, registry_file: Optional[Path] = None):
+        self.registry_file = registry_file or ConfigManager().config_dir / "installations.json"
+
+    def _load(self) -> Dict[str, Any]:
+        """加载登记表"""
+        if self.registry_file.exists():
+            try:
+                with open(self.registry_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                pass
+        return {}
+
+    def _save(self, registry: Dict[str, Any]) -> None:
+        """保存登记表，先写临时文件再替换，避免登记表损坏"""
+        temp_file = self.registry_file.with_suffix(".tmp")
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(registry, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.registry_file)
+        except IOError as e:
+            print(f"保存安装登记失败: {e}")
+
+    def register(self, name: str, entry: Dict[str, Any]) -> None:
+        """登记工具，已有登记时覆盖"""
+        binary = entry.get("binary")
+        if binary and os.path.exists(binary):
+            stat = os.stat(binary)
+            entry["binary_size"] = stat.st_size
+            entry["binary_mtime"] = stat.st_mtime_ns
+        with _registry_lock:
+            registry = self._load()
+            registry[name.lower()] = entry
+            self._save(registry)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """获取工具的登记信息"""
+        with _registry_lock:
+            return self._load().get(name.lower())
+
+    def get_all(self) -> Dict[str, Any]:
+        """获取全部登记信息"""
+        with _registry_lock:
+            return self._load()
+
+    def remove(self, name: str) -> None:
+        """删除登记"""
+        with _registry_lock:
+            registry = self._load()
+            if registry.pop(name.lower(), None) is not None:
+                self._save(registry)
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """获取仍然有效的登记信息，主程序被删除或替换时返回None"""
+        entry = self.get(name)
+        if not entry or not entry.get("binary"):
+            return None
+        try:
+            stat = os.stat(entry["binary"])
+        except OSError:
+            return None
+        if stat.st_size != entry.get("binary_size") or stat.st_mtime_ns != entry.get("binary_mtime"):
+            return None
+        return entry
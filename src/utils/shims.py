@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+工具入口目录 - 在配置目录下维护一个bin目录，用符号链接指向本程序管理的各个工具
+
+该目录只加入PATH一次（写入带标记的配置块，重复写入不会产生重复内容），之后
+安装新工具或切换版本只需更新符号链接，不用再修改PATH，也不用启动shell重新
+加载配置。
+"""
+
+import os
+import stat
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from .config import ConfigManager
+
+# 配置块的起止标记，重复写入时整块替换
+BLOCK_BEGIN = "# >>> zhenxun_bot_gui >>>"
+BLOCK_END = "# <<< zhenxun_bot_gui <<<"
+
+# 不需要链接的库文件
+LIBRARY_SUFFIXES = (".so", ".dylib", ".dll", ".a")
+
+
+def get_shim_dir() -> Path:
+    """工具入口目录"""
+    shim_dir = ConfigManager().config_dir / "bin"
+    shim_dir.mkdir(parents=True, exist_ok=True)
+    return shim_dir
+
+
+def get_shell_rc_file(shell: Optional[str] = None) -> Path:
+    """获取当前用户shell的配置文件路径"""
+    home = Path.home()
+    shell = shell if shell is not None else os.environ.get("SHELL", "")
+
+    if "zsh" in shell:
+        return home / ".zshrc"
+    elif "fish" in shell:
+        return home / ".config" / "fish" / "config.fish"
+    else:
+        # 默认使用bash
+        return home / ".bashrc"
+
+
+def render_path_block(shim_dir: Path, fish: bool = False) -> str:
+    """生成把入口目录加入PATH的配置块，PATH中已有该目录时不再重复加入
+
+    与旧版本一样追加在PATH末尾，不覆盖系统中已有的同名程序（例如python3）。
+    """
+    if fish:
+        body = f'contains "{shim_dir}" $PATH; or set -gx PATH $PATH "{shim_dir}"'
+    else:
+        body = f'case ":$PATH:" in\n    *":{shim_dir}:"*) ;;\n    *) export PATH="$PATH:{shim_dir}" ;;\nesac'
+    return f"{BLOCK_BEGIN}\n{body}\n{BLOCK_END}\n"
+
+
+def remove_legacy_entries(content: str, legacy_dirs: Iterable[str]) -> str:
+    """删除旧版本每次安装时追加的 export PATH 行"""
+    legacy_lines = {f'export PATH="$PATH:{legacy_dir}"' for legacy_dir in legacy_dirs}
+    if not legacy_lines:
+        return content
+    lines = [line for line in content.splitlines(keepends=True) if line.strip() not in legacy_lines]
+    return "".join(lines)
+
+
+def ensure_path_block(
+    rc_file: Path, shim_dir: Path, legacy_dirs: Iterable[str] = ()
+) -> bool:
+    """在配置文件中写入入口目录的配置块，内容不变时不写文件，返回是否修改了文件"""
+    try:
+        content = rc_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        content = ""
+    block = render_path_block(shim_dir, fish=rc_file.name == "config.fish")
+
+    new_content = remove_legacy_entries(content, legacy_dirs)
+    begin = new_content.find(BLOCK_BEGIN)
+    end = new_content.find(BLOCK_END, begin)
+    if begin >= 0 and end >= 0:
+        end += len(BLOCK_END)
+        if new_content[end:end + 1] == "\n":
+            end += 1
+        new_content = new_content[:begin] + block + new_content[end:]
+    else:
+        if new_content and not new_content.endswith("\n"):
+            new_content += "\n"
+        new_content += ("\n" if new_content else "") + block
+
+    if new_content == content:
+        return False
+    _write_rc_file(rc_file, new_content)
+    return True
+
+
+def remove_legacy_path_entries(rc_file: Path, legacy_dirs: Iterable[str]) -> bool:
+    """只删除配置文件中旧版本追加的 export PATH 行，返回是否修改了文件"""
+    try:
+        content = rc_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    new_content = remove_legacy_entries(content, legacy_dirs)
+    if new_content == content:
+        return False
+    _write_rc_file(rc_file, new_content)
+    return True
+
+
+def _write_rc_file(rc_file: Path, content: str) -> None:
+    """先写临时文件再替换，保留原文件的权限和所有者（以root运行时可能改的是用户的文件）"""
+    rc_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = rc_file.with_name(rc_file.name + ".tmp")
+    temp_file.write_text(content, encoding="utf-8")
+    if rc_file.exists():
+        file_stat = rc_file.stat()
+        os.chmod(temp_file, stat.S_IMODE(file_stat.st_mode))
+        if hasattr(os, "chown") and os.geteuid() == 0:
+            os.chown(temp_file, file_stat.st_uid, file_stat.st_gid)
+    os.replace(temp_file, rc_file)
+    print(f"已更新PATH配置: {rc_file}")
+
+
+def install_path_block(shim_dir: Path, legacy_dirs: Iterable[str] = ()) -> Path:
+    """把入口目录加入当前用户shell配置的PATH
+
+    入口目录在用户的配置目录下，其他用户无法访问，因此即使以root运行也
+    不写系统级配置。
+    """
+    rc_file = get_shell_rc_file()
+    ensure_path_block(rc_file, shim_dir, legacy_dirs)
+    return rc_file
+
+
+def link_tool(binary: Path, shim_dir: Path) -> Path:
+    """在入口目录中创建指向工具的符号链接，已存在时原子替换"""
+    link = shim_dir / binary.name
+    if link.is_symlink() and os.readlink(link) == str(binary):
+        return link
+    temp_link = shim_dir / f".{binary.name}.tmp"
+    if temp_link.is_symlink() or temp_link.exists():
+        temp_link.unlink()
+    os.symlink(binary, temp_link)
+    os.replace(temp_link, link)
+    print(f"已链接: {link} -> {binary}")
+    return link
+
+
+def link_tools(bin_dir: Path, shim_dir: Path, names: Optional[Iterable[str]] = None) -> List[Path]:
+    """链接bin目录中的可执行文件，传入 names 时只链接其中列出的入口
+
+    链接指向安装目录（版本切换时只替换安装目录本身的符号链接）下的路径，
+    不解析到具体版本，因此切换版本后入口自动指向新版本。
+    """
+    names = set(names) if names is not None else None
+    links = []
+    with os.scandir(bin_dir) as entries:
+        for entry in entries:
+            if names is not None and entry.name not in names:
+                continue
+            if not entry.is_file() or entry.name.endswith(LIBRARY_SUFFIXES) or ".so." in entry.name:
+                continue
+            if not os.access(entry.path, os.X_OK):
+                continue
+            links.append(link_tool(bin_dir / entry.name, shim_dir))
+    return links
+
+
+def add_to_process_path(path_dir: Path) -> None:
+    """把目录追加到当前进程PATH的末尾，已存在时不重复添加"""
+    path_dir = str(path_dir)
+    paths = os.environ.get("PATH", "").split(os.pathsep)
+    if path_dir not in paths:
+        os.environ["PATH"] = os.pathsep.join([p for p in paths if p] + [path_dir])
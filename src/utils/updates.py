@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+工具链更新检查 - 用条件请求判断上游产物是否变化，未变化时只传输几百字节
+"""
+
+import re
+from typing import Any, Dict
+
+from .http_client import get_session
+
+# 从下载地址中解析发布版本，按顺序匹配
+RELEASE_TAG_PATTERNS = (
+    # GitHub Release: /releases/download/<tag>/
+    re.compile(r"/releases/download/([^/]+)/"),
+    # python.org 及其镜像: /python/<version>/
+    re.compile(r"/python/(\d+(?:\.\d+)+)/"),
+    # 文件名中的版本号，例如 ffmpeg-7.1.zip
+    re.compile(r"-(\d+(?:\.\d+)+)\.(?:zip|tar|tgz|7z)"),
+)
+
+
+def resolve_release_tag(*urls: str) -> str:
+    """从下载地址（包括重定向后的地址）中解析发布版本，解析不到时返回空字符串"""
+    for url in urls:
+        for pattern in RELEASE_TAG_PATTERNS:
+            match = pattern.search(url or "")
+            if match:
+                return match.group(1)
+    return ""
+
+
+def check_for_update(install_info: Dict[str, Any]) -> bool:
+    """检查上游产物是否有更新
+
+    带上安装时记录的 ETag / Last-Modified 发送条件请求，上游未变化时服务器
+    返回304，没有响应体。用 bytes=0-0 的GET代替HEAD，部分CDN对HEAD的处理
+    与GET不一致；即使服务器忽略条件头，也最多多传输一个字节。
+    """
+    url = install_info.get("source_url")
+    etag = install_info.get("etag", "")
+    last_modified = install_info.get("last_modified", "")
+    if not url or not (etag or last_modified):
+        raise Exception("安装信息中没有上游版本信息，请重新安装后再检查更新")
+
+    headers = {"Range": "bytes=0-0"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    response = get_session().get(url, headers=headers, stream=True, timeout=(10, 30))
+    with response:
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        # 服务器忽略了条件头，自行比较
+        if etag:
+            return response.headers.get("ETag", "") != etag
+        return response.headers.get("Last-Modified", "") != last_modified